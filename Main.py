@@ -1,7 +1,9 @@
+import asyncio
 import json
-import time
 import requests
 from simuladores import *
+from connection.AdaptiveScheduler import AdaptiveScheduler
+from connection.AsyncPublisher import AsyncPublisher
 
 URL = "http://ec2-18-207-21-79.compute-1.amazonaws.com:8080/publish"
 
@@ -32,40 +34,140 @@ ezo = EzoPhSensor(
 ezo.calibrate(2, 4.0)  # Ponto baixo
 ezo.calibrate(2, 7.0)  # Ponto médio
 
-def processar_bloco(tamanho_bloco):
+SENSORES = {
+    "Apogee": apogee,
+    "NPK": npk,
+    "Decagon": decagon,
+    "SHT31": sensirion,
+    "Davis": davis,
+    "Ezo": ezo,
+}
+
+def processar_bloco(tamanho_bloco, bulk_loader=None, agregador=None):
+    """
+    Coleta um bloco de cada sensor. Com bulk_loader, os registros de todos os
+    sensores também são gravados no MySQL numa única transação ao final do ciclo.
+    Com agregador (WindowAggregator), o payload leva apenas as janelas fechadas
+    no ciclo em vez das leituras brutas; o MySQL continua recebendo as brutas.
+    """
     payload = {}
 
-    sensores = {
-        "Apogee": apogee,
-        "NPK": npk,
-        "Decagon": decagon,
-        "SHT31": sensirion,
-        "Davis": davis,
-        "Ezo": ezo,
-    }
+    for nome, sensor in SENSORES.items():
+        if agregador is None:
+            payload[nome] =  sensor.collect_data(num_samples=tamanho_bloco,save_to_db=bulk_loader is not None,bulk_loader=bulk_loader); # ; tem que ficar para não printar no jupyter
+            continue
+        lote = sensor.collect_data(num_samples=tamanho_bloco, save_to_db=bulk_loader is not None,
+                                   bulk_loader=bulk_loader, as_batch=True)
+        janelas = agregador.update(sensor, lote.columns)
+        if janelas:
+            payload[nome] = janelas
+
+    if bulk_loader is not None:
+        bulk_loader.flush()
 
-    for nome, sensor in sensores.items():
-        payload[nome] =  sensor.collect_data(num_samples=tamanho_bloco,save_to_db=False); # ; tem que ficar para não printar no jupyter
+    return payload
 
+
+def fechar_janelas(agregador):
+    """Fecha as janelas em aberto do agregador (fim da execução) num payload por sensor"""
+    nomes = {sensor.sensor_id: nome for nome, sensor in SENSORES.items()}
+    payload = {}
+    for janela in agregador.flush():
+        payload.setdefault(nomes[janela['id_sensor']], []).append(janela)
     return payload
 
 
-def enviar_dado(payload):
-    """Envia o dado para a API"""
+def enviar_dado(payload, spool=None):
+    """Envia o dado para a API; se falhar e houver spool, o payload fica guardado para replay"""
     headers = {"Content-Type": "application/json"}
     try:
         response = requests.post(URL, headers=headers, data=json.dumps(payload))
         if response.status_code == 200:
             print(f"✅ Sucesso: {response.text}")
-        else:
-            print(f"⚠️ Erro {response.status_code}: {response.text}")
+            return True
+        print(f"⚠️ Erro {response.status_code}: {response.text}")
     except Exception as e:
         print(f"❌ Falha ao enviar: {e}")
 
+    if spool is not None:
+        spool.append(payload)
+    return False
 
-if __name__ == "__main__":
 
+async def drenar_spool(spool, publisher, taxa=None, espera=5):
+    """
+    Reenvia continuamente, em ordem, o que estiver no spool (taxa em payloads/s).
+    Acorda assim que um payload é gravado; só espera espera segundos após uma falha de envio.
+    """
     while True:
-        payload = processar_bloco(tamanho_bloco=5)
-        enviar_dado(payload)
-        time.sleep(5)
\ No newline at end of file
+        await spool.wait_for_data()
+        enviados = await spool.replay(publisher.publish, rate=taxa)
+        if not enviados and spool.pending_count():
+            await asyncio.sleep(espera)
+
+
+async def executar(tamanho_bloco=5, intervalo=5, max_in_flight=4, spool=None, taxa_replay=None, limites=None,
+                   formato='json', compressao=None, agregador=None):
+    """
+    Loop principal assíncrono: a geração do próximo bloco acontece enquanto
+    os envios anteriores ainda estão em andamento (até max_in_flight).
+    Com spool, todo payload passa antes pelo log em disco e é enviado pelo
+    drenador, sobrevivendo a quedas do endpoint e reinícios do processo.
+
+    tamanho_bloco e intervalo são apenas os valores iniciais: o AdaptiveScheduler
+    os ajusta a cada envio conforme latência, taxa de erro e fila do sink, dentro
+    de limites (opções de SinkController, ex.: {'max_batch': 200, 'min_interval': 0.5}),
+    e segura a geração enquanto o sink estiver atrasado.
+
+    formato='columnar' (com compressao 'gzip' ou 'zstd') reduz os bytes enviados;
+    se o servidor não aceitar, o envio volta para JSON.
+
+    agregador (ex.: WindowAggregator(window=60)) troca as leituras brutas pelos
+    agregados de cada janela fechada; ciclos sem janela fechada não geram envio.
+    Ao encerrar, as janelas ainda abertas são fechadas e enviadas (ou gravadas no spool).
+    """
+    if spool is not None:
+        fila, high_water = spool.pending_count, 1000
+    else:
+        fila, high_water = (lambda: publisher.in_flight), max_in_flight
+    agendador = AdaptiveScheduler()
+    sink = agendador.add_sink('http', **{
+        'queue_depth': fila, 'initial_batch': tamanho_bloco, 'initial_interval': intervalo,
+        'high_water': high_water, **(limites or {}),
+    })
+
+    publisher = AsyncPublisher(URL, max_in_flight=max_in_flight, listener=sink.observe,
+                               wire_format=formato, compression=compressao)
+    drenador = None
+    if spool is not None:
+        drenador = asyncio.ensure_future(drenar_spool(spool, publisher, taxa=taxa_replay))
+    try:
+        while True:
+            await agendador.wait_for_capacity()
+            payload = processar_bloco(tamanho_bloco=agendador.batch_size, agregador=agregador)
+            if payload and spool is not None:
+                spool.append(payload)
+            elif payload:
+                await publisher.submit(payload)
+            await asyncio.sleep(agendador.interval)
+    finally:
+        if agregador is not None:
+            payload = fechar_janelas(agregador)
+            if payload and spool is not None:
+                spool.append(payload)
+            elif payload:
+                await publisher.submit(payload)
+        if drenador is not None:
+            drenador.cancel()
+            spool.close()
+        await publisher.drain()
+        print(f"📊 {publisher.stats()}")
+        print(f"⚙️ {agendador.stats()}")
+        publisher.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(executar(tamanho_bloco=5, intervalo=5))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,73 @@
+"""
+Benchmark do TimeSeriesCodec por tipo de simulador: taxa de compressão e
+vazão de codificação/decodificação (leituras/s).
+
+A série de cada sensor tem num_samples leituras a cada 5 s; no cenário
+'jitter' cada horário ganha até 2 ms de atraso aleatório, exercitando o
+delta-of-delta. A taxa é comparada com:
+- float64: 8 bytes por timestamp e por canal
+- ndjson: registros log_exec de _save_to_json, um JSON por linha
+- ndjson.gz: o mesmo NDJSON comprimido com gzip
+
+Uso:
+python -m benchmarks.CodecBenchmark [num_samples ...]
+"""
+import gzip
+import json
+import sys
+
+import numpy as np
+
+from benchmarks.Suite import measure
+from connection.TimeSeriesCodec import decode_block, encode_block
+from simuladores.Fleet import SENSOR_TYPES
+
+SCENARIOS = ('regular', 'jitter')
+
+
+def series(sensor, num_samples, scenario='regular', seed=0):
+    """Lote {timestamp, canais} de num_samples leituras a cada 5 s"""
+    step = np.timedelta64(5, 's')
+    timestamps = np.datetime64('2026-01-01T00:00', 'us') + np.arange(num_samples) * step
+    if scenario == 'jitter':
+        jitter = np.random.default_rng(seed).integers(0, 2_000, num_samples)
+        timestamps = timestamps + jitter.astype('timedelta64[us]')
+    return {'timestamp': timestamps, **sensor.simulate_batch(num_samples, timestamps=timestamps)}
+
+
+def ndjson_bytes(sensor, columns):
+    records = sensor._save_to_json(columns, len(columns['timestamp']))
+    return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+
+
+def run(num_samples, scenario='regular', repeat=5):
+    results = {}
+    for position, (name, sensor_class) in enumerate(SENSOR_TYPES.items()):
+        sensor = sensor_class(sensor_id=position + 1, region_id=1, seed=position)
+        columns = series(sensor, num_samples, scenario, seed=position)
+        block = encode_block(columns, sensor)
+        ndjson = ndjson_bytes(sensor, columns)
+
+        results[name] = {
+            'bytes_per_reading': len(block) / num_samples,
+            'ratio_float64': 8 * len(columns) * num_samples / len(block),
+            'ratio_ndjson': len(ndjson) / len(block),
+            'ratio_ndjson_gzip': len(gzip.compress(ndjson)) / len(block),
+            'encode': measure(lambda: encode_block(columns, sensor), repeat, ops_per_call=num_samples)['ops_per_sec'],
+            'decode': measure(lambda: decode_block(block), repeat, ops_per_call=num_samples)['ops_per_sec'],
+        }
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000]
+
+    for size in sizes:
+        for scenario in SCENARIOS:
+            print(f"\nnum_samples={size} cenário={scenario}")
+            print(f"  {'sensor':<12} {'B/leitura':>9} {'float64':>8} {'ndjson':>8} {'ndjson.gz':>9}"
+                  f" {'codifica/s':>12} {'decodifica/s':>12}")
+            for name, result in run(size, scenario).items():
+                print(f"  {name:<12} {result['bytes_per_reading']:>9.2f} {result['ratio_float64']:>7.1f}x"
+                      f" {result['ratio_ndjson']:>7.1f}x {result['ratio_ndjson_gzip']:>8.1f}x"
+                      f" {result['encode']:>12,.0f} {result['decode']:>12,.0f}")
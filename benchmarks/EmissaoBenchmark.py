@@ -0,0 +1,69 @@
+"""
+Benchmark da emissão de registros de log_exec: versão colunar
+(Sensor._build_log_records) contra o loop iterrows original.
+
+Uso:
+python -m benchmarks.EmissaoBenchmark [num_samples ...]
+"""
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from simuladores import NPKSensorSimulator
+
+
+def legacy_save_to_json(sensor, data_frame, num_sample):
+    """Reprodução da implementação baseada em iterrows, para comparação"""
+    metrics = sensor._get_system_metrics()
+    json_data = []
+
+    for _, row in data_frame.iterrows():
+        time_init = row['timestamp']
+
+        for element_name, valor in sensor._get_sensor_values(row):
+            json_data.append({
+                "id_sensor": sensor.sensor_id,
+                "valor": valor,
+                "dt_exec": time_init.strftime('%Y-%m-%d'),
+                "dt_start_exec": time_init.isoformat(),
+                "dt_end_exec": datetime.now().isoformat(),
+                "qtd_data": num_sample,
+                "ram_usage": round(metrics['mem_mb'], 2),
+                "process_usage": metrics['cpu_usage'],
+                "sensor_name": f"{sensor.sensor_type} {element_name}" if element_name else sensor.sensor_type
+            })
+    return json_data
+
+
+def run(num_samples, include_legacy=True):
+    sensor = NPKSensorSimulator(sensor_id=1, region_id=1)
+    readings = sensor.simulate_batch(num_samples)
+    df = pd.DataFrame({'timestamp': [datetime.now()] * num_samples, **readings})
+
+    results = {}
+    start = time.perf_counter()
+    records = sensor._save_to_json(df, num_samples)
+    elapsed = time.perf_counter() - start
+    results['colunar'] = len(records) / elapsed
+
+    if include_legacy:
+        start = time.perf_counter()
+        records = legacy_save_to_json(sensor, df, num_samples)
+        elapsed = time.perf_counter() - start
+        results['iterrows'] = len(records) / elapsed
+
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000]
+
+    for size in sizes:
+        results = run(size)
+        print(f"\nnum_samples={size}")
+        for name, rate in results.items():
+            print(f"  {name:<10} {rate:>14,.0f} registros/s")
+        if 'iterrows' in results:
+            print(f"  speedup    {results['colunar'] / results['iterrows']:>14.1f}x")
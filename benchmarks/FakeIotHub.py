@@ -0,0 +1,59 @@
+"""
+Cliente local que imita o IoTHubDeviceClient assíncrono do SDK, para testes e
+benchmarks do AsyncAzureIotSender sem acesso ao Azure.
+
+Uso:
+from benchmarks.FakeIotHub import FakeIoTHubClient, FakeMessage
+client = FakeIoTHubClient(latency=0.02, failure_rate=0.1)
+sender = AsyncAzureIotSender(client=client, message_class=FakeMessage)
+"""
+import asyncio
+import json
+import random
+
+# Mesmo limite do IoT Hub
+HUB_MESSAGE_LIMIT = 256 * 1024
+
+
+class FakeMessage:
+    """Equivalente mínimo de azure.iot.device.Message"""
+    def __init__(self, data):
+        self.data = data
+        self.content_encoding = None
+        self.content_type = None
+
+
+class FakeIoTHubClient:
+    """
+    Aceita mensagens após latency segundos; falha aleatoriamente com
+    failure_rate e recusa mensagens acima do limite do hub.
+    """
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.connected = False
+        self.messages = []
+        self.attempts = 0
+
+    async def connect(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def send_message(self, message):
+        if not self.connected:
+            raise ConnectionError("Cliente não conectado")
+        self.attempts += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if len(message.data) > HUB_MESSAGE_LIMIT:
+            raise ValueError(f"Mensagem de {len(message.data)} bytes excede o limite do hub")
+        if self.random.random() < self.failure_rate:
+            raise ConnectionError("Falha simulada no envio")
+        self.messages.append(message)
+
+    def records(self):
+        """Todos os registros recebidos, na ordem de chegada"""
+        return [record for message in self.messages for record in json.loads(message.data)]
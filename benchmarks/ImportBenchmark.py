@@ -0,0 +1,63 @@
+"""
+Benchmark do custo de inicialização: tempo e memória para importar os
+simuladores e produzir a primeira leitura, e quais dependências pesadas
+foram carregadas no caminho. Cada cenário roda num processo Python novo.
+
+Uso:
+python -m benchmarks.ImportBenchmark [repeticoes]
+"""
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'scipy', 'psutil', 'pymysql', 'requests', 'pyarrow', 'azure')
+
+SCENARIOS = {
+    'import simuladores': "import simuladores",
+    'from simuladores import *': "from simuladores import *",
+    'primeira leitura (NPK)': "from simuladores import NPKSensorSimulator\n"
+                              "NPKSensorSimulator(1, 1).simulate_reading()",
+    'collect_data (NPK)': "from simuladores import NPKSensorSimulator\n"
+                          "NPKSensorSimulator(1, 1).collect_data(5)",
+    'collect_data (todos)': "from simuladores import *\n"
+                            "for cls in (ApogeeSP110Simulator, NPKSensorSimulator, DecagonEC5Simulator,\n"
+                            "            SHT31Simulator, Davis6410Simulator, EzoPhSensor):\n"
+                            "    cls(1, 1).collect_data(5)",
+}
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_scenario(code, repeat=3):
+    """Executa o cenário em processos novos e retorna a melhor medição"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=root
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    for name, code in SCENARIOS.items():
+        result = run_scenario(code, repeat)
+        print(f"{name:<28} {result['seconds'] * 1000:>8.1f} ms  {result['max_rss_mb']:>7.1f} MB  "
+              f"pesados: {', '.join(result['heavy']) or '-'}")
@@ -0,0 +1,120 @@
+"""
+Servidor local que imita o endpoint /publish, para testes e benchmarks.
+
+Uso:
+python -m benchmarks.PublishStub [porta] [atraso_ms]
+"""
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PublishHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # mantém a conexão aberta (keep-alive)
+    disable_nagle_algorithm = True  # evita o atraso de ~40ms entre cabeçalho e corpo
+
+    def setup(self):
+        super().setup()
+        # Um handler por conexão TCP: conta quantas conexões os clientes abriram
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        content_type = self.headers.get('Content-Type', 'application/json')
+        if self.path != '/publish':
+            status, response = 404, b'not found'
+        elif not self.server.columnar and content_type != 'application/json':
+            status, response = 415, b'unsupported media type'
+        else:
+            if self.server.validate:
+                from connection.WireFormat import decode_body
+                decode_body(body, content_type, self.headers.get('Content-Encoding'))
+            with self.server.lock:
+                self.server.received += 1
+                self.server.bytes_received += len(body)
+                if self.server.record:
+                    self.server.bodies.append((content_type, body))
+            status, response = 200, b'ok'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PublishStub:
+    """
+    Sobe o servidor numa thread; usar como gerenciador de contexto.
+    columnar=False recusa o formato colunar com 415, como um servidor antigo;
+    validate=True decodifica cada corpo recebido; record=True guarda (Content-Type,
+    corpo) de cada envio aceito em bodies, na ordem de chegada.
+    """
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, columnar=True, validate=False, record=False):
+        self.server = ThreadingHTTPServer((host, port), PublishHandler)
+        self.server.daemon_threads = True
+        self.server.delay = delay
+        self.server.columnar = columnar
+        self.server.validate = validate
+        self.server.record = record
+        self.server.lock = threading.Lock()
+        self.server.received = 0
+        self.server.bytes_received = 0
+        self.server.connections = 0
+        self.server.bodies = []
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/publish"
+
+    @property
+    def received(self):
+        return self.server.received
+
+    @property
+    def bytes_received(self):
+        return self.server.bytes_received
+
+    @property
+    def connections(self):
+        return self.server.connections
+
+    @property
+    def bodies(self):
+        return self.server.bodies
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    stub = PublishStub(port=port, delay=delay).start()
+    print(f"Stub escutando em {stub.url}")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
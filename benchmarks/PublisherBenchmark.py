@@ -0,0 +1,40 @@
+"""
+Benchmark do AsyncPublisher contra o stub local de /publish.
+
+Uso:
+python -m benchmarks.PublisherBenchmark [num_payloads] [max_in_flight] [atraso_ms]
+"""
+import asyncio
+import sys
+
+import Main
+from benchmarks.PublishStub import PublishStub
+from connection.AsyncPublisher import AsyncPublisher
+
+
+async def run(num_payloads, max_in_flight, url):
+    publisher = AsyncPublisher(url, max_in_flight=max_in_flight)
+    try:
+        for _ in range(num_payloads):
+            await publisher.submit(Main.processar_bloco(tamanho_bloco=5))
+        await publisher.drain()
+        return publisher.stats()
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    num_payloads = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    max_in_flight = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    delay = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+
+    with PublishStub(delay=delay) as stub:
+        stats = asyncio.run(run(num_payloads, max_in_flight, stub.url))
+
+    print(f"payloads enviados: {stats['sent']} (falhas: {stats['failed']})")
+    print(f"vazão:             {stats['payloads_per_sec']:.1f} payloads/s")
+    if stats['p50'] is None:
+        print("latência p50/p95/p99: sem envios bem-sucedidos")
+    else:
+        print(f"latência p50/p95/p99: "
+              f"{stats['p50'] * 1000:.1f} / {stats['p95'] * 1000:.1f} / {stats['p99'] * 1000:.1f} ms")
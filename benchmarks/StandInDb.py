@@ -0,0 +1,87 @@
+"""
+Driver DB-API local que substitui o pymysql em testes e benchmarks.
+Usa SQLite em memória com o esquema agrosync.log_exec e traduz os
+placeholders %s do MySQL para ?.
+
+Uso:
+MySQLConnector('local', 'agrosync', 'u', 'p', connect=StandInDb.connect)
+"""
+import sqlite3
+from datetime import date, datetime
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+LOG_EXEC_DDL = """
+    CREATE TABLE IF NOT EXISTS agrosync.log_exec (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_sensor INTEGER, valor REAL, dt_exec TEXT, dt_start_exec TEXT, dt_end_exec TEXT,
+        qtd_data INTEGER, ram_usage REAL, process_usage REAL, sensor_name TEXT
+    )
+"""
+
+
+class StandInCursor:
+    def __init__(self, connection):
+        self._cursor = connection._db.cursor()
+
+    @staticmethod
+    def _translate(query):
+        return query.replace('%s', '?')
+
+    def execute(self, query, params=()):
+        self._cursor.execute(self._translate(query), tuple(params))
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(self._translate(query), seq_of_params)
+        return self._cursor.rowcount
+
+    def fetchall(self):
+        columns = [col[0] for col in self._cursor.description or ()]
+        return [dict(zip(columns, row)) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StandInConnection:
+    """Conexão compatível com o uso que o projeto faz do pymysql"""
+    def __init__(self, **params):
+        self.params = params
+        self._db = sqlite3.connect(':memory:', check_same_thread=False)
+        self._db.execute("ATTACH DATABASE ':memory:' AS agrosync")
+        self._db.execute(LOG_EXEC_DDL)
+        self.closed = False
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def ping(self, reconnect=False):
+        if self.closed:
+            raise sqlite3.ProgrammingError("conexão fechada")
+        self._db.execute("SELECT 1")
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def close(self):
+        self.closed = True
+        self._db.close()
+
+
+def connect(**params):
+    return StandInConnection(**params)
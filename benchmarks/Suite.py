@@ -0,0 +1,290 @@
+"""
+Suíte de benchmarks do pipeline geração -> serialização -> sink.
+
+Mede vazão (operações/s) e latência (p50/p95 por chamada) de:
+- simulate_reading de cada simulador
+- collect_data e collect_batch de cada simulador com vários num_samples
+- serialização JSON do payload de um ciclo
+- TimeSeriesCodec: codificação e decodificação de cada simulador (ver CodecBenchmark)
+- sinks: arquivo NDJSON, MySQL (driver local StandInDb) e HTTP (PublishStub)
+
+Cada chamada medida é precedida por uma carga de referência fixa (Python puro +
+NumPy), e o resultado guarda também a vazão relativa: mediana de
+(tempo da referência / tempo da chamada) por operação. Como as duas rodam lado a
+lado, mudanças de velocidade da máquina afetam ambas e a razão fica estável.
+O número de repetições de cada caso é fixo; --quick apenas pula os casos grandes.
+
+Os resultados saem em JSON. Com --baseline, a vazão relativa de cada caso é
+comparada com a registrada (uma única medição, sem novas tentativas) e a
+execução falha (código 1) se algum cair mais que --threshold.
+
+Uso:
+python -m benchmarks.Suite [--output resultados.json] [--baseline benchmarks/baseline.json]
+                           [--threshold 0.25] [--save-baseline] [--only collect_data] [--quick]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from simuladores.Fleet import SENSOR_TYPES
+
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+# Repetições fixas de collect_data/collect_batch por num_samples
+COLLECT_REPEATS = {5: 1000, 100: 300, 10_000: 10}
+# Omitidos com --quick
+QUICK_SKIP_SIZES = (10_000,)
+
+_REFERENCE_VALUES = np.arange(1_000, dtype=float)
+
+
+def reference_workload():
+    """Carga fixa (Python puro + NumPy) de ~15 µs usada como régua das medições"""
+    total = 0
+    for i in range(200):
+        total += i * i
+    return total + float(np.sqrt(_REFERENCE_VALUES).sum())
+
+
+def measure(function, repeat, ops_per_call=1, warmup=3):
+    """
+    Executa function repeat vezes, cada uma logo após reference_workload, e
+    resume vazão e latência por chamada. A vazão usa a latência mediana;
+    'relative' é a mediana de ops_per_call * t_referência / t_chamada.
+    """
+    for _ in range(warmup):
+        reference_workload()
+        function()
+    latencies = np.empty(repeat)
+    references = np.empty(repeat)
+    clock = time.perf_counter
+    for i in range(repeat):
+        # A primeira execução após uma chamada pesada pega caches frios; só a segunda é medida
+        reference_workload()
+        reference_start = clock()
+        reference_workload()
+        call_start = clock()
+        function()
+        call_end = clock()
+        references[i] = call_start - reference_start
+        latencies[i] = call_end - call_start
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {
+        'ops_per_sec': ops_per_call / p50,
+        'relative': float(np.median(references / latencies)) * ops_per_call,
+        'p50_ms': float(p50) * 1000,
+        'p95_ms': float(p95) * 1000,
+        'calls': repeat,
+    }
+
+
+def _sensors():
+    return {name: cls(sensor_id=i + 1, region_id=1, seed=i) for i, (name, cls) in enumerate(SENSOR_TYPES.items())}
+
+
+def _cycle_payload(sensors, num_samples=5):
+    return {name: sensor.collect_data(num_samples=num_samples) for name, sensor in sensors.items()}
+
+
+def bench_simulate_reading(quick):
+    for name, sensor in _sensors().items():
+        yield f"simulate_reading.{name}", measure(sensor.simulate_reading, repeat=2000)
+
+
+def bench_collect_data(quick):
+    for name, sensor in _sensors().items():
+        for size, repeat in COLLECT_REPEATS.items():
+            if quick and size in QUICK_SKIP_SIZES:
+                continue
+            records = len(sensor.collect_data(num_samples=size))
+            yield (f"collect_data.{name}.{size}",
+                   measure(lambda: sensor.collect_data(num_samples=size), repeat, ops_per_call=records))
+            # Sem montar os registros JSON: leituras direto no ReadingBuffer
+            yield (f"collect_batch.{name}.{size}",
+                   measure(lambda: sensor.collect_batch(size), repeat, ops_per_call=records))
+
+
+def bench_json(quick):
+    payload = _cycle_payload(_sensors())
+    records = sum(len(values) for values in payload.values())
+    yield "json.dumps.ciclo", measure(lambda: json.dumps(payload), repeat=2000, ops_per_call=records)
+
+
+def bench_codec(quick):
+    from benchmarks.CodecBenchmark import series
+    from connection.TimeSeriesCodec import decode_block, encode_block
+
+    for name, sensor in _sensors().items():
+        columns = series(sensor, 1_000, 'jitter')
+        block = encode_block(columns, sensor)
+        yield (f"codec.encode.{name}",
+               measure(lambda: encode_block(columns, sensor), repeat=200, ops_per_call=1_000))
+        yield (f"codec.decode.{name}",
+               measure(lambda: decode_block(block), repeat=100, ops_per_call=1_000))
+
+
+def bench_file_sink(quick):
+    from connection.NdjsonSink import NdjsonWriter
+
+    payload = _cycle_payload(_sensors(), num_samples=100)
+    records = [record for values in payload.values() for record in values]
+    directory = tempfile.mkdtemp()
+    try:
+        for compression in (None, 'gzip'):
+            writer = NdjsonWriter(f"{directory}/bench-{compression}.ndjson", compression=compression)
+            yield (f"sink.file.{compression or 'plain'}",
+                   measure(lambda: writer.write_many(records), repeat=200, ops_per_call=len(records)))
+            writer.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_mysql_sink(quick):
+    from benchmarks import StandInDb
+    from connection.BulkLoader import LogExecBulkLoader
+    from connection.MysqlConection import MySQLConnector
+
+    connector = MySQLConnector('local', 'agrosync', 'bench', 'bench', connect=StandInDb.connect)
+    sensors = _sensors()
+    for sensor in sensors.values():
+        sensor.mysql_connector = connector
+
+    sensor = sensors['NPK']
+    records = len(sensor.collect_data(num_samples=100))
+    yield ("sink.mysql.executemany",
+           measure(lambda: sensor.collect_data(num_samples=100, save_to_db=True), 100, records))
+
+    loader = LogExecBulkLoader(connector, chunk_size=1000)
+
+    def load_cycle():
+        for item in sensors.values():
+            item.collect_data(num_samples=100, save_to_db=True, bulk_loader=loader)
+        loader.flush()
+
+    records = sum(len(item.collect_data(num_samples=100)) for item in sensors.values())
+    yield "sink.mysql.bulk_ciclo", measure(load_cycle, 50, records)
+    connector.close()
+
+
+def bench_http_sink(quick):
+    from benchmarks.PublishStub import PublishStub
+    from connection.AsyncPublisher import AsyncPublisher
+
+    payload = _cycle_payload(_sensors())
+
+    with PublishStub() as stub:
+        for max_in_flight in (1, 8):
+            publisher = AsyncPublisher(stub.url, max_in_flight=max_in_flight)
+            loop = asyncio.new_event_loop()
+
+            async def send_window():
+                # Uma chamada = max_in_flight payloads em paralelo
+                for _ in range(max_in_flight):
+                    await publisher.submit(payload)
+                await publisher.drain()
+
+            try:
+                yield (f"sink.http.in_flight_{max_in_flight}",
+                       measure(lambda: loop.run_until_complete(send_window()), repeat=200,
+                               ops_per_call=max_in_flight))
+            finally:
+                loop.close()
+                publisher.close()
+
+
+BENCHMARKS = {
+    'simulate_reading': bench_simulate_reading,
+    'collect_data': bench_collect_data,
+    'json': bench_json,
+    'codec': bench_codec,
+    'sink.file': bench_file_sink,
+    'sink.mysql': bench_mysql_sink,
+    'sink.http': bench_http_sink,
+}
+
+
+def run_suite(only=None, quick=False):
+    cases = {}
+    for prefix, benchmark in BENCHMARKS.items():
+        if only and not any(pattern in prefix or prefix in pattern for pattern in only):
+            continue
+        for name, result in benchmark(quick):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            cases[name] = result
+            print(f"{name:<42} {result['ops_per_sec']:>14,.0f} ops/s  {result['relative']:>10.3f} rel  "
+                  f"p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms", file=sys.stderr)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'cases': cases,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Lista os casos cuja vazão relativa (ver measure) caiu mais que threshold
+    em relação ao baseline: (caso, esperado, atual, variação).
+    """
+    regressions = []
+    for name, expected in baseline['cases'].items():
+        current = results['cases'].get(name)
+        if current is None or 'relative' not in expected:
+            continue
+        change = current['relative'] / expected['relative'] - 1
+        if change < -threshold:
+            regressions.append((name, expected['relative'], current['relative'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline AgroSync")
+    parser.add_argument('--output', help="arquivo JSON com os resultados ('-' para stdout)")
+    parser.add_argument('--baseline', default=None, help=f"baseline para comparação (ex.: {DEFAULT_BASELINE})")
+    parser.add_argument('--threshold', type=float, default=0.25, help="queda de vazão tolerada (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="grava os resultados como novo baseline")
+    parser.add_argument('--only', nargs='*', help="executa apenas casos que contenham estes trechos")
+    parser.add_argument('--quick', action='store_true', help="pula os casos grandes (collect_data com 10 000 amostras)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.only, args.quick)
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline gravado em {baseline_path}", file=sys.stderr)
+        return 0
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, expected, current, change in regressions:
+            print(f"❌ Regressão em {name}: {expected:,.3f} -> {current:,.3f} rel ({change:+.0%})",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"✅ Nenhuma regressão acima de {args.threshold:.0%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
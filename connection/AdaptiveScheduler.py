@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+
+class SinkController:
+    """
+    Controle AIMD do tamanho de bloco e do intervalo de flush de um sink:
+    - Saudável (latência EWMA abaixo de target_latency, taxa de erro abaixo de
+      max_error_rate e fila abaixo de high_water): o bloco cresce em increase
+      amostras e o intervalo cai pelo fator speedup, até os limites configurados
+    - Degradado: o bloco cai pela metade e o intervalo dobra
+    - Fila em high_water ou acima: o sink está atrasado e a geração deve esperar
+    queue_depth é um callable que devolve quantos payloads aguardam envio.
+    """
+    def __init__(self, name, queue_depth=None, min_batch=1, max_batch=500, initial_batch=5,
+                 min_interval=0.1, max_interval=60.0, initial_interval=5.0,
+                 target_latency=0.5, max_error_rate=0.05, high_water=100,
+                 increase=5, speedup=0.8, smoothing=0.2, window=50):
+        self.name = name
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.high_water = high_water
+        self.increase = increase
+        self.speedup = speedup
+        self.smoothing = smoothing
+
+        self.batch_size = min(max(initial_batch, min_batch), max_batch)
+        self.interval = min(max(initial_interval, min_interval), max_interval)
+        self.latency = None
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, ok, latency=None):
+        """Registra o resultado de um envio (latência em segundos) e reajusta os parâmetros"""
+        with self._lock:
+            self._outcomes.append(ok)
+            if latency is not None:
+                if self.latency is None:
+                    self.latency = latency
+                else:
+                    self.latency += self.smoothing * (latency - self.latency)
+            self._adjust()
+
+    @property
+    def error_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return 1 - sum(self._outcomes) / len(self._outcomes)
+
+    def lagging(self):
+        return self.queue_depth() >= self.high_water
+
+    def healthy(self):
+        slow = self.latency is not None and self.latency > self.target_latency
+        return not slow and self.error_rate <= self.max_error_rate and not self.lagging()
+
+    def _adjust(self):
+        if self.healthy():
+            self.batch_size = min(self.max_batch, self.batch_size + self.increase)
+            self.interval = max(self.min_interval, self.interval * self.speedup)
+        else:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+            self.interval = min(self.max_interval, self.interval * 2)
+
+    def stats(self):
+        return {
+            'batch_size': self.batch_size,
+            'interval': self.interval,
+            'latency': self.latency,
+            'error_rate': self.error_rate,
+            'queue_depth': self.queue_depth(),
+        }
+
+
+class AdaptiveScheduler:
+    """
+    Agenda os ciclos de coleta a partir dos SinkControllers registrados:
+    - batch_size: menor bloco entre os sinks (o mais restrito dita o tamanho)
+    - interval: maior intervalo entre os sinks
+    - wait_for_capacity(): contrapressão, segura a geração enquanto algum sink
+      estiver com a fila em high_water (no máximo max_wait segundos)
+    """
+    def __init__(self, poll_interval=0.05, max_wait=None):
+        self.sinks = {}
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.throttled_seconds = 0.0
+
+    def add_sink(self, name, **options):
+        controller = SinkController(name, **options)
+        self.sinks[name] = controller
+        return controller
+
+    @property
+    def batch_size(self):
+        return min(sink.batch_size for sink in self.sinks.values())
+
+    @property
+    def interval(self):
+        return max(sink.interval for sink in self.sinks.values())
+
+    def lagging(self):
+        return [name for name, sink in self.sinks.items() if sink.lagging()]
+
+    async def wait_for_capacity(self):
+        """Aguarda até que nenhum sink esteja atrasado; retorna o tempo esperado"""
+        start = time.perf_counter()
+        while self.lagging():
+            waited = time.perf_counter() - start
+            if self.max_wait is not None and waited >= self.max_wait:
+                break
+            await asyncio.sleep(self.poll_interval)
+        waited = time.perf_counter() - start
+        self.throttled_seconds += waited
+        return waited
+
+    def stats(self):
+        return {
+            'batch_size': self.batch_size,
+            'interval': self.interval,
+            'throttled_seconds': self.throttled_seconds,
+            'sinks': {name: sink.stats() for name, sink in self.sinks.items()},
+        }
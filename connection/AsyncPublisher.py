@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from connection.WireFormat import UNSUPPORTED_STATUS, encode_body
+
+
+def percentile(sorted_values, q):
+    """Percentil por posição mais próxima de uma lista já ordenada"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class AsyncPublisher:
+    """
+    Publicador assíncrono para o endpoint /publish:
+    - Sessão HTTP persistente (keep-alive) com pool de max_in_flight conexões
+    - No máximo max_in_flight envios simultâneos; submit() aguarda quando o limite é atingido
+    - Métricas de vazão e latência (p50/p95/p99)
+    - listener(ok, latência) opcional, chamado a cada envio (ex.: SinkController.observe)
+    - wire_format 'json', 'columnar' ou 'timeseries' (blocos do TimeSeriesCodec, ver
+      WireFormat) e compressão opcional; se o servidor recusar o formato (406/415),
+      os envios seguintes voltam para JSON
+    """
+    def __init__(self, url, max_in_flight=4, timeout=10, session=None, latency_window=10000, listener=None,
+                 wire_format='json', compression=None):
+        self.url = url
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.wire_format = wire_format
+        self.compression = compression
+        self.bytes_sent = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='publisher')
+        self._slots = None
+        self._pending = set()
+        self._active = 0
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=latency_window)
+        self.sent = 0
+        self.failed = 0
+        self.started_at = None
+        self.listener = listener
+
+    def _post(self, payload):
+        # Roda nas threads do executor: formato lido e rebaixado sob o lock
+        with self._lock:
+            wire_format, compression = self.wire_format, self.compression
+        body, headers = encode_body(payload, wire_format, compression)
+        start = time.perf_counter()
+        response = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        if response.status_code in UNSUPPORTED_STATUS and (wire_format, compression) != ('json', None):
+            with self._lock:
+                downgraded = (self.wire_format, self.compression) != ('json', None)
+                self.wire_format, self.compression = 'json', None
+            if downgraded:
+                print(f"⚠️ Formato {wire_format}/{compression} recusado ({response.status_code}); usando JSON")
+            body, headers = encode_body(payload)
+            response = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        with self._lock:
+            self.bytes_sent += len(body)
+        return response, time.perf_counter() - start
+
+    def _record(self, ok, latency=None):
+        with self._lock:
+            if ok:
+                self.sent += 1
+                self.latencies.append(latency)
+            else:
+                self.failed += 1
+        if self.listener is not None:
+            self.listener(ok, latency)
+
+    async def publish(self, payload):
+        """Envia um payload e retorna True em caso de sucesso"""
+        loop = asyncio.get_running_loop()
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        self._active += 1
+        try:
+            response, latency = await loop.run_in_executor(self._executor, self._post, payload)
+        except Exception as e:
+            print(f"❌ Falha ao enviar: {e}")
+            response = None
+        finally:
+            # O envio já terminou quando o listener é chamado: não conta mais em in_flight
+            self._active -= 1
+        if response is None:
+            self._record(False)
+            return False
+
+        if response.status_code == 200:
+            self._record(True, latency)
+            return True
+        print(f"⚠️ Erro {response.status_code}: {response.text}")
+        self._record(False)
+        return False
+
+    async def submit(self, payload):
+        """
+        Agenda o envio sem esperar a resposta. Bloqueia apenas quando já há
+        max_in_flight envios em andamento, aplicando contrapressão à geração.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        await self._slots.acquire()
+        task = asyncio.ensure_future(self.publish(payload))
+        self._pending.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    @property
+    def in_flight(self):
+        """Envios aguardando resposta do endpoint"""
+        return self._active
+
+    def _on_done(self, task):
+        self._pending.discard(task)
+        self._slots.release()
+
+    async def drain(self):
+        """Aguarda todos os envios em andamento"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self):
+        """Vazão (payloads/s) e percentis de latência em segundos (None sem envios bem-sucedidos)"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            sent, failed = self.sent, self.failed
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        return {
+            'sent': sent,
+            'failed': failed,
+            'in_flight': self.in_flight,
+            'bytes_sent': self.bytes_sent,
+            'payloads_per_sec': sent / elapsed if elapsed else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
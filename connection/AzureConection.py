@@ -1,14 +1,38 @@
-from azure.iot.device import IoTHubDeviceClient, Message
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+
+from connection.AsyncPublisher import percentile
+
+# Variável de ambiente lida quando a connection string não é passada
+CONNECTION_STRING_ENV = 'AZURE_IOT_CONNECTION_STRING'
+
+# Limite do IoT Hub é 256 KB por mensagem, incluindo propriedades; fica uma folga
+MAX_MESSAGE_BYTES = 250 * 1024
+
+
+def resolve_connection_string(connection_string=None):
+    """Connection string passada ou de AZURE_IOT_CONNECTION_STRING; ValueError se faltar"""
+    connection_string = connection_string or os.environ.get(CONNECTION_STRING_ENV)
+    if not connection_string:
+        raise ValueError(
+            f"Connection string do IoT Hub não informada: passe connection_string "
+            f"ou defina a variável de ambiente {CONNECTION_STRING_ENV}"
+        )
+    return connection_string
+
 
 class AzureIotConnection:
     def __init__(self, connection_string=None):
-        if connection_string is None:
-            self.connection_string = 'HostName=Grupo09.azure-devices.net;DeviceId=TesteConectsSensor;SharedAccessKey=W2T8NbTMa7mN+86/Had4O3DbTudxACoKYJLNFXphuns='
-        else:
-            self.connection_string = connection_string
+        self.connection_string = resolve_connection_string(connection_string)
         self.device_client = None
 
     def connect(self):
+        from azure.iot.device import IoTHubDeviceClient
+
         self.device_client = IoTHubDeviceClient.create_from_connection_string(self.connection_string)
         self.device_client.connect()
         print("Conectado ao Azure IoT Hub")
@@ -19,9 +43,164 @@ class AzureIotConnection:
             print("Desconectado do Azure IoT Hub")
 
     def send_message(self, data):
+        from azure.iot.device import Message
+
         if self.device_client:
             message = Message(data)
             message.content_encoding = "utf-8"
             message.content_type = "application/json"
             self.device_client.send_message(message)
-            print(f"Mensagem enviada: {data}")
+            print(f"Mensagem enviada: {len(message.data)} bytes")
+
+
+def pack_records(records, max_bytes=MAX_MESSAGE_BYTES):
+    """
+    Agrupa registros em arrays JSON de até max_bytes (UTF-8) cada, na ordem recebida.
+    records pode ser uma lista de registros ou o payload {grupo: [registros]}.
+    Um registro que sozinho passe do limite gera ValueError.
+    """
+    if isinstance(records, dict):
+        records = [record for group in records.values() for record in group]
+
+    parts = []
+    size = 2  # colchetes
+    for record in records:
+        encoded = json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        if len(encoded) + 2 > max_bytes:
+            raise ValueError(f"Registro de {len(encoded)} bytes excede o limite de {max_bytes} bytes")
+        if parts and size + 1 + len(encoded) > max_bytes:
+            yield b'[' + b','.join(parts) + b']', len(parts)
+            parts = []
+            size = 2
+        size += len(encoded) + (1 if parts else 0)
+        parts.append(encoded)
+    if parts:
+        yield b'[' + b','.join(parts) + b']', len(parts)
+
+
+class AsyncAzureIotSender:
+    """
+    Envio assíncrono em lote para o IoT Hub (cliente aio do SDK):
+    - Empacota muitos registros por mensagem, até max_message_bytes, para
+      economizar a cota de mensagens do dispositivo
+    - No máximo max_in_flight envios simultâneos; submit() aguarda quando o limite é atingido
+    - Retentativas com backoff exponencial e jitter (backoff * 2^tentativa, até max_backoff)
+    - Métricas de vazão (mensagens, registros e bytes por segundo) e latência (p50/p95/p99)
+    client permite injetar outro cliente com connect/send_message/disconnect assíncronos
+    (ex.: benchmarks.FakeIotHub.FakeIoTHubClient); message_class idem para a mensagem.
+    Sem client, connection_string (ou AZURE_IOT_CONNECTION_STRING) é obrigatória.
+    """
+    def __init__(self, connection_string=None, client=None, message_class=None,
+                 max_message_bytes=MAX_MESSAGE_BYTES, max_in_flight=4, max_retries=5,
+                 backoff=0.5, max_backoff=30.0, latency_window=10000):
+        self.connection_string = (connection_string if client is not None
+                                  else resolve_connection_string(connection_string))
+        self.client = client
+        self.message_class = message_class
+        self.max_message_bytes = max_message_bytes
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._slots = None
+        self._pending = set()
+        self.latencies = deque(maxlen=latency_window)
+        self.metrics = {'messages': 0, 'records': 0, 'bytes': 0, 'retries': 0, 'failed': 0}
+        self.started_at = None
+
+    async def connect(self):
+        if self.client is None:
+            from azure.iot.device.aio import IoTHubDeviceClient
+
+            self.client = IoTHubDeviceClient.create_from_connection_string(self.connection_string)
+        await self.client.connect()
+        print("Conectado ao Azure IoT Hub")
+
+    async def disconnect(self):
+        await self.drain()
+        if self.client is not None:
+            await self.client.disconnect()
+            print("Desconectado do Azure IoT Hub")
+
+    def _message(self, body):
+        message_class = self.message_class
+        if message_class is None:
+            from azure.iot.device import Message as message_class
+        message = message_class(body)
+        message.content_encoding = "utf-8"
+        message.content_type = "application/json"
+        return message
+
+    async def _send(self, body, num_records):
+        """Envia uma mensagem já empacotada, com retentativas; retorna True em caso de sucesso"""
+        message = self._message(body)
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await self.client.send_message(message)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"❌ Falha ao enviar ao IoT Hub após {attempt + 1} tentativas: {e}")
+                    self.metrics['failed'] += 1
+                    return False
+                self.metrics['retries'] += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                continue
+
+            self.latencies.append(time.perf_counter() - start)
+            self.metrics['messages'] += 1
+            self.metrics['records'] += num_records
+            self.metrics['bytes'] += len(body)
+            return True
+
+    async def submit(self, records):
+        """
+        Empacota os registros e agenda o envio das mensagens sem esperar a resposta.
+        Bloqueia apenas quando já há max_in_flight envios em andamento. Retorna as tarefas.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+
+        tasks = []
+        for body, num_records in pack_records(records, self.max_message_bytes):
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._send(body, num_records))
+            self._pending.add(task)
+            task.add_done_callback(self._on_done)
+            tasks.append(task)
+        return tasks
+
+    async def send(self, records):
+        """Envia os registros e aguarda a confirmação; retorna True se todas as mensagens foram entregues"""
+        tasks = await self.submit(records)
+        results = await asyncio.gather(*tasks)
+        return all(results)
+
+    def _on_done(self, task):
+        self._pending.discard(task)
+        self._slots.release()
+
+    async def drain(self):
+        """Aguarda todos os envios em andamento"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        metrics = self.metrics
+        return {
+            **metrics,
+            'in_flight': len(self._pending),
+            'records_per_message': metrics['records'] / metrics['messages'] if metrics['messages'] else 0.0,
+            'messages_per_sec': metrics['messages'] / elapsed if elapsed else 0.0,
+            'records_per_sec': metrics['records'] / elapsed if elapsed else 0.0,
+            'bytes_per_sec': metrics['bytes'] / elapsed if elapsed else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }
@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from pymysql import Error
+
+from simuladores.Sensor import LOG_EXEC_COLUMNS
+
+# Colunas gravadas como datetime; no spool ficam em ISO 8601
+DATETIME_COLUMNS = ('dt_start_exec', 'dt_end_exec')
+
+
+class LogExecBulkLoader:
+    """
+    Carga em massa na tabela agrosync.log_exec:
+    - Acumula registros de vários sensores e grava tudo numa única transação
+    - mode='values': INSERT com VALUES de múltiplas linhas, em blocos de chunk_size
+    - mode='infile': LOAD DATA LOCAL INFILE a partir de um CSV montado em memória
+      (o conector precisa ser criado com local_infile=True)
+    Com o banco fora do ar, no máximo max_pending registros esperam o próximo
+    flush; os mais antigos além disso vão para o spool ou, sem spool, são
+    descartados (metrics['dropped']). O spool é um PayloadSpool exclusivo do
+    loader (não o do /publish): cada flush bem-sucedido regrava no banco, em
+    ordem, o que transbordou, e replay_spool() faz o mesmo sob demanda.
+    """
+    def __init__(self, mysql_connector, chunk_size=1000, mode='values', table='agrosync.log_exec',
+                 max_pending=100_000, spool=None):
+        if mode not in ('values', 'infile'):
+            raise ValueError(f"Modo de carga desconhecido: {mode}")
+        self.mysql_connector = mysql_connector
+        self.chunk_size = chunk_size
+        self.mode = mode
+        self.table = table
+        self.max_pending = max_pending
+        self.spool = spool
+        self.pending = []
+        self.metrics = {'flushed': 0, 'failed_flushes': 0, 'spilled': 0, 'dropped': 0, 'replayed': 0}
+
+    def add(self, rows):
+        """Enfileira tuplas na ordem de LOG_EXEC_COLUMNS para o próximo flush"""
+        self.pending.extend(rows)
+        self._enforce_limit()
+
+    def _enforce_limit(self):
+        excess = len(self.pending) - self.max_pending
+        if excess <= 0:
+            return
+        overflow, self.pending = self.pending[:excess], self.pending[excess:]
+        if self.spool is not None:
+            self.spool.append({'log_exec': [
+                {column: value.isoformat() if isinstance(value, datetime) else value
+                 for column, value in zip(LOG_EXEC_COLUMNS, row)}
+                for row in overflow
+            ]})
+            self.metrics['spilled'] += len(overflow)
+        else:
+            self.metrics['dropped'] += len(overflow)
+
+    def flush(self):
+        """
+        Grava todos os registros pendentes numa única transação.
+        Retorna o número de linhas gravadas; em caso de erro faz rollback e
+        mantém os registros pendentes (até max_pending) para uma nova tentativa.
+        """
+        if not self.pending:
+            return 0
+
+        rows = self.pending
+        if not self._write(rows):
+            return 0
+
+        self.pending = []
+        self.metrics['flushed'] += len(rows)
+        self.replay_spool()
+        return len(rows)
+
+    def replay_spool(self):
+        """
+        Grava no banco, em ordem, os registros que transbordaram para o spool,
+        um lote por transação; para na primeira falha, mantendo o lote no spool.
+        Retorna o número de linhas gravadas.
+        """
+        if self.spool is None:
+            return 0
+        written = 0
+        for position, data in self.spool.pending():
+            rows = [self._from_spool(record) for record in json.loads(data)['log_exec']]
+            if not self._write(rows):
+                break
+            self.spool.commit(position)
+            written += len(rows)
+        self.metrics['replayed'] += written
+        return written
+
+    @staticmethod
+    def _from_spool(record):
+        return tuple(
+            datetime.fromisoformat(record[column]) if column in DATETIME_COLUMNS and record[column] else record[column]
+            for column in LOG_EXEC_COLUMNS
+        )
+
+    def _write(self, rows):
+        """Grava rows numa única transação; False (com rollback) se o banco falhar"""
+        try:
+            with self.mysql_connector.get_connection() as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        for start in range(0, len(rows), self.chunk_size):
+                            chunk = rows[start:start + self.chunk_size]
+                            if self.mode == 'infile':
+                                self._load_infile(cursor, chunk)
+                            else:
+                                self._insert_values(cursor, chunk)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except (Error, OSError) as e:
+            # OSError cobre falhas de socket e o timeout do pool fora do pymysql
+            print(f"Erro na carga em massa: {e}")
+            self.metrics['failed_flushes'] += 1
+            return False
+        return True
+
+    def load(self, rows):
+        """Atalho para add + flush"""
+        self.add(rows)
+        return self.flush()
+
+    def build_values_statement(self, num_rows):
+        """Monta o INSERT com num_rows grupos de VALUES"""
+        placeholders = "(" + ", ".join(["%s"] * len(LOG_EXEC_COLUMNS)) + ")"
+        return (
+            f"INSERT INTO {self.table} ({', '.join(LOG_EXEC_COLUMNS)}) VALUES "
+            + ", ".join([placeholders] * num_rows)
+        )
+
+    def _insert_values(self, cursor, chunk):
+        params = [value for row in chunk for value in row]
+        cursor.execute(self.build_values_statement(len(chunk)), params)
+
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return r"\N"
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return value
+
+    def build_csv(self, chunk):
+        """Serializa o bloco num buffer CSV em memória"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerows([self._csv_value(value) for value in row] for row in chunk)
+        return buffer
+
+    def _load_infile(self, cursor, chunk):
+        buffer = self.build_csv(chunk)
+        # O driver lê LOCAL INFILE de um caminho; usa memória compartilhada quando existe
+        tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', dir=tmp_dir, encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+            f.flush()
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                "LINES TERMINATED BY '\\n' "
+                f"({', '.join(LOG_EXEC_COLUMNS)})",
+                (f.name,)
+            )
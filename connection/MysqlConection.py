@@ -1,9 +1,21 @@
+import threading
+import time
+from collections import deque
+
 import pymysql
 from pymysql import Error
 from contextlib import contextmanager
 
 class MySQLConnector:
-    def __init__(self, host, database, user, password, **kwargs):
+    def __init__(self, host, database, user, password, pool_size=5, max_idle=300,
+                 checkout_timeout=None, connect=None, **kwargs):
+        """
+        Mantém um pool limitado de conexões persistentes.
+        - pool_size: número máximo de conexões abertas ao mesmo tempo
+        - max_idle: segundos que uma conexão ociosa pode ficar no pool antes de ser descartada
+        - checkout_timeout: segundos de espera por uma conexão livre (None = sem limite)
+        - connect: função no padrão DB-API usada para abrir conexões (padrão pymysql.connect)
+        """
         self.connection_params = {
             'host': host,
             'database': database,
@@ -13,26 +25,122 @@ class MySQLConnector:
             'cursorclass': pymysql.cursors.DictCursor,
             **kwargs
         }
-    
+        self.pool_size = pool_size
+        self.max_idle = max_idle
+        self.checkout_timeout = checkout_timeout
+        self._connect = connect or pymysql.connect
+
+        self._idle = deque()  # (conexão, instante em que foi devolvida)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self.metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'created': 0,
+            'evicted': 0,
+            'discarded': 0,
+        }
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def _new_connection(self):
+        conn = self._connect(**self.connection_params)
+        self._count('created')
+        return conn
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(conn):
+        """Verifica se a conexão ainda responde antes de entregá-la"""
+        try:
+            if hasattr(conn, 'ping'):
+                conn.ping(reconnect=False)
+            else:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            self._count('waits')
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                raise TimeoutError("Nenhuma conexão MySQL livre no pool")
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, released_at = self._idle.pop()
+
+                if time.monotonic() - released_at > self.max_idle:
+                    self._count('evicted')
+                    self._close_quietly(conn)
+                elif self._is_alive(conn):
+                    return conn
+                else:
+                    self._count('discarded')
+                    self._close_quietly(conn)
+
+            return self._new_connection()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, healthy=True):
+        if healthy:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        else:
+            self._count('discarded')
+            self._close_quietly(conn)
+        self._slots.release()
+
     @contextmanager
     def get_connection(self):
         """
-        Fornece uma conexão gerenciada por contexto
+        Fornece uma conexão do pool gerenciada por contexto
         Uso:
         with mysql_connector.get_connection() as conn:
             # operações com a conexão
+        Em caso de erro a conexão é descartada e a próxima retirada abre uma nova.
         """
-        conn = None
+        conn = self._acquire()
+        self._count('checkouts')
         try:
-            conn = pymysql.connect(**self.connection_params)
             yield conn
         except Error as e:
             print(f"Erro MySQL: {e}")
+            self._release(conn, healthy=False)
+            raise
+        except BaseException:
+            self._release(conn, healthy=False)
             raise
-        finally:
-            if conn:
-                conn.close()
-    
+        else:
+            self._release(conn)
+
+    def close(self):
+        """Fecha todas as conexões ociosas do pool"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def pool_metrics(self):
+        """Retorna uma cópia das métricas do pool, incluindo conexões ociosas"""
+        with self._lock:
+            return {**self.metrics, 'idle': len(self._idle)}
+
     def execute_query(self, query, params=None, fetch=False):
         """
         Executa uma query de forma segura
@@ -49,7 +157,7 @@ class MySQLConnector:
                     result = cursor.rowcount
                 conn.commit()
                 return result
-    
+
     def get_next_id(self, table, id_column='id'):
         """
         Obtém o próximo ID disponível para uma tabela
@@ -0,0 +1,169 @@
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+COMPRESSION_SUFFIX = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard)") from e
+    return zstandard
+
+
+class NdjsonWriter:
+    """
+    Gravador local em JSON delimitado por linha (NDJSON):
+    - Mantém um único arquivo aberto, com buffer, em vez de reabrir a cada lote
+    - Flush a cada flush_every registros ou flush_interval segundos
+    - Compressão opcional ('gzip' ou 'zstd')
+    - Rotação por tamanho (max_bytes, não comprimidos) e/ou tempo (max_seconds);
+      com rotação, cada segmento recebe o horário de abertura no nome
+    """
+    def __init__(self, path, compression=None, max_bytes=None, max_seconds=None,
+                 flush_every=1000, flush_interval=1.0, buffer_size=1024 * 1024):
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"Compressão desconhecida: {compression}")
+        self.path = path
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._raw = None
+        self.current_path = None
+        self.written_bytes = 0
+        self.records = 0
+        self._unflushed = 0
+        self._opened_at = 0.0
+        self._last_flush = 0.0
+
+    @property
+    def rotating(self):
+        return self.max_bytes is not None or self.max_seconds is not None
+
+    def _next_path(self):
+        suffix = COMPRESSION_SUFFIX[self.compression]
+        if not self.rotating:
+            return self.path + suffix
+        root, ext = os.path.splitext(self.path)
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        return f"{root}-{stamp}{ext or '.ndjson'}{suffix}"
+
+    def _open(self):
+        self.current_path = self._next_path()
+        directory = os.path.dirname(self.current_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._raw = open(self.current_path, 'ab', buffering=self.buffer_size)
+        if self.compression == 'gzip':
+            self._file = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        elif self.compression == 'zstd':
+            self._file = _zstandard().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._file = self._raw
+        self.written_bytes = 0
+        self._opened_at = self._last_flush = time.monotonic()
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        if self._file is not self._raw:
+            self._file.close()  # finaliza o membro gzip / frame zstd
+        self._raw.close()
+        self._file = self._raw = None
+
+    def _should_rotate(self):
+        if self.max_bytes is not None and self.written_bytes >= self.max_bytes:
+            return True
+        return self.max_seconds is not None and time.monotonic() - self._opened_at >= self.max_seconds
+
+    def write_many(self, records):
+        """Grava uma sequência de registros, um objeto JSON por linha; retorna os bytes gravados"""
+        data = ''.join(
+            json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n' for record in records
+        ).encode('utf-8')
+        if not data:
+            return 0
+
+        with self._lock:
+            if self._file is None:
+                self._open()
+            elif self.rotating and self._should_rotate():
+                self._close_file()
+                self._open()
+
+            self._file.write(data)
+            self.written_bytes += len(data)
+            count = data.count(b'\n')
+            self.records += count
+            self._unflushed += count
+            if (self._unflushed >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+        return len(data)
+
+    def write(self, record):
+        return self.write_many([record])
+
+    def _flush(self):
+        if self._file is not self._raw:
+            self._file.flush()
+        self._raw.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        raw = open(path, 'rb')
+        reader = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def read_ndjson(paths):
+    """
+    Lê registros de um ou mais arquivos NDJSON (comprimidos ou não), um por vez,
+    sem carregar os arquivos inteiros. Aceita caminho, padrão glob ou lista.
+    Uma última linha incompleta (gravação interrompida) é ignorada.
+    """
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(paths)) or [paths]
+
+    for path in paths:
+        with _open_text(path) as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,198 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Exportação Parquet requer o pacote 'pyarrow' (pip install pyarrow)") from e
+    return pyarrow
+
+
+PARTITION_FIELDS = ('region_id', 'sensor_type', 'date')
+
+
+def _partitioning(pa):
+    return pa.dataset.partitioning(
+        pa.schema([('region_id', pa.int64()), ('sensor_type', pa.string()), ('date', pa.string())]),
+        flavor='hive'
+    )
+
+
+class ParquetSink:
+    """
+    Exporta os DataFrames de collect_data para Parquet particionado
+    (region_id=/sensor_type=/date=), acumulando cada partição até row_group_size
+    linhas antes de gravar um row group. sensor_name é gravado com dicionário.
+    Memória e arquivos abertos são limitados:
+    - Quando um sensor_type de uma região passa para uma data nova, as partições
+      das datas anteriores são gravadas e seus arquivos fechados
+    - No máximo max_open_writers arquivos abertos; o menos usado é fechado
+    - Acima de max_buffered_rows linhas acumuladas no total, tudo é gravado
+    Dados atrasados de uma partição já fechada vão para um arquivo novo nela.
+    Um arquivo só fica legível depois de fechado (rollover, limite ou close()).
+    """
+    def __init__(self, base_dir, row_group_size=100_000, compression='zstd', max_open_writers=64,
+                 max_buffered_rows=None):
+        self.pa = _pyarrow()
+        self.base_dir = base_dir
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.max_open_writers = max_open_writers
+        self.max_buffered_rows = max_buffered_rows or row_group_size
+        self._lock = threading.Lock()
+        self._writers = OrderedDict()   # partição -> ParquetWriter, do menos ao mais usado
+        self._buffers = {}   # partição -> lista de tabelas pendentes
+        self._buffered_rows = {}
+        self._total_buffered = 0
+        self.rows_written = 0
+
+    def _to_table(self, data_frame, sensor):
+        pa = self.pa
+        table = pa.Table.from_pandas(data_frame, preserve_index=False)
+        num_rows = table.num_rows
+        table = table.add_column(0, 'sensor_id', pa.array([sensor.sensor_id] * num_rows, pa.int64()))
+        sensor_name = pa.DictionaryArray.from_arrays(
+            pa.array([0] * num_rows, pa.int32()), pa.array([sensor.sensor_name])
+        )
+        return table.add_column(1, 'sensor_name', sensor_name)
+
+    def write(self, data_frame, sensor):
+        """Acrescenta o lote de um sensor às partições correspondentes"""
+        if data_frame.empty:
+            return
+        dates = data_frame['timestamp'].dt.strftime('%Y-%m-%d')
+
+        with self._lock:
+            for date, rows in data_frame.groupby(dates, sort=False):
+                key = (sensor.region_id, sensor.sensor_type, date)
+                self._close_older_dates(key)
+                self._buffers.setdefault(key, []).append(self._to_table(rows, sensor))
+                self._buffered_rows[key] = self._buffered_rows.get(key, 0) + len(rows)
+                self._total_buffered += len(rows)
+                if self._buffered_rows[key] >= self.row_group_size:
+                    self._flush_partition(key)
+            if self._total_buffered >= self.max_buffered_rows:
+                for key in list(self._buffers):
+                    self._flush_partition(key)
+
+    def _close_older_dates(self, key):
+        """Grava e fecha as partições de datas anteriores do mesmo region_id/sensor_type"""
+        for other in [k for k in {*self._buffers, *self._writers} if k[:2] == key[:2] and k[2] < key[2]]:
+            self._close_partition(other)
+
+    def _close_partition(self, key):
+        self._flush_partition(key)
+        writer = self._writers.pop(key, None)
+        if writer is not None:
+            writer.close()
+
+    def _flush_partition(self, key):
+        tables = self._buffers.pop(key, None)
+        self._total_buffered -= self._buffered_rows.pop(key, 0)
+        if not tables:
+            return
+        pa = self.pa
+        table = pa.concat_tables(tables)
+
+        writer = self._writers.get(key)
+        if writer is None:
+            while len(self._writers) >= self.max_open_writers:
+                self._close_partition(next(iter(self._writers)))
+            directory = os.path.join(
+                self.base_dir, *(f"{field}={value}" for field, value in zip(PARTITION_FIELDS, key))
+            )
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+            writer = pa.parquet.ParquetWriter(
+                path, table.schema, compression=self.compression, use_dictionary=['sensor_name']
+            )
+            self._writers[key] = writer
+        self._writers.move_to_end(key)
+        writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows_written += table.num_rows
+
+    def flush(self):
+        """Grava em row groups tudo o que estiver acumulado"""
+        with self._lock:
+            for key in list(self._buffers):
+                self._flush_partition(key)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_parquet(base_dir, start=None, end=None, sensor_ids=None, sensor_names=None,
+                 region_id=None, sensor_type=None, columns=None):
+    """
+    Lê o dataset particionado aplicando os filtros no próprio scan: as partições
+    (região, tipo, data) são podadas pelo caminho e o intervalo [start, end) e os
+    sensores usam as estatísticas dos row groups. Retorna um DataFrame pandas.
+    """
+    pa = _pyarrow()
+    ds = pa.dataset
+    partitioning = _partitioning(pa)
+
+    type_dirs = [
+        os.path.join(region_dir, type_dir)
+        for region_dir in _subdirs(base_dir, 'region_id', region_id)
+        for type_dir in _subdirs(region_dir, 'sensor_type', sensor_type)
+    ]
+    if not type_dirs:
+        return pa.table({}).to_pandas()
+    # Cada tipo de sensor tem colunas próprias; a união unifica os esquemas
+    dataset = ds.dataset([
+        ds.dataset(path, format='parquet', partitioning=partitioning,
+                   partition_base_dir=base_dir)
+        for path in type_dirs
+    ])
+
+    condition = None
+
+    def _and(expression):
+        return expression if condition is None else condition & expression
+
+    if start is not None:
+        condition = _and(ds.field('date') >= _as_datetime(start).strftime('%Y-%m-%d'))
+        condition = _and(ds.field('timestamp') >= pa.scalar(_as_datetime(start), pa.timestamp('us')))
+    if end is not None:
+        condition = _and(ds.field('date') <= _as_datetime(end).strftime('%Y-%m-%d'))
+        condition = _and(ds.field('timestamp') < pa.scalar(_as_datetime(end), pa.timestamp('us')))
+    if sensor_ids is not None:
+        condition = _and(ds.field('sensor_id').isin(list(sensor_ids)))
+    if sensor_names is not None:
+        condition = _and(ds.field('sensor_name').isin(list(sensor_names)))
+
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def _subdirs(directory, field, value):
+    if value is not None:
+        path = os.path.join(directory, f"{field}={value}")
+        return [path] if os.path.isdir(path) else []
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, name) for name in sorted(os.listdir(directory))
+        if name.startswith(f"{field}=")
+    ]
+
+
+def _as_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
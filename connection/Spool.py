@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from connection.TimeSeriesCodec import is_block_stream
+
+
+class PayloadSpool:
+    """
+    Spool em disco (write-ahead) entre a geração e o envio dos payloads:
+    - Log append-only dividido em segmentos de até segment_bytes
+    - fsync em lote a cada fsync_every registros ou fsync_interval segundos
+    - Cursor persistido com o mesmo lote (e sempre no close()): após reiniciar, o
+      replay continua de onde parou, reenviando no máximo os últimos fsync_every
+    - pending_count(): payloads no disco após o cursor, já descontada a retenção
+    - wait_for_data(): corrotina acordada por append(), para drenar sem polling
+    - Retenção por tamanho total (max_bytes) e idade dos segmentos (max_age, em segundos)
+    Cada registro é gravado como: tamanho (4 bytes), crc32 (4 bytes), timestamp (8 bytes) e payload.
+    Payloads em bytes do TimeSeriesCodec são devolvidos como bytes no replay; os demais, como JSON.
+    """
+    HEADER = struct.Struct('<IId')
+    CURSOR_FILE = 'cursor'
+
+    def __init__(self, directory, segment_bytes=16 * 1024 * 1024, max_bytes=1024 * 1024 * 1024,
+                 max_age=None, fsync_every=100, fsync_interval=1.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._uncommitted = 0
+        self._last_commit_save = time.monotonic()
+        self._pending = 0
+        self._waiters = []   # (loop, asyncio.Event) de wait_for_data
+        self.metrics = {'appended': 0, 'replayed': 0, 'dropped_segments': 0, 'dropped_bytes': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = sorted(
+            int(name[:-4]) for name in os.listdir(directory) if name.endswith('.log')
+        )
+        self._cursor = self._load_cursor()
+        # Sempre abre um segmento novo, para nunca continuar após um registro truncado
+        self._open_segment((self._segments[-1] + 1) if self._segments else 0)
+        if self._cursor is None:
+            self._cursor = (self._segments[0], 0)
+        self._enforce_retention()
+        self._pending = self._count_pending()
+
+    def _segment_path(self, seq):
+        return os.path.join(self.directory, f"{seq:020d}.log")
+
+    def _load_cursor(self):
+        try:
+            with open(os.path.join(self.directory, self.CURSOR_FILE), encoding='utf-8') as f:
+                seq, offset = f.read().split()
+                return int(seq), int(offset)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, self.CURSOR_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f"{self._cursor[0]} {self._cursor[1]}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _open_segment(self, seq):
+        self._active_seq = seq
+        self._active = open(self._segment_path(seq), 'ab')
+        if seq not in self._segments:
+            self._segments.append(seq)
+
+    def _sync(self):
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, payload):
+        """Grava um payload (dict, str ou bytes) no final do log"""
+        if isinstance(payload, bytes):
+            data = payload
+        elif isinstance(payload, str):
+            data = payload.encode('utf-8')
+        else:
+            data = json.dumps(payload).encode('utf-8')
+        header = self.HEADER.pack(len(data), zlib.crc32(data), time.time())
+
+        with self._lock:
+            if self._active.tell() >= self.segment_bytes:
+                self._sync()
+                self._active.close()
+                self._open_segment(self._active_seq + 1)
+                self._enforce_retention()
+
+            self._active.write(header + data)
+            self.metrics['appended'] += 1
+            self._pending += 1
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            waiters = list(self._waiters)
+
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def pending_count(self):
+        """Payloads gravados após o cursor, ainda não entregues"""
+        with self._lock:
+            return self._pending
+
+    def _count_pending(self):
+        with self._lock:
+            self._active.flush()
+            seq, offset = self._cursor
+            return sum(
+                1 for segment in self._segments if segment >= seq
+                for _ in self._read_segment(segment, offset if segment == seq else 0)
+            )
+
+    async def wait_for_data(self, timeout=None):
+        """Aguarda até haver payload pendente (acordada por append); False se der timeout"""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, asyncio.Event())
+        with self._lock:
+            self._waiters.append(waiter)
+        try:
+            if self.pending_count():
+                return True
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
+
+    def flush(self):
+        """Força o fsync dos registros ainda não sincronizados"""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def _read_segment(self, seq, offset):
+        """Lê os registros íntegros de um segmento a partir de offset"""
+        try:
+            with open(self._segment_path(seq), 'rb') as f:
+                f.seek(offset)
+                while True:
+                    header = f.read(self.HEADER.size)
+                    if len(header) < self.HEADER.size:
+                        return
+                    length, crc, _ = self.HEADER.unpack(header)
+                    data = f.read(length)
+                    if len(data) < length or zlib.crc32(data) != crc:
+                        return
+                    offset += self.HEADER.size + length
+                    yield (seq, offset), data
+        except FileNotFoundError:
+            return
+
+    def pending(self, limit=None):
+        """
+        Itera (posição, payload em bytes) a partir do cursor, em ordem de gravação.
+        A posição deve ser passada a commit() depois que o payload for entregue.
+        """
+        with self._lock:
+            self._active.flush()
+            seq, offset = self._cursor
+            segments = [s for s in self._segments if s >= seq]
+
+        count = 0
+        for segment in segments:
+            for position, data in self._read_segment(segment, offset if segment == seq else 0):
+                yield position, data
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def commit(self, position):
+        """
+        Avança o cursor e remove os segmentos já consumidos por completo. O cursor
+        vai para o disco a cada fsync_every commits ou fsync_interval segundos.
+        """
+        with self._lock:
+            seq, offset = position
+            if seq not in self._segments:
+                return  # segmento já descartado pela retenção
+            self._cursor = position
+            if seq != self._active_seq and offset >= os.path.getsize(self._segment_path(seq)):
+                self._cursor = (min(s for s in self._segments if s > seq), 0)
+            for old in [s for s in self._segments if s < self._cursor[0]]:
+                self._remove_segment(old)
+            self.metrics['replayed'] += 1
+            self._pending = max(0, self._pending - 1)
+            self._uncommitted += 1
+            if (self._uncommitted >= self.fsync_every
+                    or time.monotonic() - self._last_commit_save >= self.fsync_interval):
+                self._persist_cursor()
+
+    def _persist_cursor(self):
+        self._save_cursor()
+        self._uncommitted = 0
+        self._last_commit_save = time.monotonic()
+
+    def _remove_segment(self, seq):
+        try:
+            os.remove(self._segment_path(seq))
+        except FileNotFoundError:
+            pass
+        self._segments.remove(seq)
+
+    def _enforce_retention(self):
+        """Descarta os segmentos mais antigos que excedem o limite de tamanho ou idade"""
+        now = time.time()
+        sizes = {seq: os.path.getsize(self._segment_path(seq)) for seq in self._segments}
+        total = sum(sizes.values())
+        dropped = False
+
+        for seq in list(self._segments):
+            if seq == self._active_seq:
+                break
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            too_old = (self.max_age is not None
+                       and now - os.path.getmtime(self._segment_path(seq)) > self.max_age)
+            if not (too_big or too_old):
+                break
+            self._remove_segment(seq)
+            dropped = True
+            total -= sizes[seq]
+            self.metrics['dropped_segments'] += 1
+            self.metrics['dropped_bytes'] += sizes[seq]
+
+        if self._cursor[0] not in self._segments:
+            self._cursor = (self._segments[0], 0)
+            self._persist_cursor()
+        if dropped:
+            self._pending = self._count_pending()
+
+    def size_bytes(self):
+        with self._lock:
+            self._active.flush()
+            return sum(os.path.getsize(self._segment_path(seq)) for seq in self._segments)
+
+    async def replay(self, send, rate=None, limit=None):
+        """
+        Reenvia os payloads pendentes em ordem usando a corrotina send(payload) -> bool.
+        rate limita a vazão em payloads por segundo. Para na primeira falha,
+        mantendo o payload no spool. Retorna quantos foram entregues.
+        """
+        delivered = 0
+        for position, data in self.pending(limit):
+            if not await send(data if is_block_stream(data) else json.loads(data)):
+                break
+            self.commit(position)
+            delivered += 1
+            if rate:
+                await asyncio.sleep(1 / rate)
+        return delivered
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            self._active.close()
+            if self._uncommitted:
+                self._persist_cursor()
@@ -0,0 +1,434 @@
+"""
+Codec de séries temporais (estilo Gorilla) para os lotes de um sensor.
+
+Um bloco guarda as colunas de um lote (DataFrame ou {coluna: array} de
+collect_data / collect_batch / backfill) sem perda:
+- timestamp: intervalo fixo vira só (t0, passo); senão t0 + delta-of-delta em
+  microssegundos com prefixos de tamanho variável ('0' = mesmo intervalo)
+- canais: XOR de cada valor com o anterior ('0' = valor repetido). Os bits
+  significativos reaproveitam a janela (zeros à esquerda/direita) do XOR não
+  nulo anterior quando cabem nela ('10'); senão levam a janela nova ('11' +
+  5 bits de zeros à esquerda + 6 bits de tamanho). Leituras já arredondadas
+  são codificadas em escala decimal (6.76 -> 676.0), o que deixa o XOR com
+  poucos bits significativos; a decodificação divide de volta exatamente.
+A codificação é vetorizada em NumPy; a decodificação lê os campos em sequência.
+
+Cada bloco é autodelimitado (MAGIC + tamanhos), então blocos podem ser
+concatenados num arquivo, no spool ou num corpo HTTP:
+- BlockWriter: sink de arquivo, com write(data_frame, sensor) como o ParquetSink
+- BlockDecoder.feed(): decodificação incremental de pedaços de bytes
+- iter_blocks(): lê blocos de um caminho, arquivo ou iterável de bytes
+"""
+import json
+import math
+import struct
+import threading
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+MAGIC = b'AGTS'
+VERSION = 1
+CONTENT_TYPE = 'application/vnd.agrosync.timeseries'
+# MAGIC, versão, tamanho do cabeçalho JSON, tamanho das seções binárias
+FRAME = struct.Struct('<4sBII')
+
+# Prefixos do delta-of-delta: (prefixo, bits do prefixo, bits do valor em zigzag)
+DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 14), (0b1110, 4, 24), (0b11110, 5, 40), (0b11111, 5, 64))
+
+
+class Block(NamedTuple):
+    sensor_type: str
+    sensor_id: int
+    region_id: int
+    columns: dict   # timestamp (datetime64[us]) e um np.ndarray float64 por canal
+    sensor_names: dict = None   # {canal: sensor_name do log_exec}
+    metrics: dict = None        # ram_usage/process_usage no momento da codificação
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.columns)
+
+
+def _bit_length(x):
+    """int.bit_length vetorizado para uint64"""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= np.uint64(1 << shift)
+        length += big * shift
+        x = np.where(big, x >> np.uint64(shift), x)
+    return length + (x > 0)
+
+
+def _pack(values, widths):
+    """Concatena os campos (valor, largura em bits) em bytes, do bit mais significativo"""
+    values = np.asarray(values, dtype=np.uint64)
+    widths = np.asarray(widths, dtype=np.int64)
+    used = widths > 0
+    values, widths = values[used], widths[used]
+    total = int(widths.sum())
+    words = np.zeros(total // 64 + 2, dtype=np.uint64)
+    if total:
+        offsets = np.cumsum(widths) - widths
+        word, bit = offsets // 64, offsets % 64
+        end = bit + widths
+        fits = end <= 64
+        # Campos inteiros dentro de uma palavra
+        np.bitwise_or.at(words, word[fits], values[fits] << (64 - end[fits]).astype(np.uint64))
+        # Campos que atravessam a palavra: parte alta nesta, parte baixa na seguinte
+        split = ~fits
+        spill = end[split] - 64
+        np.bitwise_or.at(words, word[split], values[split] >> spill.astype(np.uint64))
+        np.bitwise_or.at(words, word[split] + 1, values[split] << (64 - spill).astype(np.uint64))
+    return words.astype('>u8').tobytes()[:(total + 7) // 8]
+
+
+class _BitReader:
+    __slots__ = ('data', 'position')
+
+    def __init__(self, data):
+        self.data = bytes(data) + bytes(9)
+        self.position = 0
+
+    def read(self, width):
+        position = self.position
+        start = position >> 3
+        chunk = int.from_bytes(self.data[start:start + 9], 'big')
+        self.position = position + width
+        return (chunk >> (72 - (position & 7) - width)) & ((1 << width) - 1)
+
+
+# ---------------------------------------------------------------- timestamps
+
+def encode_timestamps(microseconds):
+    """Seção dos timestamps (int64 µs): ({modo, ...}, bytes)"""
+    microseconds = np.asarray(microseconds, dtype=np.int64)
+    n = len(microseconds)
+    if n == 0:
+        return {'mode': 'regular', 't0': 0, 'step': 0}, b''
+    deltas = np.diff(microseconds)
+    if n == 1 or (deltas == deltas[0]).all():
+        return {'mode': 'regular', 't0': int(microseconds[0]), 'step': int(deltas[0]) if n > 1 else 0}, b''
+
+    dod = np.diff(deltas, prepend=0)
+    zigzag = ((dod << 1) ^ (dod >> 63)).view(np.uint64)
+    prefix, prefix_bits = np.zeros(len(dod), dtype=np.uint64), np.ones(len(dod), dtype=np.int64)
+    value_bits = np.zeros(len(dod), dtype=np.int64)
+    pending = dod != 0
+    for code, code_bits, bits in DOD_BUCKETS:
+        here = pending & ((zigzag < np.uint64(1 << bits)) if bits < 64 else True)
+        prefix[here], prefix_bits[here], value_bits[here] = code, code_bits, bits
+        pending &= ~here
+
+    values = np.column_stack((prefix, zigzag)).ravel()
+    widths = np.column_stack((prefix_bits, value_bits)).ravel()
+    return {'mode': 'dod', 't0': int(microseconds[0])}, _pack(values, widths)
+
+
+def decode_timestamps(meta, data, n):
+    if meta['mode'] == 'regular':
+        return meta['t0'] + meta['step'] * np.arange(n, dtype=np.int64)
+
+    reader = _BitReader(data)
+    read = reader.read
+    # Aritmética módulo 2**64, como a do int64 na codificação
+    mask = (1 << 64) - 1
+    value, delta = meta['t0'] & mask, 0
+    out = [value]
+    for _ in range(n - 1):
+        if read(1):
+            bits = 64
+            for _, _, width in DOD_BUCKETS[:-1]:
+                if not read(1):
+                    bits = width
+                    break
+            zigzag = read(bits)
+            delta = (delta + ((zigzag >> 1) ^ -(zigzag & 1))) & mask
+        value = (value + delta) & mask
+        out.append(value)
+    return np.array(out, dtype=np.uint64).view(np.int64)
+
+
+# ------------------------------------------------------------------- valores
+
+def encode_floats(values):
+    """Seção de um canal float64 em XOR: ({modo, ...}, bytes)"""
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64)
+    n = len(bits)
+    if n == 0 or (bits == bits[0]).all():
+        return {'mode': 'constant', 'bits': int(bits[0]) if n else 0}, b''
+
+    xor = bits[1:] ^ bits[:-1]
+    nonzero = xor != 0
+    bit_length = _bit_length(xor)
+    leading = np.minimum(64 - bit_length, 31)
+    trailing = np.where(nonzero, _bit_length(xor & (~xor + np.uint64(1))) - 1, 0)
+
+    # Janela de referência: a do XOR não nulo anterior (propagada para frente)
+    previous = np.where(nonzero, np.arange(len(xor)), -1)
+    previous = np.maximum.accumulate(previous)
+    previous = np.concatenate(([-1], previous[:-1]))
+    has_reference = previous >= 0
+    reference = np.maximum(previous, 0)
+    ref_leading, ref_trailing = leading[reference], trailing[reference]
+    reuse = nonzero & has_reference & (leading >= ref_leading) & (trailing >= ref_trailing)
+    fresh = nonzero & ~reuse
+
+    window_leading = np.where(reuse, ref_leading, leading)
+    window_trailing = np.where(reuse, ref_trailing, trailing)
+    length = 64 - window_leading - window_trailing
+    meaningful = np.where(nonzero, xor >> window_trailing.astype(np.uint64), np.uint64(0))
+
+    control = np.where(reuse, 0b10, np.where(fresh, 0b11, 0)).astype(np.uint64)
+    control_bits = np.where(nonzero, 2, 1)
+    header = np.where(fresh, (leading.astype(np.uint64) << np.uint64(6)) | (length - 1).astype(np.uint64),
+                      np.uint64(0))
+    header_bits = np.where(fresh, 11, 0)
+    fields = np.column_stack((control, header, meaningful))
+    widths = np.column_stack((control_bits, header_bits, np.where(nonzero, length, 0)))
+    return {'mode': 'xor', 'first': int(bits[0])}, _pack(fields.ravel(), widths.ravel())
+
+
+def decode_floats(meta, data, n):
+    if meta['mode'] == 'constant':
+        return np.full(n, meta['bits'], dtype=np.uint64).view(np.float64)
+
+    reader = _BitReader(data)
+    read = reader.read
+    value = meta['first']
+    out = [value]
+    leading = trailing = 0
+    for _ in range(n - 1):
+        if read(1):
+            if read(1):
+                leading = read(5)
+                length = read(6) + 1
+                trailing = 64 - leading - length
+                xor = read(length) << trailing
+            else:
+                xor = read(64 - leading - trailing) << trailing
+            value ^= xor
+            # A janela de referência do próximo valor é a deste XOR
+            trailing = (xor & -xor).bit_length() - 1
+            leading = min(64 - xor.bit_length(), 31)
+        out.append(value)
+    return np.array(out, dtype=np.uint64).view(np.float64)
+
+
+# -------------------------------------------------------------------- blocos
+
+def encode_block(data_frame, sensor=None):
+    """
+    Codifica um lote (DataFrame ou {coluna: array} com 'timestamp') num bloco
+    autodelimitado. sensor (opcional) fornece sensor_type, sensor_id e region_id.
+    """
+    from connection.WireFormat import _decimal_scale
+
+    timestamps = np.asarray(data_frame['timestamp'], dtype='datetime64[us]').astype(np.int64)
+    n = len(timestamps)
+    timestamp_meta, timestamp_data = encode_timestamps(timestamps)
+    timestamp_meta['bytes'] = len(timestamp_data)
+    sections = [timestamp_data]
+
+    sensor_names, metrics = _log_exec_info(data_frame, sensor)
+    columns = []
+    for name in data_frame.keys():
+        if name == 'timestamp':
+            continue
+        values = np.asarray(data_frame[name], dtype=np.float64)
+        digits = _decimal_scale(values) if n else None
+        scaled = np.round(values * 10 ** digits) if digits is not None else values
+        meta, section = encode_floats(scaled)
+        meta.update(name=name, scale=digits, bytes=len(section), sensor_name=sensor_names.get(name))
+        columns.append(meta)
+        sections.append(section)
+
+    header = json.dumps({
+        'sensor_type': getattr(sensor, 'sensor_type', None),
+        'sensor_id': getattr(sensor, 'sensor_id', None),
+        'region_id': getattr(sensor, 'region_id', None),
+        'n': n,
+        'timestamp': timestamp_meta,
+        'columns': columns,
+        'metrics': metrics,
+    }, separators=(',', ':')).encode('utf-8')
+    body = b''.join(sections)
+    return FRAME.pack(MAGIC, VERSION, len(header), len(body)) + header + body
+
+
+def _log_exec_info(data_frame, sensor):
+    """sensor_name de cada canal e métricas do sistema, para voltar a registros log_exec"""
+    if sensor is None:
+        return {}, None
+    names = {
+        col: f"{sensor.sensor_type} {element}" if element else sensor.sensor_type
+        for element, col in sensor._elements(data_frame)
+    }
+    metrics = sensor._get_system_metrics()
+    return names, {'ram_usage': round(metrics['mem_mb'], 2), 'process_usage': metrics['cpu_usage']}
+
+
+def _frame_size(data, offset=0):
+    """Tamanho total do bloco que começa em offset, ou None se o cabeçalho ainda não chegou"""
+    if len(data) - offset < FRAME.size:
+        return None
+    magic, version, header_size, body_size = FRAME.unpack_from(data, offset)
+    if magic != MAGIC:
+        raise ValueError("Dados não são um bloco do codec de séries temporais")
+    if version != VERSION:
+        raise ValueError(f"Versão de bloco não suportada: {version}")
+    return FRAME.size + header_size + body_size
+
+
+def decode_block(data):
+    """Inverso de encode_block; retorna um Block"""
+    _, _, header_size, _ = FRAME.unpack_from(data)
+    header = json.loads(bytes(data[FRAME.size:FRAME.size + header_size]))
+    n = header['n']
+    offset = FRAME.size + header_size
+
+    timestamp_meta = header['timestamp']
+    microseconds = decode_timestamps(timestamp_meta, data[offset:offset + timestamp_meta['bytes']], n)
+    offset += timestamp_meta['bytes']
+    columns = {'timestamp': microseconds.astype('datetime64[us]')}
+    sensor_names = {}
+    for meta in header['columns']:
+        values = decode_floats(meta, data[offset:offset + meta['bytes']], n)
+        offset += meta['bytes']
+        if meta['scale'] is not None:
+            values = values / 10 ** meta['scale']
+        columns[meta['name']] = values
+        if meta.get('sensor_name'):
+            sensor_names[meta['name']] = meta['sensor_name']
+    return Block(header['sensor_type'], header['sensor_id'], header['region_id'], columns,
+                 sensor_names, header.get('metrics'))
+
+
+def is_block_stream(data):
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:len(MAGIC)]) == MAGIC
+
+
+class BlockDecoder:
+    """Decodificação incremental: feed() recebe pedaços de bytes e retorna os blocos completos"""
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        blocks = []
+        offset = 0
+        while True:
+            size = _frame_size(self._buffer, offset)
+            if size is None or len(self._buffer) - offset < size:
+                break
+            blocks.append(decode_block(bytes(self._buffer[offset:offset + size])))
+            offset += size
+        del self._buffer[:offset]
+        return blocks
+
+    @property
+    def pending_bytes(self):
+        """Bytes de um bloco ainda incompleto"""
+        return len(self._buffer)
+
+
+def decode_stream(data):
+    """Todos os blocos de bytes concatenados (ex.: corpo HTTP ou registro do spool)"""
+    decoder = BlockDecoder()
+    blocks = decoder.feed(data)
+    if decoder.pending_bytes:
+        raise ValueError("Bloco incompleto no fim dos dados")
+    return blocks
+
+
+def iter_blocks(source, chunk_size=64 * 1024):
+    """
+    Lê blocos, um por vez, de um caminho, arquivo binário ou iterável de bytes.
+    Um último bloco incompleto (gravação interrompida) é ignorado.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            yield from iter_blocks(f, chunk_size)
+        return
+    chunks = iter(lambda: source.read(chunk_size), b'') if hasattr(source, 'read') else source
+
+    decoder = BlockDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+
+
+def to_json_payload(data):
+    """
+    Blocos como o payload JSON do /publish: {sensor_type: [registros log_exec]},
+    um registro por leitura e canal, na ordem de Sensor._save_to_json. Usado
+    quando o servidor não aceita o codec. Leituras NaN (suprimidas pelo deadband)
+    não geram registro; blocos gravados sem sensor usam o nome da coluna como
+    sensor_name e ficam sem métricas.
+    """
+    dt_end_exec = datetime.now().isoformat()
+    payload = {}
+    for block in decode_stream(data):
+        columns = block.columns
+        names = block.sensor_names or {name: name for name in columns if name != 'timestamp'}
+        metrics = block.metrics or {'ram_usage': None, 'process_usage': None}
+        timestamps = columns['timestamp'].astype(datetime).tolist()
+        channels = [(name, columns[name].tolist()) for name in names]
+        records = payload.setdefault(block.sensor_type, [])
+        for i, ts in enumerate(timestamps):
+            dt_exec, dt_start_exec = ts.strftime('%Y-%m-%d'), ts.isoformat()
+            records.extend(
+                {
+                    'id_sensor': block.sensor_id,
+                    'valor': values[i],
+                    'dt_exec': dt_exec,
+                    'dt_start_exec': dt_start_exec,
+                    'dt_end_exec': dt_end_exec,
+                    'qtd_data': len(timestamps),
+                    'ram_usage': metrics['ram_usage'],
+                    'process_usage': metrics['process_usage'],
+                    'sensor_name': names[name],
+                }
+                for name, values in channels if not math.isnan(values[i])
+            )
+    return payload
+
+
+class BlockWriter:
+    """
+    Sink de arquivo: anexa um bloco por lote (write(data_frame, sensor), como o
+    ParquetSink) a um arquivo aberto com buffer. Lido de volta com iter_blocks().
+    """
+    def __init__(self, path, buffer_size=1024 * 1024):
+        self.path = path
+        self._file = open(path, 'ab', buffering=buffer_size)
+        self._lock = threading.Lock()
+        self.blocks = 0
+        self.readings = 0
+        self.written_bytes = 0
+
+    def write(self, data_frame, sensor=None):
+        """Grava o lote como um bloco; retorna os bytes gravados"""
+        block = encode_block(data_frame, sensor)
+        with self._lock:
+            self._file.write(block)
+            self.blocks += 1
+            self.readings += len(data_frame['timestamp'])
+            self.written_bytes += len(block)
+        return len(block)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
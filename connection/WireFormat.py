@@ -0,0 +1,240 @@
+"""
+Formato binário compacto para o payload de /publish.
+
+O payload JSON ({grupo: [registro log_exec, ...]}) repete em cada registro
+as chaves, o timestamp ISO completo e o nome do sensor. Aqui cada grupo vira
+um conjunto de colunas:
+- valor: inteiros em escala decimal quando as leituras já vêm arredondadas
+  (sem perda, menor que float32); senão float32 empacotado
+- dt_start_exec: microssegundos do primeiro registro + deltas inteiros
+- dt_exec: omitida quando é a data de dt_start_exec
+- sensor_name: códigos numa tabela de strings compartilhada pelo payload
+- demais colunas: constante, quando o valor se repete, ou dicionário + códigos
+O resultado é serializado em MessagePack, com compressão opcional (gzip ou zstd).
+
+encode_body() monta corpo e cabeçalhos para o formato escolhido; um servidor
+que não aceite o formato responde 415 e o envio volta para JSON. O formato
+'timeseries' envia como estão os blocos do TimeSeriesCodec (lotes por sensor).
+"""
+import gzip
+import json
+from datetime import datetime
+
+import numpy as np
+
+from connection.TimeSeriesCodec import CONTENT_TYPE as TIMESERIES_CONTENT_TYPE
+from connection.TimeSeriesCodec import decode_stream, is_block_stream, to_json_payload
+
+JSON_CONTENT_TYPE = 'application/json'
+COLUMNAR_CONTENT_TYPE = 'application/vnd.agrosync.columnar+msgpack'
+FORMATS = ('json', 'columnar', 'timeseries')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+# Status com que o servidor recusa o formato; o cliente volta para JSON
+UNSUPPORTED_STATUS = (406, 415)
+
+VERSION = 1
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError("Formato colunar requer o pacote 'msgpack' (pip install msgpack)") from e
+    return msgpack
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard)") from e
+    return zstandard
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _decimal_scale(values, max_digits=6):
+    """Menor número de casas decimais que representa exatamente todos os valores, ou None"""
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values).all():
+        return None
+    for digits in range(max_digits + 1):
+        scaled = np.round(values * 10 ** digits)
+        if np.abs(scaled).max(initial=0) >= 2 ** 53:
+            return None
+        if np.array_equal(scaled / 10 ** digits, values):
+            return digits
+    return None
+
+
+def _encode_column(name, values, start_us, strings):
+    if name == 'valor' and all(map(_is_number, values)):
+        digits = _decimal_scale(values)
+        if digits is not None:
+            return {'q': digits, 'i': np.round(np.asarray(values) * 10 ** digits).astype(np.int64).tolist()}
+        return {'f32': np.asarray(values, dtype='<f4').tobytes()}
+
+    if name == 'dt_start_exec' and start_us is not None:
+        deltas = np.diff(start_us, prepend=start_us[:1])
+        return {'t0': int(start_us[0]), 'dt': deltas.tolist()}
+
+    if name == 'dt_exec' and start_us is not None:
+        dates = np.asarray(start_us, dtype='datetime64[us]').astype('datetime64[D]').astype(str)
+        if list(values) == dates.tolist():
+            return {'date_of': 'dt_start_exec'}
+
+    if name == 'sensor_name':
+        codes = []
+        for value in values:
+            if value not in strings:
+                strings[value] = len(strings)
+            codes.append(strings[value])
+        return {'s': codes}
+
+    first = values[0]
+    if all(value == first for value in values):
+        return {'c': first}
+    table = {}
+    codes = [table.setdefault(value, len(table)) for value in values]
+    return {'d': list(table), 'i': codes}
+
+
+def _timestamps_us(values):
+    """Microssegundos dos timestamps ISO, ou None se a coluna não for só de timestamps"""
+    if not all(isinstance(value, str) for value in values):
+        return None
+    try:
+        timestamps = np.array(values, dtype='datetime64[us]')
+    except ValueError:
+        return None
+    # Só usa deltas se a decodificação reproduzir o texto original (ex.: sem fuso horário)
+    if [ts.isoformat() for ts in timestamps.astype(datetime)] != list(values):
+        return None
+    return timestamps.astype(np.int64)
+
+
+def to_columnar(payload):
+    """Converte {grupo: [registros]} na estrutura colunar (sem serializar)"""
+    strings = {}
+    groups = {}
+    for group, records in payload.items():
+        if not records:
+            groups[group] = {'n': 0, 'keys': [], 'columns': {}}
+            continue
+        keys = list(records[0])
+        columns = {key: [record[key] for record in records] for key in keys}
+        start_us = _timestamps_us(columns['dt_start_exec']) if 'dt_start_exec' in columns else None
+        groups[group] = {
+            'n': len(records),
+            'keys': keys,
+            'columns': {key: _encode_column(key, values, start_us, strings) for key, values in columns.items()},
+        }
+    return {'v': VERSION, 'strings': list(strings), 'groups': groups}
+
+
+def _decode_column(encoded, n, strings, columns):
+    if 'q' in encoded:
+        return (np.asarray(encoded['i'], dtype=float) / 10 ** encoded['q']).tolist()
+    if 'f32' in encoded:
+        return np.frombuffer(encoded['f32'], dtype='<f4').astype(float).tolist()
+    if 't0' in encoded:
+        start_us = encoded['t0'] + np.cumsum(encoded['dt'], dtype=np.int64)
+        return [ts.isoformat() for ts in start_us.astype('datetime64[us]').astype(datetime)]
+    if 'date_of' in encoded:
+        return [value[:10] for value in columns[encoded['date_of']]]
+    if 's' in encoded:
+        return [strings[code] for code in encoded['s']]
+    if 'c' in encoded:
+        return [encoded['c']] * n
+    table = encoded['d']
+    return [table[code] for code in encoded['i']]
+
+
+def from_columnar(data):
+    """Reconstrói {grupo: [registros]} a partir da estrutura colunar"""
+    strings = data['strings']
+    payload = {}
+    for group, encoded in data['groups'].items():
+        n = encoded['n']
+        columns = {}
+        # dt_exec pode depender de dt_start_exec, então as colunas derivadas vêm por último
+        for key in sorted(encoded['columns'], key=lambda k: 'date_of' in encoded['columns'][k]):
+            columns[key] = _decode_column(encoded['columns'][key], n, strings, columns)
+        payload[group] = [dict(zip(encoded['keys'], row)) for row in zip(*(columns[k] for k in encoded['keys']))]
+    return payload
+
+
+def compress(data, compression):
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compression == 'zstd':
+        return _zstandard().ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Compressão desconhecida: {compression}")
+
+
+def decompress(data, compression):
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        return _zstandard().ZstdDecompressor().decompress(data)
+    raise ValueError(f"Compressão desconhecida: {compression}")
+
+
+def encode_payload(payload, compression=None):
+    """Payload em formato colunar MessagePack, opcionalmente comprimido"""
+    packed = _msgpack().packb(to_columnar(payload), use_bin_type=True)
+    return compress(packed, compression)
+
+
+def decode_payload(data, compression=None):
+    """Inverso de encode_payload; valor só perde precisão quando vai como float32"""
+    return from_columnar(_msgpack().unpackb(decompress(data, compression), raw=False))
+
+
+def encode_body(payload, wire_format='json', compression=None):
+    """Corpo e cabeçalhos HTTP do payload no formato pedido"""
+    if wire_format not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {wire_format}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compressão desconhecida: {compression}")
+    if wire_format == 'timeseries' and not is_block_stream(payload):
+        raise ValueError("Formato timeseries requer blocos do TimeSeriesCodec")
+    if wire_format != 'timeseries' and is_block_stream(payload):
+        # Blocos do codec enviados em outro formato (ex.: após um 415) viram JSON
+        payload = to_json_payload(payload)
+
+    if wire_format == 'timeseries':
+        body = bytes(payload)
+        headers = {'Content-Type': TIMESERIES_CONTENT_TYPE}
+    elif wire_format == 'columnar':
+        if isinstance(payload, (bytes, str)):
+            payload = json.loads(payload)
+        body = encode_payload(payload)
+        headers = {'Content-Type': COLUMNAR_CONTENT_TYPE}
+    else:
+        body = payload if isinstance(payload, (bytes, str)) else json.dumps(payload)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = {'Content-Type': JSON_CONTENT_TYPE}
+
+    if compression is not None:
+        body = compress(body, compression)
+        headers['Content-Encoding'] = compression
+    return body, headers
+
+
+def decode_body(body, content_type, content_encoding=None):
+    """Lado do servidor: decodifica o corpo conforme Content-Type e Content-Encoding"""
+    body = decompress(body, content_encoding or None)
+    content_type = content_type.split(';')[0].strip()
+    if content_type == COLUMNAR_CONTENT_TYPE:
+        return decode_payload(body)
+    if content_type == TIMESERIES_CONTENT_TYPE:
+        return decode_stream(body)
+    return json.loads(body)
@@ -1,2 +1,22 @@
-from .MysqlConection import MySQLConnector
-from .AzureConection import AzureIotConnection
\ No newline at end of file
+from simuladores.Lazy import lazy_exports
+
+# Cada conector só importa seu driver (pymysql, requests, pyarrow, azure) quando acessado
+lazy_exports(__name__, {
+    'MySQLConnector': '.MysqlConection',
+    'LogExecBulkLoader': '.BulkLoader',
+    'AsyncPublisher': '.AsyncPublisher',
+    'AdaptiveScheduler': '.AdaptiveScheduler',
+    'PayloadSpool': '.Spool',
+    'NdjsonWriter': '.NdjsonSink',
+    'read_ndjson': '.NdjsonSink',
+    'ParquetSink': '.ParquetSink',
+    'read_parquet': '.ParquetSink',
+    'encode_payload': '.WireFormat',
+    'decode_payload': '.WireFormat',
+    'BlockWriter': '.TimeSeriesCodec',
+    'encode_block': '.TimeSeriesCodec',
+    'decode_block': '.TimeSeriesCodec',
+    'iter_blocks': '.TimeSeriesCodec',
+    'AzureIotConnection': '.AzureConection',
+    'AsyncAzureIotSender': '.AzureConection',
+})
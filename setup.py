@@ -5,4 +5,9 @@ setup(
     version="0.1",
     packages=find_packages(),
     package_dir={'': '.'},
+    entry_points={
+        'console_scripts': [
+            'agrosync-fleet=simuladores.Fleet:main',
+        ],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+Agregação por janela na borda, antes da publicação.
+
+WindowAggregator recebe os lotes de cada sensor (colunas de collect_batch ou
+collect_data(as_batch=True)) e mantém, por sensor e canal, min/max/soma/
+contagem/último valor do painel atual. Janelas deslizantes de tamanho window
+com passo slide são compostas de window/slide painéis; quando um painel fecha,
+a janela que termina nele é emitida combinando os painéis guardados. O custo
+por leitura é constante; só o fechamento de painel percorre os painéis da janela.
+
+Com percentiles, cada painel também mantém um t-digest (TDigest) e a janela
+informa os percentis pedidos.
+
+Uso:
+agregador = WindowAggregator(window=60)               # janelas fixas de 1 min
+agregador = WindowAggregator(window=300, slide=60)    # 5 min, emitidas a cada minuto
+fechadas = agregador.update(sensor, sensor.collect_batch(5).columns)
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+
+class TDigest:
+    """
+    t-digest com fusão (Dunning), usando a função de escala k1: mantém no
+    máximo ~compression centroides, mais precisos nas caudas. Mesclável.
+    """
+    def __init__(self, compression=100, buffer_size=500):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []  # (médias, pesos) ainda não fundidos
+        self._buffered = 0
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + sum(float(weights.sum()) for _, weights in self._buffer)
+
+    def add(self, values):
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        self._buffer.append((values, np.ones(len(values))))
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        self._buffer.append((other.means, other.weights))
+        self._buffer.extend(other._buffer)
+        self._compress()
+        return self
+
+    def _k_limit(self, q):
+        """Quantil onde termina o centroide iniciado em q (k1: k = δ/2π · asin(2q - 1))"""
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means, *(means for means, _ in self._buffer)])
+        weights = np.concatenate([self.weights, *(weights for _, weights in self._buffer)])
+        self._buffer = []
+        self._buffered = 0
+        if not len(means):
+            return
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        merged_means, merged_weights = [], []
+        current_mean, current_weight = means[0], weights[0]
+        so_far = 0.0
+        limit = self._k_limit(0.0) * total
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            if so_far + current_weight + weight <= limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                so_far += current_weight
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                limit = self._k_limit(so_far / total) * total
+                current_mean, current_weight = mean, weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def quantile(self, q):
+        self._compress()
+        if not len(self.means):
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), centers, self.means))
+
+
+class _Pane:
+    __slots__ = ('index', 'count', 'total', 'minimum', 'maximum', 'last', 'digest')
+
+    def __init__(self, index, compression=None):
+        self.index = index
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.last = None
+        self.digest = TDigest(compression) if compression else None
+
+    def add(self, values):
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.last = float(values[-1])
+        if self.digest is not None:
+            self.digest.add(values)
+
+
+class _ChannelState:
+    __slots__ = ('sensor_id', 'sensor_name', 'pane', 'panes')
+
+    def __init__(self, sensor_id, sensor_name, panes_per_window):
+        self.sensor_id = sensor_id
+        self.sensor_name = sensor_name
+        self.pane = None
+        self.panes = deque(maxlen=panes_per_window)
+
+    def first_open(self):
+        """Menor índice de painel que ainda aceita leituras"""
+        if self.pane is not None:
+            return self.pane.index
+        return self.panes[-1].index + 1 if self.panes else -math.inf
+
+
+class WindowAggregator:
+    """
+    Agregados por janela (window segundos, emitidos a cada slide segundos) de
+    cada sensor e canal. slide deve dividir window; slide=None = janelas fixas.
+    Leituras com horário anterior ao painel atual do canal, ou de um painel já
+    fechado (inclusive por flush), são descartadas e contadas em late.
+    """
+    def __init__(self, window=60, slide=None, percentiles=None, compression=100):
+        slide = slide or window
+        if window % slide:
+            raise ValueError("slide deve dividir window")
+        self.window = window
+        self.slide = slide
+        self.panes_per_window = int(window // slide)
+        self.percentiles = tuple(percentiles or ())
+        self.compression = compression if self.percentiles else None
+        self._slide_us = int(slide * 1_000_000)
+        self._states = {}
+        self._channels_by_type = {}
+        self.late = 0
+
+    def _channels(self, sensor, columns):
+        """(sensor_name, coluna) de cada canal, com os mesmos nomes dos registros log_exec"""
+        channels = self._channels_by_type.get(sensor.sensor_type)
+        if channels is None:
+            # _get_sensor_values aplicado aos nomes das colunas devolve (elemento, coluna)
+            names = {column: column for column in columns if column != 'timestamp'}
+            channels = self._channels_by_type[sensor.sensor_type] = [
+                (f"{sensor.sensor_type} {element}" if element else sensor.sensor_type, column)
+                for element, column in sensor._get_sensor_values(names)
+            ]
+        return channels
+
+    def update(self, sensor, columns):
+        """Acrescenta um lote {timestamp, coluna: valores} e retorna as janelas fechadas"""
+        timestamps = np.asarray(columns['timestamp'], dtype='datetime64[us]').astype(np.int64)
+        if not len(timestamps):
+            return []
+        panes = timestamps // self._slide_us
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(panes)) + 1, [len(panes)]))
+
+        closed = []
+        for sensor_name, column in self._channels(sensor, columns):
+            key = (sensor.sensor_id, sensor_name)
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _ChannelState(sensor.sensor_id, sensor_name, self.panes_per_window)
+            values = np.asarray(columns[column], dtype=float)
+
+            for begin, end in zip(bounds[:-1], bounds[1:]):
+                index = int(panes[begin])
+                if index < state.first_open():
+                    self.late += end - begin
+                    continue
+                if state.pane is not None and index > state.pane.index:
+                    closed.append(self._close(state))
+                if state.pane is None:
+                    state.pane = _Pane(index, self.compression)
+                state.pane.add(values[begin:end])
+        return closed
+
+    def _close(self, state):
+        pane = state.pane
+        state.pane = None
+        state.panes.append(pane)
+        first = pane.index - self.panes_per_window + 1
+        panes = [p for p in state.panes if p.index >= first]
+
+        count = sum(p.count for p in panes)
+        record = {
+            'id_sensor': state.sensor_id,
+            'sensor_name': state.sensor_name,
+            'window_start': _isoformat(first * self._slide_us),
+            'window_end': _isoformat((pane.index + 1) * self._slide_us),
+            'count': count,
+            'min': min(p.minimum for p in panes),
+            'max': max(p.maximum for p in panes),
+            'mean': sum(p.total for p in panes) / count,
+            'last': pane.last,
+        }
+        if self.percentiles:
+            digest = TDigest(self.compression)
+            for p in panes:
+                digest.merge(p.digest)
+            for q in self.percentiles:
+                record[f"p{q:g}"] = digest.quantile(q / 100)
+        return record
+
+    def flush(self):
+        """Fecha os painéis em aberto (fim do fluxo) e retorna as janelas resultantes"""
+        return [self._close(state) for state in self._states.values() if state.pane is not None]
+
+
+def _isoformat(microseconds):
+    return np.datetime64(int(microseconds), 'us').astype(object).isoformat()
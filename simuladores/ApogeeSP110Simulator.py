@@ -1,7 +1,7 @@
-import random
 import math
-from datetime import datetime
+import numpy as np
 from simuladores.Sensor import Sensor
+from simuladores.Diurnal import lookup_at
 
 class ApogeeSP110Simulator(Sensor):
     """
@@ -10,8 +10,8 @@ class ApogeeSP110Simulator(Sensor):
     - Geração de DataFrame com os dados
     - Armazenamento no MySQL na tabela FatoValores
     """
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
-        super().__init__(sensor_id, region_id, mysql_connector)
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
         self.max_irradiance = 2000
         self.calibration_factor = 1.0
 
@@ -25,23 +25,14 @@ class ApogeeSP110Simulator(Sensor):
 
     def simulate_reading(self, base_value=None):
         if base_value is None:
-            now = datetime.now()
-            hour = now.hour + now.minute / 60 + now.second / 3600
-
-            if 5 <= hour <= 19:
-                solar_angle = math.pi * (hour - 12) / 15
-                max_irradiance = 1000
-                base_value = max_irradiance * math.sin(math.pi / 2 - abs(solar_angle)) ** 1.5
-                base_value = max(0, base_value)
-
-                if hour < 6 or hour > 18:
-                    base_value *= 0.3 * (1 - abs(hour - 12) / 6)
-            else:
-                base_value = random.uniform(0, 10)
+            # Curva solar pré-calculada; NaN fora do período de 5h às 19h
+            base_value = lookup_at('irradiance', self.clock(), self.region_id)
+            if math.isnan(base_value):
+                base_value = self.rng.uniform(0, 10)
         else:
             base_value = min(max(base_value, 0), self.max_irradiance)
 
-        noise = random.gauss(0, base_value * 0.02 + 2)
+        noise = self.rng.normal(0, base_value * 0.02 + 2)
         max_variation = base_value * 0.05 + 5
         measured_value = base_value + max(-max_variation, min(noise, max_variation))
         calibrated_value = measured_value * self.calibration_factor
@@ -49,10 +40,27 @@ class ApogeeSP110Simulator(Sensor):
             "irradiance": min(max(round(calibrated_value, 1), 0), self.max_irradiance)
         }
 
+    def simulate_batch(self, n, base_value=None, timestamps=None):
+        """Versão vetorizada de simulate_reading para n leituras"""
+        if base_value is None:
+            base_value = lookup_at('irradiance', self._batch_timestamps(n, timestamps), self.region_id)
+            base_value = np.where(np.isnan(base_value), self.rng.uniform(0, 10, n), base_value)
+        else:
+            base_value = np.full(n, min(max(base_value, 0), self.max_irradiance))
+
+        noise = self.rng.normal(0, base_value * 0.02 + 2)
+        max_variation = base_value * 0.05 + 5
+        measured_value = base_value + np.clip(noise, -max_variation, max_variation)
+        calibrated_value = measured_value * self.calibration_factor
+        return {
+            "irradiance": np.clip(np.round(calibrated_value, 1), 0, self.max_irradiance)
+        }
+
     def _get_sensor_values(self, row):
         return [(None, row['irradiance'])]
 
 if __name__ == "__main__":
+    import pandas as pd
     from connection import MySQLConnector
 
     mysql_config = {
@@ -69,10 +77,10 @@ if __name__ == "__main__":
         mysql_connector=mysql_connector
     )
 
-    df = sensor.collect_data(
+    payload = sensor.collect_data(
         num_samples=15,
         save_to_db=True
     )
 
     print("\nEstatísticas dos dados coletados:")
-    print(df.describe())
\ No newline at end of file
+    print(pd.DataFrame(payload).groupby('sensor_name')['valor'].describe())
\ No newline at end of file
@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta
+
+
+class SimulatedClock:
+    """
+    Relógio injetável para os sensores (atributo Sensor.clock). Retorna um
+    horário fixo, que avança apenas quando solicitado, permitindo gerar
+    histórico sem esperar o tempo real passar.
+    """
+    def __init__(self, start=None):
+        self.current = start or datetime.now()
+
+    def __call__(self):
+        return self.current
+
+    def set(self, moment):
+        self.current = moment
+
+    def advance(self, delta):
+        """Avança o relógio; delta em timedelta ou segundos"""
+        if not isinstance(delta, timedelta):
+            delta = timedelta(seconds=delta)
+        self.current += delta
+        return self.current
@@ -1,45 +1,57 @@
-import random
+import numpy as np
 from simuladores.Sensor import Sensor
+from simuladores.Processes import ornstein_uhlenbeck, random_walk
+
+# Rajadas se desfazem em minutos; a direção varia ~10° por leitura
+WIND_SPEED = ornstein_uhlenbeck(mean=5, std=2, tau=600, low=0, high=30)
+WIND_DIRECTION = random_walk(step_std=10, step=Sensor.sample_interval, period=360)
 
 
 class Davis6410Simulator(Sensor):
     """
     Simulador do sensor Anemômetro Davis 6410:
-    - Simula velocidade e direção do vento
+    - Simula velocidade e direção do vento, correlacionadas entre leituras
     - Geração de DataFrame com os dados
     - Armazenamento no MySQL na tabela FatoValores
     """
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
-        super().__init__(sensor_id, region_id, mysql_connector)
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
+        self.wind_speed = self.add_process('wind_speed', WIND_SPEED)
+        self.wind_direction = self.add_process('wind_direction', WIND_DIRECTION)
 
     @property
     def sensor_type(self):
         return 'Davis6410'
 
-    @staticmethod
-    def simulate_wind_speed():
+    def simulate_wind_speed(self, dt=None):
         """
-        Simula a velocidade do vento em m/s, com base em distribuição normal truncada.
+        Simula a velocidade do vento em m/s: Ornstein-Uhlenbeck em torno de 5 m/s
+        (desvio 2), refletido entre 0 e 30, avançando dt segundos.
         """
-        base_speed = random.gauss(5, 2)  
-        base_speed = max(0, min(base_speed, 30))  
-        return round(base_speed, 2)
+        return round(self.wind_speed.step(self.rng, dt or self.sample_interval), 2)
 
-    @staticmethod
-    def simulate_wind_direction(prev_direction=None):
+    def simulate_wind_direction(self, prev_direction=None, dt=None):
         """
-        Simula a direção do vento em graus (0 a 360), com variação gradual.
+        Simula a direção do vento em graus (0 a 360), com variação gradual
+        a partir da leitura anterior (ou de prev_direction, se informada).
         """
-        if prev_direction is None:
-            return round(random.uniform(0, 360), 2)
-        variation = random.gauss(0, 10)  
-        new_direction = (prev_direction + variation) % 360
-        return round(new_direction, 2)
+        if prev_direction is not None:
+            self.wind_direction.value = prev_direction
+        return round(self.wind_direction.step(self.rng, dt or self.sample_interval), 2) % 360
 
     def simulate_reading(self):
+        dt = self._step_interval()
+        return {
+            "wind_speed": self.simulate_wind_speed(dt),
+            "wind_direction": self.simulate_wind_direction(dt=dt)
+        }
+
+    def simulate_batch(self, n, timestamps=None):
+        """Versão vetorizada de simulate_reading para n leituras"""
+        dt = self._step_intervals(self._batch_timestamps(n, timestamps))
         return {
-            "wind_speed": self.simulate_wind_speed(),
-            "wind_direction": self.simulate_wind_direction()
+            "wind_speed": np.round(self.wind_speed.step_batch(self.rng, dt), 2),
+            "wind_direction": np.round(self.wind_direction.step_batch(self.rng, dt), 2) % 360
         }
 
     def _get_sensor_values(self, row):
@@ -49,6 +61,7 @@ class Davis6410Simulator(Sensor):
         ]
 
 if __name__ == "__main__":
+    import pandas as pd
     from connection import MySQLConnector  
 
     mysql_config = {
@@ -66,10 +79,10 @@ if __name__ == "__main__":
         mysql_connector=mysql_connector
     )
 
-    df = sensor.collect_data(
+    payload = sensor.collect_data(
         num_samples=20,
         save_to_db=True
     )
 
     print("\nEstatísticas dos dados coletados:")
-    print(df.describe())
+    print(pd.DataFrame(payload).groupby('sensor_name')['valor'].describe())
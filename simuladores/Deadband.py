@@ -0,0 +1,109 @@
+"""
+Relato por exceção (deadband) na saída dos sensores.
+
+Um valor só é emitido quando se afasta do último valor emitido do mesmo canal
+mais que a banda, max(absolute, relative * |último emitido|), ou quando o
+último envio do canal tem heartbeat segundos ou mais. A primeira leitura de
+cada canal é sempre emitida.
+
+Uso (vale para todos os simuladores e sinks):
+sensor.deadband = DeadbandFilter({
+    'temperature': Deadband(absolute=0.5, heartbeat=600),
+    'umidade': Deadband(relative=0.02, heartbeat=300),
+})
+Canais sem configuração usam default (None = sempre emitidos).
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Deadband(NamedTuple):
+    absolute: float = 0.0
+    relative: float = 0.0
+    heartbeat: float = None   # segundos; None = sem envio periódico forçado
+
+
+class DeadbandFilter:
+    """
+    Filtro vetorizado por lote. apply() devolve a máscara de emissão
+    (leituras x canais, na ordem de _get_sensor_values) e atualiza o estado
+    (último valor e horário emitidos) de cada canal de cada sensor.
+    """
+    # Janela inicial da busca pela próxima emissão; dobra a cada trecho sem emissão
+    SEARCH_STEP = 64
+
+    def __init__(self, channels=None, default=None):
+        self.channels = {name: Deadband(**band) if isinstance(band, dict) else band
+                         for name, band in (channels or {}).items()}
+        self.default = default
+        self._state = {}  # (tipo, sensor_id, coluna) -> (valor, horário em s)
+        self.metrics = {'seen': 0, 'emitted': 0, 'suppressed': 0}
+
+    def band_for(self, sensor, column):
+        """Configuração do canal: '<tipo>.<coluna>', depois '<coluna>', depois default"""
+        return self.channels.get(f"{sensor.sensor_type}.{column}", self.channels.get(column, self.default))
+
+    def apply(self, sensor, columns, elements):
+        """
+        columns: {timestamp, coluna: valores}; elements: [(elemento, coluna)].
+        Retorna np.ndarray bool (n, len(elements)).
+        """
+        times = np.asarray(columns['timestamp'], dtype='datetime64[us]').astype(np.int64) / 1e6
+        n = len(times)
+        emit = np.ones((n, len(elements)), dtype=bool)
+
+        for position, (_, column) in enumerate(elements):
+            band = self.band_for(sensor, column)
+            if band is None or not n:
+                continue
+            values = np.asarray(columns[column], dtype=float)
+            key = (sensor.sensor_type, sensor.sensor_id, column)
+            emit[:, position] = self._filter(values, times, band, key)
+
+        emitted = int(emit.sum())
+        self.metrics['seen'] += emit.size
+        self.metrics['emitted'] += emitted
+        self.metrics['suppressed'] += emit.size - emitted
+        return emit
+
+    def _filter(self, values, times, band, key):
+        n = len(values)
+        mask = np.zeros(n, dtype=bool)
+        state = self._state.get(key)
+        if state is None:
+            reference, reference_time = values[0], times[0]
+            mask[0] = True
+            position = 1
+        else:
+            reference, reference_time = state
+            position = 0
+
+        heartbeat = np.inf if band.heartbeat is None else band.heartbeat
+        while position < n:
+            index = self._next_emission(values, times, position, reference, reference_time, band, heartbeat)
+            if index >= n:
+                break
+            mask[index] = True
+            reference, reference_time = values[index], times[index]
+            position = index + 1
+
+        self._state[key] = (reference, reference_time)
+        return mask
+
+    def _next_emission(self, values, times, start, reference, reference_time, band, heartbeat):
+        """Primeiro índice a partir de start que sai da banda ou vence o heartbeat (n se nenhum)"""
+        n = len(values)
+        limit = max(band.absolute, band.relative * abs(reference))
+        step = self.SEARCH_STEP
+        while start < n:
+            end = min(n, start + step)
+            outside = (np.abs(values[start:end] - reference) > limit) | (times[start:end] - reference_time >= heartbeat)
+            if outside.any():
+                return start + int(outside.argmax())
+            start = end
+            step *= 2
+        return n
+
+    def reset(self):
+        self._state = {}
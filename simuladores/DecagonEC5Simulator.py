@@ -1,7 +1,6 @@
-import random
-import math
-from datetime import datetime
+import numpy as np
 from simuladores.Sensor import Sensor
+from simuladores.Diurnal import lookup_at
 
 
 class DecagonEC5Simulator(Sensor):
@@ -11,8 +10,8 @@ class DecagonEC5Simulator(Sensor):
     - Geração de DataFrame com os dados
     - Armazenamento no MySQL na tabela FatoValores
     """
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
-        super().__init__(sensor_id, region_id, mysql_connector)
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
         self.max_moisture = 100
         self.calibration_factor = 1.0
 
@@ -26,16 +25,13 @@ class DecagonEC5Simulator(Sensor):
 
     def simulate_reading(self, base_value=None):
         if base_value is None:
-            now = datetime.now()
-            hour = now.hour + now.minute / 60 + now.second / 3600
-
             # Simulação com evaporação durante o dia (menor umidade ao meio-dia)
-            base_value = 60 - 20 * math.sin(math.pi * (hour - 6) / 12)
+            base_value = lookup_at('soil_moisture', self.clock(), self.region_id)
             base_value = max(0, min(base_value, self.max_moisture))
         else:
             base_value = min(max(base_value, 0), self.max_moisture)
 
-        noise = random.gauss(0, base_value * 0.02 + 2)
+        noise = self.rng.normal(0, base_value * 0.02 + 2)
         max_variation = base_value * 0.02 + 2
         measured_value = base_value + max(-max_variation, min(noise, max_variation))
         calibrated_value = measured_value * self.calibration_factor
@@ -43,10 +39,27 @@ class DecagonEC5Simulator(Sensor):
             "umidade":min(max(round(calibrated_value, 1), 0), self.max_moisture)
         }
 
+    def simulate_batch(self, n, base_value=None, timestamps=None):
+        """Versão vetorizada de simulate_reading para n leituras"""
+        if base_value is None:
+            base_value = lookup_at('soil_moisture', self._batch_timestamps(n, timestamps), self.region_id)
+            base_value = np.clip(base_value, 0, self.max_moisture)
+        else:
+            base_value = np.full(n, min(max(base_value, 0), self.max_moisture), dtype=float)
+
+        noise = self.rng.normal(0, base_value * 0.02 + 2)
+        max_variation = base_value * 0.02 + 2
+        measured_value = base_value + np.clip(noise, -max_variation, max_variation)
+        calibrated_value = measured_value * self.calibration_factor
+        return {
+            "umidade": np.clip(np.round(calibrated_value, 1), 0, self.max_moisture)
+        }
+
     def _get_sensor_values(self, row):
-        return {(None, row['umidade'])}
+        return [(None, row['umidade'])]
 
 if __name__ == "__main__":
+    import pandas as pd
     from connection import MySQLConnector
 
     mysql_config = {
@@ -63,10 +76,10 @@ if __name__ == "__main__":
         mysql_connector=mysql_connector
     )
 
-    df = sensor.collect_data(
+    payload = sensor.collect_data(
         num_samples=15,
         save_to_db=True
     )
 
     print("\nEstatísticas dos dados coletados:")
-    print(df.describe())
+    print(pd.DataFrame(payload).groupby('sensor_name')['valor'].describe())
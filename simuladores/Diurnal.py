@@ -0,0 +1,138 @@
+"""
+Perfis diurnos pré-calculados: cada curva do dia (irradiância, evaporação do
+solo, variação circadiana de pH) é avaliada uma única vez numa grade densa de
+24h e depois consultada por índice, tanto para uma leitura quanto para arrays.
+
+Perfis podem ser registrados por região e/ou estação com register_profile;
+a consulta cai para o perfil padrão quando não há um específico.
+"""
+import math
+import threading
+from datetime import datetime
+
+import numpy as np
+
+SECONDS_PER_DAY = 24 * 3600
+
+# Estações do hemisfério sul, por mês (índice 0 = janeiro)
+SEASONS = ('verao', 'verao', 'outono', 'outono', 'outono', 'inverno',
+           'inverno', 'inverno', 'primavera', 'primavera', 'primavera', 'verao')
+
+
+def hours_of_day(timestamps):
+    """Hora do dia (fração, 0-24) de um array de timestamps"""
+    timestamps = np.asarray(timestamps, dtype='datetime64[us]')
+    return (timestamps - timestamps.astype('datetime64[D]')) / np.timedelta64(1, 'h')
+
+
+class DiurnalProfile:
+    """Curva de 24h amostrada a cada resolution segundos"""
+    def __init__(self, values, resolution=60):
+        self.values = np.asarray(values, dtype=float)
+        self.resolution = resolution
+        self._steps_per_hour = 3600 / resolution
+
+    @classmethod
+    def from_function(cls, function, resolution=60):
+        """Avalia function(horas: np.ndarray) na grade do dia"""
+        hours = np.arange(0, SECONDS_PER_DAY, resolution) / 3600
+        return cls(function(hours), resolution)
+
+    def __call__(self, hour):
+        """Valor da curva para uma hora do dia (float) ou um array de horas"""
+        # Tolerância evita cair no passo anterior por erro de arredondamento (ex.: 11.9999999 h)
+        if np.ndim(hour) == 0:
+            return self.values[int(hour * self._steps_per_hour + 1e-6) % len(self.values)]
+        index = (np.asarray(hour) * self._steps_per_hour + 1e-6).astype(np.int64) % len(self.values)
+        return self.values[index]
+
+
+def _irradiance(hour):
+    """Irradiância de céu limpo (W/m²) entre 5h e 19h; NaN à noite"""
+    solar_angle = math.pi * (hour - 12) / 15
+    value = 1000 * np.maximum(0, np.sin(math.pi / 2 - np.abs(solar_angle))) ** 1.5
+    twilight = (hour < 6) | (hour > 18)
+    value = np.where(twilight, value * 0.3 * (1 - np.abs(hour - 12) / 6), value)
+    return np.where((hour >= 5) & (hour <= 19), value, np.nan)
+
+
+def _soil_moisture(hour):
+    """Umidade do solo com evaporação durante o dia (menor ao meio-dia)"""
+    return np.clip(60 - 20 * np.sin(math.pi * (hour - 6) / 12), 0, 100)
+
+
+def _ph_variation(hour):
+    """Variação circadiana do pH, interpolação quadrática entre pontos do dia"""
+    from scipy.interpolate import interp1d
+
+    pattern = interp1d(
+        [0, 6, 12, 18, 24],  # Horas do dia
+        [0, -0.1, 0.2, 0, 0],  # Variação de pH
+        kind='quadratic',
+        fill_value="extrapolate"
+    )
+    return pattern(hour)
+
+
+_DEFAULT_BUILDERS = {
+    'irradiance': (_irradiance, 1),
+    'soil_moisture': (_soil_moisture, 1),
+    'ph': (_ph_variation, 60),
+}
+
+_profiles = {}
+_lock = threading.Lock()
+
+
+def register_profile(name, profile, region_id=None, season=None):
+    """Registra um perfil para uma região e/ou estação específica"""
+    with _lock:
+        _profiles[(name, region_id, season)] = profile
+
+
+def get_profile(name, region_id=None, season=None):
+    """
+    Retorna o perfil mais específico disponível, na ordem:
+    (região, estação), (região), (estação), padrão. O padrão é calculado na primeira consulta.
+    """
+    for key in ((name, region_id, season), (name, region_id, None), (name, None, season)):
+        profile = _profiles.get(key)
+        if profile is not None:
+            return profile
+
+    profile = _profiles.get((name, None, None))
+    if profile is None:
+        if name not in _DEFAULT_BUILDERS:
+            raise KeyError(f"Perfil diurno desconhecido: {name}")
+        function, resolution = _DEFAULT_BUILDERS[name]
+        with _lock:
+            profile = _profiles.setdefault(
+                (name, None, None), DiurnalProfile.from_function(function, resolution)
+            )
+    return profile
+
+
+def lookup_at(name, timestamps, region_id=None):
+    """
+    Consulta o perfil para um datetime (retorna float) ou um array datetime64
+    (retorna np.ndarray), escolhendo o perfil da estação de cada amostra.
+    """
+    if isinstance(timestamps, datetime):
+        hour = timestamps.hour + timestamps.minute / 60 + timestamps.second / 3600
+        return float(get_profile(name, region_id, SEASONS[timestamps.month - 1])(hour))
+
+    timestamps = np.asarray(timestamps, dtype='datetime64[us]')
+    hours = hours_of_day(timestamps)
+    months = timestamps.astype('datetime64[M]').astype(np.int64) % 12
+
+    seasons = {SEASONS[month] for month in np.unique(months)}
+    profiles = {season: get_profile(name, region_id, season) for season in seasons}
+    if len(set(map(id, profiles.values()))) == 1:
+        return next(iter(profiles.values()))(hours)
+
+    result = np.empty(len(hours))
+    season_index = np.array(SEASONS)[months]
+    for season, profile in profiles.items():
+        mask = season_index == season
+        result[mask] = profile(hours[mask])
+    return result
@@ -1,12 +1,11 @@
-import random
-from datetime import datetime
+import numpy as np
 from simuladores.Sensor import Sensor
-from scipy.interpolate import interp1d
+from simuladores.Diurnal import lookup_at
 
 
 class EzoPhSensor(Sensor):
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
-        super().__init__(sensor_id, region_id, mysql_connector)
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
 
         self.min_ph = 5.0
         self.max_ph = 7.5
@@ -16,13 +15,6 @@ class EzoPhSensor(Sensor):
         self.sensor_age = 0  # Dias desde a última calibração
         self.probe_condition = 1.0  # 1.0 = nova, diminui com o tempo
 
-        self.daily_pattern = interp1d(
-            [0, 6, 12, 18, 24],  # Horas do dia
-            [0, -0.1, 0.2, 0, 0],  # Variação de pH
-            kind='quadratic',
-            fill_value="extrapolate"
-        )
-        
         self.calibration_points = {
             'low': {'actual': 4.0, 'measured': None},
             'mid': {'actual': 7.0, 'measured': None},
@@ -56,16 +48,14 @@ class EzoPhSensor(Sensor):
 
     def apply_daily_variation(self, ph_value, timestamp):
         """Aplica variação circadiana"""
-        hour = timestamp.hour + timestamp.minute / 60
-        daily_variation = self.daily_pattern(hour)
-        return ph_value + daily_variation
+        return ph_value + lookup_at('ph', timestamp, self.region_id)
 
     def simulate_reading(self):
         """Implementação do método abstrato da classe base"""
-        timestamp = datetime.now()
+        timestamp = self.clock()
 
         # Valor base do pH para solo de milho
-        base_ph = random.uniform(5.8, 6.8)
+        base_ph = self.rng.uniform(5.8, 6.8)
 
         # Aplicar efeitos
         ph_value = base_ph
@@ -74,7 +64,7 @@ class EzoPhSensor(Sensor):
 
         # Adicionar ruído
         noise_factor = 0.5 if self.calibration_status == "uncalibrated" else 0.1
-        noise = random.uniform(-self.noise_level, self.noise_level) * noise_factor
+        noise = self.rng.uniform(-self.noise_level, self.noise_level) * noise_factor
         ph_value += noise
 
         # Limitar à faixa possível
@@ -85,6 +75,22 @@ class EzoPhSensor(Sensor):
             'temperature': self.temperature
         }
 
+    def simulate_batch(self, n, timestamps=None):
+        """Versão vetorizada de simulate_reading para n leituras"""
+        ph_value = self.rng.uniform(5.8, 6.8, n)
+        ph_value = self.apply_daily_variation(ph_value, self._batch_timestamps(n, timestamps))
+        ph_value = self.apply_temperature_compensation(ph_value)
+
+        noise_factor = 0.5 if self.calibration_status == "uncalibrated" else 0.1
+        ph_value += self.rng.uniform(-self.noise_level, self.noise_level, n) * noise_factor
+
+        ph_value = np.clip(ph_value, self.min_ph, self.max_ph)
+
+        return {
+            'ph': np.round(ph_value, 2),
+            'temperature': np.full(n, self.temperature)
+        }
+
     def _get_sensor_values(self, row):
         """Implementação do método abstrato para obtenção dos valores"""
         return [
@@ -92,6 +98,7 @@ class EzoPhSensor(Sensor):
             ('Temperature', row['temperature'])
         ]
 if __name__ == "__main__":
+    import pandas as pd
     from connection import MySQLConnector  # Sua classe de conexão
 
     mysql_connector = MySQLConnector(
@@ -110,11 +117,11 @@ if __name__ == "__main__":
     sensor.calibrate(2, 4.0)  # Ponto baixo
     sensor.calibrate(2, 7.0)  # Ponto médio
     
-    df = sensor.collect_data(
+    payload = sensor.collect_data(
         num_samples=20,
         save_to_db=False
     )
 
     # Mostrar estatísticas
     print("\nEstatísticas dos dados coletados:")
-    print(df.describe())
+    print(pd.DataFrame(payload).groupby('sensor_name')['valor'].describe())
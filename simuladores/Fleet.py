@@ -0,0 +1,193 @@
+"""
+Simulador de frota: instancia N sensores por tipo em M regiões a partir de um
+arquivo de configuração e distribui a geração entre processos.
+
+Uso:
+python -m simuladores.Fleet fleet.example.json [--output saida.ndjson] [--workers 8]
+
+Exemplo de configuração:
+{
+    "regions": [1, 2, 3],
+    "sensors_per_type": {"ApogeeSP110": 100, "NPK": 100, "Davis6410": 50},
+    "num_samples": 5,
+    "cycles": 10,
+    "shard_size": 500,
+    "workers": 4,
+    "seed": 42,
+    "start": "2026-01-01T00:00:00",
+    "schemas": ["sensor_schema.example.json"]
+}
+Tipos declarados por schema (ver Registry) entram em "schemas" e podem ser
+usados em sensors_per_type como os simuladores do pacote.
+"start" é o horário simulado do primeiro ciclo; cada ciclo avança o relógio
+de cada sensor em num_samples * sample_interval, então as leituras não
+dependem do relógio real, do número de workers nem de repetir a execução
+(ram_usage e process_usage continuam vindo da máquina).
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from simuladores.Clock import SimulatedClock
+from simuladores.Registry import BUILTIN_TYPES, get_sensor_type, register_schema
+
+# Simuladores do pacote; tipos de schemas e entry points vêm do Registry
+SENSOR_TYPES = {name: get_sensor_type(name) for name in BUILTIN_TYPES}
+
+DEFAULT_CONFIG = {
+    'regions': [1],
+    'sensors_per_type': 1,
+    'num_samples': 5,
+    'cycles': 1,
+    'shard_size': 500,
+    'workers': None,
+    'seed': 0,
+    'start': '2026-01-01T00:00:00',
+    'schemas': [],
+}
+
+
+def load_config(path):
+    with open(path, encoding='utf-8') as f:
+        config = {**DEFAULT_CONFIG, **json.load(f)}
+
+    _register_schemas(config['schemas'])
+
+    if isinstance(config['regions'], int):
+        config['regions'] = list(range(1, config['regions'] + 1))
+    if isinstance(config['sensors_per_type'], int):
+        config['sensors_per_type'] = {name: config['sensors_per_type'] for name in SENSOR_TYPES}
+    for name in config['sensors_per_type']:
+        try:
+            get_sensor_type(name)
+        except KeyError:
+            raise ValueError(f"Tipo de sensor desconhecido: {name}") from None
+    return config
+
+
+def start_time(config):
+    """Horário simulado do primeiro ciclo (config['start'], datetime ou ISO 8601)"""
+    start = config.get('start', DEFAULT_CONFIG['start'])
+    return datetime.fromisoformat(start) if isinstance(start, str) else start
+
+
+def _register_schemas(schemas):
+    for schema in schemas:
+        register_schema(schema)
+
+
+def build_fleet(config):
+    """Lista (sensor_id, region_id, tipo) de toda a frota, com ids sequenciais estáveis"""
+    fleet = []
+    for region_id in config['regions']:
+        for type_name, count in config['sensors_per_type'].items():
+            for _ in range(count):
+                fleet.append((len(fleet) + 1, region_id, type_name))
+    return fleet
+
+
+def sensor_seed(seed, sensor_id):
+    """Semente derivada de (semente global, sensor): independe do particionamento"""
+    return np.random.SeedSequence([seed, sensor_id])
+
+
+# Sensores já instanciados neste processo, por shard
+_worker_sensors = {}
+
+
+def _run_shard(task):
+    """
+    Gera um ciclo de um shard. Os sensores começam da semente e de um relógio
+    simulado em start no primeiro ciclo, e depois do estado devolvido pelo ciclo
+    anterior (gerador, processos e relógio), que pode ter rodado em outro
+    processo: a correlação temporal continua entre ciclos e as leituras
+    independem de qual worker recebe cada shard.
+    """
+    shard_index, shard, num_samples, seed, start, states = task
+    sensors = _worker_sensors.get(shard_index)
+    if sensors is None:
+        sensors = [get_sensor_type(type_name)(sensor_id, region_id) for sensor_id, region_id, type_name in shard]
+        _worker_sensors[shard_index] = sensors
+
+    lines = []
+    for position, sensor in enumerate(sensors):
+        if states is None:
+            sensor.reseed(sensor_seed(seed, sensor.sensor_id))
+            sensor.clock = SimulatedClock(start)
+        else:
+            sensor.set_state(states[position])
+            sensor.clock = SimulatedClock(states[position]['clock'])
+        records = sensor.collect_data(num_samples=num_samples)
+        lines.extend(json.dumps(record, separators=(',', ':')) for record in records)
+        sensor.clock.advance(num_samples * sensor.sample_interval)
+    data = ''.join(line + '\n' for line in lines).encode('utf-8')
+    return data, [{**sensor.get_state(), 'clock': sensor.clock()} for sensor in sensors]
+
+
+def run_fleet(config, output):
+    """
+    Gera todos os ciclos da frota em paralelo e grava o NDJSON resultante em
+    output (stream binário), na ordem (ciclo, shard). Retorna estatísticas da execução.
+    """
+    fleet = build_fleet(config)
+    shard_size = config['shard_size']
+    shards = [fleet[i:i + shard_size] for i in range(0, len(fleet), shard_size)]
+    # Estado dos sensores de cada shard ao fim do último ciclo (None = semente inicial)
+    states = [None] * len(shards)
+    start_at = start_time(config)
+
+    start = time.perf_counter()
+    written = 0
+    records = 0
+    # Os workers registram os schemas de novo, caso não herdem o processo pai (spawn)
+    with multiprocessing.Pool(config['workers'], _register_schemas, (config.get('schemas', []),)) as pool:
+        for _ in range(config['cycles']):
+            tasks = [(shard_index, shard, config['num_samples'], config['seed'], start_at, states[shard_index])
+                     for shard_index, shard in enumerate(shards)]
+            for shard_index, (chunk, state) in enumerate(pool.imap(_run_shard, tasks)):
+                states[shard_index] = state
+                output.write(chunk)
+                written += len(chunk)
+                records += chunk.count(b'\n')
+    elapsed = time.perf_counter() - start
+
+    return {
+        'sensors': len(fleet),
+        'records': records,
+        'bytes': written,
+        'seconds': elapsed,
+        'records_per_sec': records / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador de frota de sensores AgroSync")
+    parser.add_argument('config', help="arquivo JSON de configuração da frota")
+    parser.add_argument('--output', default='-', help="arquivo NDJSON de saída ('-' para stdout)")
+    parser.add_argument('--workers', type=int, help="número de processos (padrão: configuração ou nº de CPUs)")
+    parser.add_argument('--cycles', type=int, help="sobrescreve o número de ciclos da configuração")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.workers is not None:
+        config['workers'] = args.workers
+    if args.cycles is not None:
+        config['cycles'] = args.cycles
+
+    if args.output == '-':
+        stats = run_fleet(config, sys.stdout.buffer)
+    else:
+        with open(args.output, 'wb') as output:
+            stats = run_fleet(config, output)
+
+    print(f"{stats['sensors']} sensores, {stats['records']} registros em {stats['seconds']:.2f}s "
+          f"({stats['records_per_sec']:,.0f} registros/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
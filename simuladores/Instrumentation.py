@@ -0,0 +1,290 @@
+"""
+Instrumentação do caminho quente de Sensor.collect_data.
+
+Cada etapa do lote (generate, build_payload, save_mysql, save_parquet e
+save_file, esta contida em build_payload) é cronometrada num histograma por
+(etapa, tipo de sensor) e os contadores registram registros emitidos, bytes
+serializados, linhas inseridas no banco e falhas. Hooks recebem o início e o fim de cada etapa, o que permite
+acoplar um profiler por amostragem (SamplingProfiler).
+
+Desligada (padrão), a instrumentação é um objeto nulo: cada etapa custa uma
+chamada de método que devolve um gerenciador de contexto vazio e compartilhado.
+
+Uso:
+from simuladores.Instrumentation import Instrumentation, set_instrumentation
+instrumentation = set_instrumentation(Instrumentation())
+...
+print(instrumentation.to_prometheus())
+instrumentation.serve_prometheus(9108)  # GET /metrics
+instrumentation.dump_json('metricas.json')
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+# Limites (segundos) dos buckets dos histogramas de duração das etapas
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_NULL_CONTEXT = nullcontext()
+
+
+class NullInstrumentation:
+    """Instrumentação desligada: todas as operações são no-op"""
+    enabled = False
+
+    def stage(self, name, sensor=None):
+        return _NULL_CONTEXT
+
+    def count(self, name, value=1, sensor=None):
+        pass
+
+
+class _Stage:
+    __slots__ = ('instrumentation', 'name', 'sensor_type', 'start')
+
+    def __init__(self, instrumentation, name, sensor_type):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.sensor_type = sensor_type
+
+    def __enter__(self):
+        for hook in self.instrumentation.hooks:
+            hook('start', self.name, self.sensor_type)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.start
+        instrumentation = self.instrumentation
+        instrumentation.observe(self.name, elapsed, self.sensor_type)
+        if exc_type is not None:
+            instrumentation.count('failures', 1, self.sensor_type)
+        for hook in instrumentation.hooks:
+            hook('end', self.name, self.sensor_type)
+        return False
+
+
+class Instrumentation:
+    """
+    Coletor de métricas em memória, seguro entre threads:
+    - stage(nome, sensor): cronometra a etapa (histograma com buckets em segundos)
+    - count(nome, valor, sensor): incrementa um contador
+    - add_hook(callable): recebe (evento 'start'|'end', etapa, tipo do sensor)
+    - snapshot() / to_prometheus() / dump_json(): exportação
+    """
+    enabled = True
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace='agrosync'):
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self.hooks = []
+        self._lock = threading.Lock()
+        self._histograms = {}  # (etapa, tipo) -> [contagens por bucket..., +Inf, soma]
+        self._counters = {}    # (contador, tipo) -> valor
+        self._server = None
+
+    @staticmethod
+    def _sensor_type(sensor):
+        if sensor is None or isinstance(sensor, str):
+            return sensor or ''
+        return sensor.sensor_type
+
+    def stage(self, name, sensor=None):
+        return _Stage(self, name, self._sensor_type(sensor))
+
+    def observe(self, name, seconds, sensor=None):
+        """Registra a duração de uma etapa medida externamente"""
+        key = (name, self._sensor_type(sensor))
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += seconds
+
+    def count(self, name, value=1, sensor=None):
+        key = (name, self._sensor_type(sensor))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def snapshot(self):
+        """Estado atual em dicionários simples (base do JSON)"""
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            counters = dict(self._counters)
+
+        stages = {}
+        for (name, sensor_type), values in histograms.items():
+            count = sum(values[:-1])
+            stages.setdefault(name, {})[sensor_type or 'total'] = {
+                'count': count,
+                'sum_seconds': values[-1],
+                'mean_ms': values[-1] / count * 1000 if count else 0.0,
+                'buckets': dict(zip([*map(str, self.buckets), '+Inf'], _cumulative(values[:-1]))),
+            }
+        totals = {}
+        for (name, sensor_type), value in counters.items():
+            totals.setdefault(name, {})[sensor_type or 'total'] = value
+        return {'timestamp': time.time(), 'stages': stages, 'counters': totals}
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def to_prometheus(self):
+        """Métricas no formato texto de exposição do Prometheus"""
+        with self._lock:
+            histograms = sorted((key, list(values)) for key, values in self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        prefix = self.namespace
+        lines = [
+            f"# HELP {prefix}_stage_seconds Duração das etapas de collect_data",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for (name, sensor_type), values in histograms:
+            labels = f'stage="{name}",sensor_type="{sensor_type}"'
+            for bound, total in zip([*map(repr, self.buckets), '+Inf'], _cumulative(values[:-1])):
+                lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{labels}}} {values[-1]!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{{labels}}} {sum(values[:-1])}')
+
+        declared = set()
+        for (name, sensor_type), value in counters:
+            metric = f"{prefix}_{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f'{metric}{{sensor_type="{sensor_type}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port=9108, host='0.0.0.0'):
+        """Expõe GET /metrics numa thread de fundo; retorna o servidor HTTP"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        instrumentation = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = instrumentation.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _cumulative(counts):
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem acoplável como hook: enquanto alguma etapa está em
+    andamento, uma thread de fundo lê a pilha da thread instrumentada a cada
+    interval segundos e conta as funções no topo por etapa.
+    """
+    def __init__(self, interval=0.001, depth=1):
+        self.interval = interval
+        self.depth = depth
+        self.samples = {}  # etapa -> Counter('arquivo:linha função')
+        self._active = {}  # id da thread -> etapa atual
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __call__(self, event, name, sensor_type):
+        thread_id = threading.get_ident()
+        with self._lock:
+            if event == 'start':
+                self._active[thread_id] = name
+            else:
+                self._active.pop(thread_id, None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stage in active.items():
+                frame = frames.get(thread_id)
+                counter = self.samples.setdefault(stage, Counter())
+                for _ in range(self.depth):
+                    if frame is None:
+                        break
+                    code = frame.f_code
+                    counter[f"{code.co_filename}:{frame.f_lineno} {code.co_name}"] += 1
+                    frame = frame.f_back
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def top(self, stage, n=10):
+        return self.samples.get(stage, Counter()).most_common(n)
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def set_instrumentation(instrumentation, sensor_class=None):
+    """
+    Define a instrumentação padrão de todos os sensores (ou de uma classe).
+    None desliga. Retorna a instrumentação ativa.
+    """
+    if sensor_class is None:
+        from simuladores.Sensor import Sensor as sensor_class
+    sensor_class.instrumentation = instrumentation or NULL_INSTRUMENTATION
+    return sensor_class.instrumentation
@@ -0,0 +1,36 @@
+import importlib
+import sys
+import types
+
+
+class LazyPackage(types.ModuleType):
+    """
+    Pacote cujas classes públicas só são importadas no primeiro acesso.
+    _lazy_exports mapeia nome exportado -> submódulo relativo que o define.
+    """
+    def __getattr__(self, name):
+        exports = self.__dict__.get('_lazy_exports', {})
+        if name not in exports:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        module = importlib.import_module(exports[name], self.__name__)
+        value = getattr(module, name)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # Importar um submódulo com o mesmo nome da classe (ex.: simuladores.ApogeeSP110Simulator)
+        # não pode esconder a classe exportada pelo pacote
+        if isinstance(value, types.ModuleType) and name in self.__dict__.get('_lazy_exports', {}):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._lazy_exports))
+
+
+def lazy_exports(package_name, exports):
+    """Transforma o pacote em LazyPackage com os nomes exportados em exports"""
+    package = sys.modules[package_name]
+    package.__class__ = LazyPackage
+    package._lazy_exports = exports
+    package.__all__ = list(exports)
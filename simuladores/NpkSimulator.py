@@ -1,5 +1,16 @@
-import random
+import numpy as np
 from simuladores.Sensor import Sensor
+from simuladores.Processes import ornstein_uhlenbeck
+
+# O clima muda em horas e os nutrientes do solo em dias. Chuva e nutrientes
+# mantêm a distribuição estacionária normal das leituras independentes anteriores;
+# a temperatura mantém a média e a faixa da uniforme(10, 40) anterior, mas, refletida
+# nos limites, concentra-se perto da média em vez de se espalhar uniformemente
+TEMPERATURE = ornstein_uhlenbeck(mean=25, std=8.7, tau=3 * 3600, low=10, high=40)
+RAIN = ornstein_uhlenbeck(mean=5, std=10, tau=3600)
+NITROGEN = ornstein_uhlenbeck(mean=25, std=10, tau=24 * 3600)
+PHOSPHORUS = ornstein_uhlenbeck(mean=12, std=4, tau=24 * 3600)
+POTASSIUM = ornstein_uhlenbeck(mean=120, std=30, tau=24 * 3600)
 
 
 class NPKSensorSimulator(Sensor):
@@ -7,32 +18,40 @@ class NPKSensorSimulator(Sensor):
     Simulador de sensor de NPK com capacidade de:
     - Simulação realista de concentrações de N, P e K no solo
     - Influência de chuva e temperatura nos níveis de nutrientes
+    - Clima e nutrientes correlacionados no tempo (processos Ornstein-Uhlenbeck)
     - Geração de DataFrame com os dados
     - Armazenamento no MySQL na tabela FatoValores (respeitando estrutura atual)
     """
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
-        super().__init__(sensor_id, region_id, mysql_connector)
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
         self.last_temp = 25
         self.last_rain = 5
+        self.temperature = self.add_process('temperature', TEMPERATURE)
+        self.rain = self.add_process('rain', RAIN)
+        self.nitrogen = self.add_process('nitrogen', NITROGEN)
+        self.phosphorus = self.add_process('phosphorus', PHOSPHORUS)
+        self.potassium = self.add_process('potassium', POTASSIUM)
 
     @property
     def sensor_type(self):
         return 'NPK'
 
-    def simulate_weather(self):
-        temperatura = random.uniform(10, 40)
-        chuva = max(0, random.gauss(5, 10))
+    def simulate_weather(self, dt=None):
+        dt = dt or self.sample_interval
+        temperatura = self.temperature.step(self.rng, dt)
+        chuva = max(0, self.rain.step(self.rng, dt))
         self.last_temp = round(temperatura, 1)
         self.last_rain = round(chuva, 1)
 
     def simulate_reading(self):
-        self.simulate_weather()
+        dt = self._step_interval()
+        self.simulate_weather(dt)
         temperatura = self.last_temp
         chuva = self.last_rain
 
-        nitrogenio = max(0, random.gauss(25, 10) - (chuva * 0.3 + max(0, temperatura - 35)))
-        fosforo = max(0, random.gauss(12, 4) - (chuva * 0.1))
-        potassio = max(0, random.gauss(120, 30) - (chuva * 0.2))
+        nitrogenio = max(0, self.nitrogen.step(self.rng, dt) - (chuva * 0.3 + max(0, temperatura - 35)))
+        fosforo = max(0, self.phosphorus.step(self.rng, dt) - (chuva * 0.1))
+        potassio = max(0, self.potassium.step(self.rng, dt) - (chuva * 0.2))
 
         return {
             "nitrogenio": round(nitrogenio, 1),
@@ -40,6 +59,25 @@ class NPKSensorSimulator(Sensor):
             "potassio": round(potassio, 1)
         }
 
+    def simulate_batch(self, n, timestamps=None):
+        """Versão vetorizada de simulate_reading para n leituras"""
+        dt = self._step_intervals(self._batch_timestamps(n, timestamps))
+        temperatura = np.round(self.temperature.step_batch(self.rng, dt), 1)
+        chuva = np.round(np.maximum(0, self.rain.step_batch(self.rng, dt)), 1)
+        if n:
+            self.last_temp = float(temperatura[-1])
+            self.last_rain = float(chuva[-1])
+
+        nitrogenio = np.maximum(0, self.nitrogen.step_batch(self.rng, dt) - (chuva * 0.3 + np.maximum(0, temperatura - 35)))
+        fosforo = np.maximum(0, self.phosphorus.step_batch(self.rng, dt) - (chuva * 0.1))
+        potassio = np.maximum(0, self.potassium.step_batch(self.rng, dt) - (chuva * 0.2))
+
+        return {
+            "nitrogenio": np.round(nitrogenio, 1),
+            "fosforo": np.round(fosforo, 1),
+            "potassio": np.round(potassio, 1)
+        }
+
     def _get_sensor_values(self, row):
         return [
             ('nitrogenio', row['nitrogenio']),
@@ -48,6 +86,7 @@ class NPKSensorSimulator(Sensor):
         ]
 
 if __name__ == "__main__":
+    import pandas as pd
     from connection import MySQLConnector
 
     mysql_config = {
@@ -64,10 +103,10 @@ if __name__ == "__main__":
         mysql_connector=mysql_connector
     )
 
-    df = sensor.collect_data(
+    payload = sensor.collect_data(
         num_samples=15,
         save_to_db=False
     )
 
     print("\nEstatísticas dos dados coletados:")
-    print(df.describe())
+    print(pd.DataFrame(payload).groupby('sensor_name')['valor'].describe())
@@ -0,0 +1,239 @@
+"""
+Processos estocásticos com estado para leituras correlacionadas no tempo.
+
+Todos são Ornstein-Uhlenbeck discretizados de forma exata:
+    x(t + dt) = média + phi * (x(t) - média) + s * N(0, 1)
+    phi = exp(-theta * dt),  s = sigma * sqrt((1 - phi²) / (2 * theta))
+- AR(1) é o caso de dt fixo (phi dado por passo)
+- theta = 0 é um passeio aleatório (phi = 1, s = sigma * sqrt(dt))
+A saída pode ser refletida entre limites (low/high) ou circular (period, ex.: 360°);
+o estado latente segue livre, então a reflexão não acumula viés.
+
+Os parâmetros ficam num ProcessSpec imutável, compartilhado por todos os
+sensores do mesmo tipo; cada Process guarda apenas o valor latente atual.
+"""
+import math
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+
+class ProcessSpec(NamedTuple):
+    mean: float = 0.0
+    theta: float = 0.0        # taxa de reversão à média (1/s); 0 = passeio aleatório
+    sigma: float = 1.0        # difusão (unidade / sqrt(s))
+    low: float = None
+    high: float = None
+    period: float = None      # saída circular em [0, period)
+    start_std: float = None   # desvio do valor inicial em torno de mean (passeio aleatório)
+
+    @property
+    def std(self):
+        """Desvio padrão estacionário (None no passeio aleatório)"""
+        if self.theta > 0:
+            return self.sigma / math.sqrt(2 * self.theta)
+        return self.start_std
+
+
+def ornstein_uhlenbeck(mean, std, tau, low=None, high=None, period=None):
+    """Processo com média e desvio estacionários e tempo de correlação tau (s)"""
+    return ProcessSpec(mean=mean, theta=1 / tau, sigma=std * math.sqrt(2 / tau), low=low, high=high, period=period)
+
+
+def ar1(mean, std, phi, step=1.0, low=None, high=None, period=None):
+    """AR(1) com coeficiente phi por passo de step segundos e desvio estacionário std"""
+    return ornstein_uhlenbeck(mean, std, -step / math.log(phi), low, high, period)
+
+
+def random_walk(step_std, step=1.0, start=0.0, start_std=None, low=None, high=None, period=None):
+    """Passeio aleatório com desvio step_std a cada step segundos"""
+    return ProcessSpec(mean=start, theta=0.0, sigma=step_std / math.sqrt(step),
+                       low=low, high=high, period=period, start_std=start_std)
+
+
+# Maior fator phi ** -k aceito num bloco de _ar1 (limita o erro de arredondamento)
+_MAX_GROWTH = 1e6
+# Trechos mais curtos que isso são calculados num loop simples
+_SHORT_RUN = 32
+
+# Coeficientes da aproximação de erf de Abramowitz e Stegun (7.1.26)
+_ERF_P = 0.3275911
+_ERF_A = (1.061405429, -1.453152027, 1.421413741, -0.284496736, 0.254829592)
+
+
+def normal_cdf(x):
+    """
+    CDF normal padrão vetorizada, 0.5 * (1 + erf(x / sqrt(2))), sem depender do
+    SciPy; erro absoluto abaixo de 1e-7, abaixo do arredondamento das leituras.
+    Arrays curtos usam math.erf (exato), mais barato que as operações vetoriais.
+    """
+    if len(x) < _SHORT_RUN:
+        return np.array([0.5 * (1 + math.erf(v / math.sqrt(2))) for v in x.tolist()])
+    z = np.abs(x) / math.sqrt(2)
+    t = 1 / (1 + _ERF_P * z)
+    poly = 0.0
+    for a in _ERF_A:
+        poly = (poly + a) * t
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.copysign(erf, x))
+
+
+@lru_cache(maxsize=64)
+def _powers(phi, size):
+    """(phi**k, phi**-k) para k = 0..size; phi se repete entre lotes com o mesmo dt"""
+    powers = phi ** np.arange(size + 1)
+    inverse = 1 / powers
+    powers.flags.writeable = inverse.flags.writeable = False
+    return powers, inverse
+
+
+def _ar1(phi, scale, previous, noise):
+    """
+    x[i] = phi * x[i - 1] + scale * noise[i], com x[-1] = previous. Em blocos,
+    x[i] = phi**(i+1) * previous + scale * phi**i * cumsum(noise[j] * phi**-j).
+    """
+    n = len(noise)
+    block = n if phi >= 1 else int(math.log(_MAX_GROWTH) / -math.log(phi)) if phi > 0 else 0
+    if n <= _SHORT_RUN or block < _SHORT_RUN:
+        out = []
+        for value in (scale * noise).tolist():
+            previous = phi * previous + value
+            out.append(previous)
+        return np.array(out)
+
+    out = np.empty(n)
+    # Tamanhos arredondados para potências de 2: poucas entradas distintas no cache
+    powers, inverse = _powers(phi, 1 << (min(block, n) - 1).bit_length())
+    for begin in range(0, n, block):
+        end = min(n, begin + block)
+        m = end - begin
+        weighted = np.cumsum(noise[begin:end] * inverse[:m])
+        out[begin:end] = powers[1:m + 1] * previous + scale * powers[:m] * weighted
+        previous = out[end - 1]
+    return out
+
+
+def _constrain_value(spec, x):
+    """_constrain para uma leitura, sem ufuncs NumPy"""
+    if spec.period is not None:
+        return x % spec.period
+    low, high = spec.low, spec.high
+    if low is not None and high is not None:
+        width = high - low
+        folded = (x - low) % (2 * width)
+        return low + (2 * width - folded if folded > width else folded)
+    if low is not None:
+        return low + abs(x - low)
+    if high is not None:
+        return high - abs(high - x)
+    return x
+
+
+def _constrain(spec, x):
+    if spec.period is not None:
+        return np.mod(x, spec.period)
+    low, high = spec.low, spec.high
+    if low is not None and high is not None:
+        width = high - low
+        folded = np.mod(x - low, 2 * width)
+        return low + np.where(folded > width, 2 * width - folded, folded)
+    if low is not None:
+        return low + np.abs(x - low)
+    if high is not None:
+        return high - np.abs(high - x)
+    return x
+
+
+class Process:
+    """Estado de um processo: apenas o valor latente (None até a primeira leitura)"""
+    __slots__ = ('spec', 'value')
+
+    def __init__(self, spec, value=None):
+        self.spec = spec
+        self.value = value
+
+    def reset(self, value=None):
+        self.value = value
+
+    def _coefficients(self, dt):
+        spec = self.spec
+        if spec.theta > 0:
+            phi = math.exp(-spec.theta * dt)
+            return phi, spec.sigma * math.sqrt((1 - phi * phi) / (2 * spec.theta))
+        return 1.0, spec.sigma * math.sqrt(dt)
+
+    def _initial(self, rng):
+        spec = self.spec
+        if spec.std:
+            return spec.mean + spec.std * rng.standard_normal()
+        if spec.period is not None:
+            return rng.uniform(0, spec.period)
+        if spec.low is not None and spec.high is not None:
+            return rng.uniform(spec.low, spec.high)
+        return spec.mean
+
+    def step(self, rng, dt=1.0):
+        """Avança dt segundos e retorna a nova leitura"""
+        if self.value is None:
+            self.value = float(self._initial(rng))
+        else:
+            phi, scale = self._coefficients(float(dt))
+            self.value = self.spec.mean + phi * (self.value - self.spec.mean) + scale * rng.standard_normal()
+        return _constrain_value(self.spec, self.value)
+
+    def step_batch(self, rng, dt):
+        """
+        Avança uma leitura por elemento de dt (segundos desde a anterior) e retorna
+        o array de leituras. Equivale a chamar step em sequência com o mesmo gerador
+        (em lotes longos, a menos de arredondamento de ponto flutuante).
+        """
+        dt = np.asarray(dt, dtype=float)
+        n = len(dt)
+        latent = np.empty(n)
+        if n == 0:
+            return latent
+
+        start = 0
+        if self.value is None:
+            self.value = float(self._initial(rng))
+            latent[0] = self.value
+            start = 1
+
+        mean = self.spec.mean
+        noise = rng.standard_normal(n - start)
+        dt = dt[start:]
+        if n <= _SHORT_RUN:
+            return self._step_short(latent, start, dt, noise)
+        # Trechos com o mesmo dt têm coeficientes constantes: uma recursão AR(1) por trecho
+        bounds = [0, *(np.flatnonzero(dt[1:] != dt[:-1]) + 1).tolist(), len(dt)]
+        previous = self.value - mean
+        for begin, end in zip(bounds[:-1], bounds[1:]):
+            if begin == end:
+                continue
+            phi, scale = self._coefficients(dt.item(begin))
+            if end - begin == 1:
+                # Ex.: a primeira leitura do lote, com o intervalo desde o lote anterior
+                previous = phi * previous + scale * noise.item(begin)
+                latent[start + begin] = mean + previous
+                continue
+            deviation = _ar1(phi, scale, previous, noise[begin:end])
+            latent[start + begin:start + end] = mean + deviation
+            previous = deviation.item(-1)
+
+        self.value = float(latent[-1])
+        return _constrain(self.spec, latent)
+
+    def _step_short(self, latent, start, dt, noise):
+        """step_batch para lotes curtos: loop com floats Python, sem overhead de NumPy"""
+        spec = self.spec
+        value = self.value
+        last_dt = coefficients = None
+        for i, (step_dt, draw) in enumerate(zip(dt.tolist(), noise.tolist()), start):
+            if step_dt != last_dt:
+                last_dt, coefficients = step_dt, self._coefficients(step_dt)
+            phi, scale = coefficients
+            value = spec.mean + phi * (value - spec.mean) + scale * draw
+            latent[i] = value
+        self.value = value
+        return np.array([_constrain_value(spec, x) for x in latent.tolist()])
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class ReadingBuffer:
+    """
+    Buffer circular pré-alocado das leituras de um sensor, num array estruturado
+    NumPy (timestamp datetime64[us] + uma coluna por canal):
+    - write() grava um lote no lugar e devolve a região gravada como view, sem cópia
+    - Cada lote fica contíguo: se não couber no fim, volta ao início do buffer
+    - Cada leitura ocupa itemsize bytes (8 do timestamp + 8 por canal em float64)
+    Uma região continua válida até o buffer dar a volta e gravar por cima dela;
+    is_valid() indica se isso já aconteceu.
+    """
+    def __init__(self, columns, capacity=4096, dtype='f8'):
+        self.dtype = np.dtype([('timestamp', 'datetime64[us]')] + [(column, dtype) for column in columns])
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=self.dtype)
+        self.head = 0        # próxima posição livre na volta atual
+        self.lap = 0         # quantas vezes o buffer voltou ao início
+        self._lap_end = 0    # fim dos dados válidos da volta anterior
+        self.written = 0
+
+    @property
+    def nbytes_per_reading(self):
+        return self.dtype.itemsize
+
+    def __len__(self):
+        """Leituras disponíveis para latest()"""
+        if self.lap == 0:
+            return self.head
+        return self.head + max(0, self._lap_end - self.head)
+
+    def _grow(self, n):
+        capacity = self.capacity
+        while capacity < n:
+            capacity *= 2
+        self.data = np.zeros(capacity, dtype=self.dtype)
+        self.capacity = capacity
+        self.head = 0
+        self.lap += 1
+        self._lap_end = 0
+
+    def write(self, timestamps, readings):
+        """Grava n leituras ({coluna: array}) e retorna (view da região, lap, início)"""
+        n = len(timestamps)
+        if n > self.capacity:
+            self._grow(n)
+        elif self.head + n > self.capacity:
+            self._lap_end = self.head
+            self.head = 0
+            self.lap += 1
+
+        start = self.head
+        region = self.data[start:start + n]
+        region['timestamp'] = timestamps
+        for column in self.dtype.names[1:]:
+            region[column] = readings[column]
+        self.head += n
+        self.written += n
+        return region, self.lap, start
+
+    def is_valid(self, lap, start):
+        """Se a região gravada em (lap, start) ainda não foi sobrescrita"""
+        if lap == self.lap:
+            return True
+        return lap == self.lap - 1 and self.head <= start
+
+    def latest(self, n=None):
+        """Últimas n leituras em ordem de gravação (cópia apenas se atravessarem a volta)"""
+        available = len(self)
+        n = available if n is None else min(n, available)
+        if n <= self.head:
+            return self.data[self.head - n:self.head]
+        older = n - self.head
+        return np.concatenate((self.data[self._lap_end - older:self._lap_end], self.data[:self.head]))
+
+    def clear(self):
+        self.head = 0
+        self.lap += 1
+        self._lap_end = 0
+
+
+class ReadingBatch:
+    """
+    Lote de leituras de collect_batch, lido direto do ReadingBuffer do sensor.
+    Os registros log_exec (dicionários JSON) só são montados em to_records().
+    """
+    def __init__(self, sensor, region, num_samples, lap=None, start=None):
+        self.sensor = sensor
+        self.num_samples = num_samples
+        self._region = region
+        self._position = (lap, start)
+        self._emit = None
+
+    @property
+    def valid(self):
+        lap, start = self._position
+        return lap is None or self.sensor.buffer.is_valid(lap, start)
+
+    def _checked_region(self):
+        if not self.valid:
+            raise RuntimeError("Lote sobrescrito no buffer do sensor; use copy() para mantê-lo por mais tempo")
+        return self._region
+
+    @property
+    def columns(self):
+        """{coluna: view} sobre o buffer, sem cópia"""
+        region = self._checked_region()
+        return {name: region[name] for name in region.dtype.names}
+
+    @property
+    def emit(self):
+        """
+        Máscara do deadband do sensor (leituras x elementos), calculada uma única
+        vez por lote para não avançar o estado do filtro duas vezes; None sem filtro.
+        """
+        if self._emit is None and self.sensor.deadband is not None:
+            self._emit = self.sensor._deadband_mask(self.columns)
+        return self._emit
+
+    def __len__(self):
+        return len(self._region)
+
+    def copy(self):
+        """Lote independente do buffer"""
+        batch = ReadingBatch(self.sensor, self._checked_region().copy(), self.num_samples)
+        batch._emit = self._emit
+        return batch
+
+    def to_records(self, file_path=None):
+        """Registros log_exec como lista de dicionários (payload JSON), já filtrados pelo deadband"""
+        return self.sensor._save_to_json(self.columns, self.num_samples, file_path, self.emit)
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.columns)
@@ -0,0 +1,285 @@
+"""
+Registro de tipos de sensor.
+
+Um tipo pode ser uma subclasse de Sensor escrita à mão (os simuladores deste
+pacote) ou declarado por um schema, compilado uma única vez numa subclasse de
+SchemaSensor. Os schemas descrevem canais, unidades, faixas, curva base e
+modelo de ruído; a geração é sempre vetorizada e a leitura única usa o mesmo
+caminho com n=1.
+
+Exemplo de schema (ver sensor_schema.example.json):
+{
+    "sensor_type": "WatermarkSoilTension",
+    "channels": [
+        {
+            "name": "tensao", "unit": "kPa", "range": [0, 200], "decimals": 1,
+            "base": [{"profile": "soil_moisture", "scale": -1.5, "offset": 150},
+                     {"process": "ou", "mean": 0, "std": 5, "tau": 3600}],
+            "noise": {"sd": [1, 0.01], "clip": [3, 0.03]}
+        }
+    ]
+}
+
+Componentes de "base" (somados quando em lista):
+- {"constant": v}
+- {"uniform": [a, b]} / {"normal": [média, desvio]}
+- {"profile": nome, "scale": 1, "offset": 0, "night": [a, b]}: perfil diurno
+  (Diurnal.lookup_at); "night" sorteia uniforme onde o perfil é NaN
+- {"process": "ou" | "ar1" | "random_walk", ...parâmetros}: processo correlacionado
+  (Processes), com estado próprio em cada sensor
+"noise": normal com desvio sd[0] + sd[1] * base, limitado a ±(clip[0] + clip[1] * base).
+
+Pacotes externos publicam tipos no grupo de entry points "agrosync.sensors";
+cada entry point aponta para uma subclasse de Sensor, um schema (dict) ou um
+caminho de arquivo JSON.
+"""
+import importlib
+import json
+import threading
+
+import numpy as np
+
+from simuladores.Sensor import Sensor
+
+ENTRY_POINT_GROUP = 'agrosync.sensors'
+
+# Simuladores do pacote, importados apenas quando pedidos
+BUILTIN_TYPES = {
+    'ApogeeSP110': 'simuladores.ApogeeSP110Simulator:ApogeeSP110Simulator',
+    'NPK': 'simuladores.NpkSimulator:NPKSensorSimulator',
+    'DecagonEC5': 'simuladores.DecagonEC5Simulator:DecagonEC5Simulator',
+    'SHT31': 'simuladores.SensirionSHT31Simulator:SHT31Simulator',
+    'Davis6410': 'simuladores.DavisSimulator:Davis6410Simulator',
+    'EzoPhSensor': 'simuladores.EzoPhSimulator:EzoPhSensor',
+}
+
+_registry = {}
+_lock = threading.Lock()
+_entry_points_loaded = False
+
+
+def _base_component(component):
+    """
+    Compila um componente da curva base em f(sensor, n, timestamps, dt) -> np.ndarray.
+    Processos correlacionados retornam o ProcessSpec, cujo estado fica em cada sensor.
+    """
+    if 'constant' in component:
+        value = float(component['constant'])
+        return lambda sensor, n, timestamps, dt: np.full(n, value)
+
+    if 'uniform' in component:
+        low, high = component['uniform']
+        return lambda sensor, n, timestamps, dt: sensor.rng.uniform(low, high, n)
+
+    if 'normal' in component:
+        mean, std = component['normal']
+        return lambda sensor, n, timestamps, dt: sensor.rng.normal(mean, std, n)
+
+    if 'profile' in component:
+        from simuladores.Diurnal import get_profile, lookup_at
+
+        name = component['profile']
+        get_profile(name)  # valida o nome já na compilação
+        scale = component.get('scale', 1.0)
+        offset = component.get('offset', 0.0)
+        night = component.get('night')
+
+        def profile(sensor, n, timestamps, dt):
+            values = lookup_at(name, timestamps, sensor.region_id)
+            if night is not None:
+                values = np.where(np.isnan(values), sensor.rng.uniform(night[0], night[1], n), values)
+            return values * scale + offset
+        return profile
+
+    if 'process' in component:
+        from simuladores import Processes
+
+        params = {key: value for key, value in component.items() if key not in ('process', 'name')}
+        builders = {
+            'ou': Processes.ornstein_uhlenbeck,
+            'ar1': Processes.ar1,
+            'random_walk': Processes.random_walk,
+        }
+        if component['process'] not in builders:
+            raise ValueError(f"Processo desconhecido: {component['process']}")
+        return builders[component['process']](**params)
+
+    raise ValueError(f"Componente de base desconhecido: {component}")
+
+
+class Channel:
+    """Canal compilado de um schema: gera os valores de uma coluna"""
+    def __init__(self, schema):
+        self.name = schema['name']
+        self.element = schema.get('element', self.name)
+        self.unit = schema.get('unit')
+        self.low, self.high = schema.get('range', (None, None))
+        self.decimals = schema.get('decimals', 2)
+
+        components = schema.get('base', {'constant': 0})
+        if isinstance(components, dict):
+            components = [components]
+        self.functions = []
+        self.processes = []  # (nome do estado no sensor, ProcessSpec)
+        for position, component in enumerate(components):
+            compiled = _base_component(component)
+            if 'process' in component:
+                self.processes.append((component.get('name', f"{self.name}.{position}"), compiled))
+            else:
+                self.functions.append(compiled)
+
+        noise = schema.get('noise')
+        self.noise_sd = noise.get('sd', (0, 0)) if noise else None
+        self.noise_clip = noise.get('clip') if noise else None
+
+    def generate(self, sensor, n, timestamps, dt):
+        base = np.zeros(n)
+        for function in self.functions:
+            base = base + function(sensor, n, timestamps, dt)
+        for state_name, _ in self.processes:
+            base = base + sensor.processes[state_name].step_batch(sensor.rng, dt)
+        if self.low is not None or self.high is not None:
+            base = np.clip(base, self.low, self.high)
+
+        values = base
+        if self.noise_sd is not None:
+            noise = sensor.rng.normal(0, np.abs(self.noise_sd[0] + self.noise_sd[1] * base))
+            if self.noise_clip is not None:
+                limit = np.abs(self.noise_clip[0] + self.noise_clip[1] * base)
+                noise = np.clip(noise, -limit, limit)
+            values = base + noise
+
+        values = np.round(values * sensor.calibration_factor, self.decimals)
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+
+class SchemaSensor(Sensor):
+    """
+    Sensor gerado a partir de um schema; as subclasses concretas são criadas
+    por compile_schema e guardam os canais compilados em channels.
+    """
+    schema = None
+    channels = ()
+    units = {}
+
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
+        self.calibration_factor = 1.0
+        for channel in self.channels:
+            for state_name, spec in channel.processes:
+                self.add_process(state_name, spec)
+
+    @property
+    def sensor_type(self):
+        return self.schema['sensor_type']
+
+    def calibrate(self, calibration_factor=1.0):
+        self.calibration_factor = calibration_factor
+        print(f"Sensor calibrado com fator {calibration_factor:.2f}")
+
+    def simulate_reading(self):
+        moment = np.array([np.datetime64(self.clock(), 'us')])
+        return {name: float(values[0]) for name, values in self.simulate_batch(1, timestamps=moment).items()}
+
+    def simulate_batch(self, n, timestamps=None):
+        timestamps = self._batch_timestamps(n, timestamps)
+        dt = self._step_intervals(timestamps)
+        return {channel.name: channel.generate(self, n, timestamps, dt) for channel in self.channels}
+
+    def _get_sensor_values(self, row):
+        return [(channel.element, row[channel.name]) for channel in self.channels]
+
+
+def compile_schema(schema):
+    """Valida o schema e cria a subclasse de SchemaSensor correspondente"""
+    if 'sensor_type' not in schema or not schema.get('channels'):
+        raise ValueError("Schema de sensor requer 'sensor_type' e ao menos um canal em 'channels'")
+    channels = tuple(Channel(channel) for channel in schema['channels'])
+    names = [channel.name for channel in channels]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Canais repetidos no schema {schema['sensor_type']}: {names}")
+    if len(channels) == 1 and 'element' not in schema['channels'][0]:
+        # Canal único sai só com o tipo do sensor em sensor_name, como os simuladores de um valor
+        channels[0].element = None
+
+    class_name = ''.join(part[:1].upper() + part[1:] for part in schema['sensor_type'].split()) + 'Simulator'
+    return type(class_name, (SchemaSensor,), {
+        '__module__': __name__,
+        'schema': schema,
+        'channels': channels,
+        'units': {channel.name: channel.unit for channel in channels},
+        '__doc__': schema.get('description', f"Sensor {schema['sensor_type']} definido por schema"),
+    })
+
+
+def register(sensor_class, name=None):
+    """
+    Registra uma subclasse de Sensor com o nome informado (padrão: sensor_type
+    do schema ou o nome da classe); usável como decorador.
+    """
+    if name is None:
+        name = sensor_class.schema['sensor_type'] if issubclass(sensor_class, SchemaSensor) else sensor_class.__name__
+    with _lock:
+        _registry[name] = sensor_class
+    return sensor_class
+
+
+def register_schema(schema):
+    """Compila e registra um schema (dict ou caminho de arquivo JSON); retorna a classe"""
+    if isinstance(schema, str):
+        with open(schema, encoding='utf-8') as f:
+            schema = json.load(f)
+    sensor_class = compile_schema(schema)
+    return register(sensor_class, schema['sensor_type'])
+
+
+def load_entry_points(group=ENTRY_POINT_GROUP):
+    """Registra os tipos publicados por pacotes instalados no grupo de entry points"""
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=group):
+        try:
+            target = entry_point.load()
+        except Exception as e:
+            print(f"Erro ao carregar o sensor {entry_point.name}: {e}")
+            continue
+        if isinstance(target, type) and issubclass(target, Sensor):
+            register(target, entry_point.name)
+        elif isinstance(target, (dict, str)):
+            register_schema(target)
+        else:
+            print(f"Entry point {entry_point.name} não é um Sensor nem um schema")
+
+
+def _ensure_entry_points():
+    global _entry_points_loaded
+    if not _entry_points_loaded:
+        _entry_points_loaded = True
+        load_entry_points()
+
+
+def get_sensor_type(name):
+    """Classe registrada para o tipo; os simuladores do pacote são importados sob demanda"""
+    sensor_class = _registry.get(name)
+    if sensor_class is not None:
+        return sensor_class
+    if name in BUILTIN_TYPES:
+        module_name, class_name = BUILTIN_TYPES[name].split(':')
+        return register(getattr(importlib.import_module(module_name), class_name), name)
+    _ensure_entry_points()
+    if name not in _registry:
+        raise KeyError(f"Tipo de sensor desconhecido: {name}")
+    return _registry[name]
+
+
+def available_types():
+    """Nomes de todos os tipos conhecidos (pacote, registrados e entry points)"""
+    _ensure_entry_points()
+    return list(dict.fromkeys([*BUILTIN_TYPES, *_registry]))
+
+
+def create(name, *args, **kwargs):
+    """Instancia um sensor do tipo informado"""
+    return get_sensor_type(name)(*args, **kwargs)
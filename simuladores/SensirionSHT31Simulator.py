@@ -1,25 +1,28 @@
-import os
-from datetime import datetime
-from pymysql import Error
-import pandas as pd
-import random
-import psutil
-import json
+import math
+
+import numpy as np
 
 from simuladores.Sensor import Sensor
+from simuladores.Diurnal import hours_of_day
+from simuladores.Processes import normal_cdf, ornstein_uhlenbeck
+
+# Nível de umidade em escala normal padrão; mapeado pela CDF normal para uma
+# posição uniforme dentro da faixa do dia (40-100%) ou da noite (0-40%)
+HUMIDITY_LEVEL = ornstein_uhlenbeck(mean=0, std=1, tau=1800)
 
 
 class SHT31Simulator(Sensor):
     """
     Simulador do sensor Sensirion SHT31 com capacidade de:
-    - Simulação realista de humidade relativa do ar
+    - Simulação realista de humidade relativa do ar, correlacionada entre leituras
     - Geração de DataFrame com os dados
     - Armazenamento no MySQL na tabela FatoValores
     """
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
-        super().__init__(sensor_id, region_id, mysql_connector)
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
+        super().__init__(sensor_id, region_id, mysql_connector, seed)
         self.max_humidity = 100
         self.calibration_factor = 1.0
+        self.humidity_level = self.add_process('humidity_level', HUMIDITY_LEVEL)
 
     @property
     def sensor_type(self):
@@ -31,15 +34,17 @@ class SHT31Simulator(Sensor):
 
     def simulate_reading(self, base_value=None):
         if base_value is None:
-            now = datetime.now()
+            now = self.clock()
             hour = now.hour + now.minute / 60 + now.second / 3600
+            level = self.humidity_level.step(self.rng, self._step_interval())
+            position = 0.5 * (1 + math.erf(level / math.sqrt(2)))
 
             if 5 <= hour <= 19:
-                base_value = random.uniform(40, 100)
+                base_value = 40 + 60 * position
             else:
-                base_value = random.uniform(0, 40)
+                base_value = 40 * position
 
-        noise = random.gauss(0, base_value * 0.02 + 2)
+        noise = self.rng.normal(0, base_value * 0.02 + 2)
         max_variation = base_value * 0.05 + 5
         measured_value = base_value + max(-max_variation, min(noise, max_variation))
         calibrated_value = measured_value * self.calibration_factor
@@ -47,10 +52,33 @@ class SHT31Simulator(Sensor):
             "humidity": min(max(round(calibrated_value, 1), 0), self.max_humidity)
         }
 
+    def simulate_batch(self, n, base_value=None, timestamps=None):
+        """Versão vetorizada de simulate_reading para n leituras"""
+        if base_value is None:
+            timestamps = self._batch_timestamps(n, timestamps)
+            hour = hours_of_day(timestamps)
+            day = (hour >= 5) & (hour <= 19)
+            level = self.humidity_level.step_batch(self.rng, self._step_intervals(timestamps))
+            position = normal_cdf(level)
+
+            # Dia: faixa [40, 100); noite: faixa [0, 40)
+            base_value = position * np.where(day, 60, 40) + np.where(day, 40, 0)
+        else:
+            base_value = np.full(n, base_value, dtype=float)
+
+        noise = self.rng.normal(0, base_value * 0.02 + 2)
+        max_variation = base_value * 0.05 + 5
+        measured_value = base_value + np.clip(noise, -max_variation, max_variation)
+        calibrated_value = measured_value * self.calibration_factor
+        return {
+            "humidity": np.clip(np.round(calibrated_value, 1), 0, self.max_humidity)
+        }
+
     def _get_sensor_values(self, row):
         return [("humidity", row["humidity"]),]
 
 if __name__ == "__main__":
+    import pandas as pd
     from connection import MySQLConnector
 
     mysql_config = {
@@ -67,10 +95,10 @@ if __name__ == "__main__":
         mysql_connector=mysql_connector
     )
 
-    df = sensor.collect_data(
+    payload = sensor.collect_data(
         num_samples=15,
         save_to_db=False
     )
 
     print("\nEstatísticas dos dados coletados:")
-    print(df.describe())
\ No newline at end of file
+    print(pd.DataFrame(payload).groupby('sensor_name')['valor'].describe())
\ No newline at end of file
@@ -1,19 +1,129 @@
+import atexit
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import final
 
-from pymysql import Error
-import os
-import json
-import psutil
-import pandas as pd
+import numpy as np
+
+from simuladores.Instrumentation import NULL_INSTRUMENTATION
+
+LOG_EXEC_COLUMNS = (
+    'id_sensor', 'valor', 'dt_exec', 'dt_start_exec', 'dt_end_exec',
+    'qtd_data', 'ram_usage', 'process_usage', 'sensor_name'
+)
+
+# Referência de _step_interval, igual à de datetime64 para datetimes sem fuso
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Gravadores NDJSON abertos por caminho, compartilhados entre os sensores do processo
+_file_writers = {}
+
+
+def close_file_writers():
+    """Fecha (com flush) os gravadores NDJSON abertos por collect_data; chamada também no atexit"""
+    while _file_writers:
+        _, writer = _file_writers.popitem()
+        writer.close()
+
+
+atexit.register(close_file_writers)
+
+# pandas, psutil e pymysql são importados apenas quando usados, para manter
+# leve a importação dos simuladores (ver benchmarks/ImportBenchmark.py)
 
 class Sensor(ABC):
-    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None):
+    # Métricas por etapa de collect_data; desligada por padrão (ver Instrumentation)
+    instrumentation = NULL_INSTRUMENTATION
+    # Segundos atribuídos a cada leitura quando o horário não avança entre elas
+    # (ex.: todas as amostras de um collect_data têm o mesmo timestamp)
+    sample_interval = 5.0
+    # Leituras mantidas no ReadingBuffer do sensor (cresce se um lote for maior)
+    buffer_capacity = 4096
+    # Relato por exceção (DeadbandFilter); None = todas as leituras são emitidas
+    deadband = None
+
+    def __init__(self, sensor_id=None, region_id=None, mysql_connector=None, seed=None):
         self.sensor_id = sensor_id
         self.region_id = region_id
         self.mysql_connector = mysql_connector
         self.sensor_name = self.__class__.__name__
+        # Fonte de horário das leituras; substituível por um SimulatedClock
+        self.clock = datetime.now
+        # Processos correlacionados no tempo (ver Processes), por nome
+        self.processes = {}
+        self._last_sample_time = None
+        # Criado no primeiro collect_batch, quando as colunas do sensor são conhecidas
+        self.buffer = None
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """
+        Reinicia o gerador aleatório próprio do sensor. seed aceita um inteiro,
+        uma sequência de inteiros ou um np.random.SeedSequence; sementes iguais
+        produzem leituras idênticas, tanto em simulate_reading quanto em simulate_batch.
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.rng = np.random.Generator(np.random.PCG64(seed))
+        # Reiniciar a semente também reinicia os processos, para leituras reproduzíveis
+        for process in getattr(self, 'processes', {}).values():
+            process.reset()
+        self._last_sample_time = None
+
+    def get_state(self):
+        """Estado que faz a simulação continuar de onde parou: gerador, processos e último horário"""
+        return {
+            'rng': self.rng.bit_generator.state,
+            'processes': {name: process.value for name, process in self.processes.items()},
+            'last_sample_time': self._last_sample_time,
+        }
+
+    def set_state(self, state):
+        """Restaura um estado de get_state (ex.: de outro processo)"""
+        self.rng.bit_generator.state = state['rng']
+        for name, value in state['processes'].items():
+            self.processes[name].reset(value)
+        self._last_sample_time = state['last_sample_time']
+
+    def spawn_seeds(self, n):
+        """Deriva n sementes independentes da semente deste sensor"""
+        return self.seed_sequence.spawn(n)
+
+    def add_process(self, name, spec):
+        """Registra um processo correlacionado (ProcessSpec) e retorna seu estado"""
+        from simuladores.Processes import Process
+
+        self.processes[name] = Process(spec)
+        return self.processes[name]
+
+    def _step_intervals(self, timestamps):
+        """
+        Segundos entre leituras consecutivas (a primeira, desde a última leitura
+        do sensor); intervalos nulos ou negativos valem sample_interval.
+        """
+        seconds = np.asarray(timestamps, dtype='datetime64[us]').astype(np.int64) / 1e6
+        if not len(seconds):
+            return seconds
+        previous = self._last_sample_time
+        if previous is None:
+            previous = seconds[0] - self.sample_interval
+        dt = np.empty_like(seconds)
+        dt[0] = seconds[0] - previous
+        np.subtract(seconds[1:], seconds[:-1], out=dt[1:])
+        dt[dt <= 0] = self.sample_interval
+        self._last_sample_time = seconds[-1]
+        return dt
+
+    def _step_interval(self):
+        """Versão de _step_intervals para uma leitura no horário atual de self.clock, sem NumPy"""
+        seconds = ((self.clock() - _EPOCH) // _MICROSECOND) / 1e6
+        previous = self._last_sample_time
+        self._last_sample_time = seconds
+        if previous is None or seconds <= previous:
+            return self.sample_interval
+        return seconds - previous
 
     @property
     @abstractmethod
@@ -24,11 +134,10 @@ class Sensor(ABC):
     @staticmethod
     @final
     def _get_system_metrics():
-        process = psutil.Process(os.getpid())
-        return {
-            'cpu_usage': psutil.cpu_percent(),
-            'mem_mb': process.memory_info().rss / (1024 * 1024)
-        }
+        """Última amostra do amostrador de fundo compartilhado (ver SystemMetrics)"""
+        from simuladores.SystemMetrics import get_sampler
+
+        return get_sampler().latest()
 
     @staticmethod
     def _execute_batch_insert(cursor, values):
@@ -40,62 +149,130 @@ class Sensor(ABC):
         cursor.executemany(query, values)
 
     @final
-    def _save_to_mysql(self, data_frame, num_sample):
-        if not all([self.mysql_connector, self.sensor_id is not None, self.region_id is not None]):
+    def _save_to_mysql(self, data_frame, num_sample, bulk_loader=None, emit=None):
+        from pymysql import Error
+
+        if not all([bulk_loader or self.mysql_connector, self.sensor_id is not None, self.region_id is not None]):
             print("Configuração MySQL incompleta - pulando salvamento no banco")
             return False
 
+        if bulk_loader is not None:
+            # Os registros ficam no loader e são gravados no flush, junto com os demais sensores
+            records = self._build_log_records(data_frame, num_sample, emit=emit)
+            bulk_loader.add(zip(*records.values()))
+            self.instrumentation.count('db_rows_queued', len(records['valor']), self)
+            return True
+
         try:
             with self.mysql_connector.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    metrics = self._get_system_metrics()
-                    values = []
-
-                    for _, row in data_frame.iterrows():
-                        time_init = row['timestamp']
-                        for element_name, valor in self._get_sensor_values(row):
-                            values.append((
-                                self.sensor_id,
-                                valor,
-                                time_init.strftime('%Y-%m-%d'),
-                                time_init,
-                                datetime.now(),
-                                num_sample,
-                                round(metrics['mem_mb'], 2),
-                                metrics['cpu_usage'],
-                                f"{self.sensor_type} {element_name}" if element_name else self.sensor_type
-                            ))
+                    records = self._build_log_records(data_frame, num_sample, emit=emit)
+                    values = list(zip(*records.values()))
                     self._execute_batch_insert(cursor, values)
                     conn.commit()
+            self.instrumentation.count('db_rows_inserted', len(values), self)
 
         except Error as e:
             print(f"Erro ao salvar no MySQL: {e}")
+            self.instrumentation.count('failures', 1, self)
             return False
 
     @final
-    def _save_to_json(self, data_frame, num_sample, file_path='dados_sensores.json'):
-        metrics = self._get_system_metrics()
-        json_data = []
-
-        for _, row in data_frame.iterrows():
-            time_init = row['timestamp']
-
-            for element_name, valor in self._get_sensor_values(row):
-                json_data.append({
-                    "id_sensor": self.sensor_id,
-                    "valor": valor,
-                    "dt_exec": time_init.strftime('%Y-%m-%d'),
-                    "dt_start_exec": time_init.isoformat(),
-                    "dt_end_exec": datetime.now().isoformat(),
-                    "qtd_data": num_sample,
-                    "ram_usage": round(metrics['mem_mb'], 2),
-                    "process_usage": metrics['cpu_usage'],
-                    "sensor_name": f"{self.sensor_type} {element_name}" if element_name else self.sensor_type
-                })
-
-        # self._save_in_file(file_path, json_data)
+    def _save_to_json(self, data_frame, num_sample, file_path=None, emit=None):
+        records = self._build_log_records(data_frame, num_sample, as_text=True, emit=emit)
+        json_data = [dict(zip(LOG_EXEC_COLUMNS, row)) for row in zip(*records.values())]
+
+        if file_path:
+            instrumentation = self.instrumentation
+            with instrumentation.stage('save_file', self):
+                written = self._save_in_file(file_path, json_data)
+            instrumentation.count('bytes_serialized', written or 0, self)
         return json_data
 
+    @final
+    def _elements(self, data_frame):
+        """(elemento, coluna) de cada canal; _get_sensor_values aplicado aos nomes das colunas"""
+        return list(self._get_sensor_values({col: col for col in data_frame.keys()}))
+
+    @final
+    def _deadband_mask(self, data_frame):
+        """Máscara de emissão (leituras x elementos) do filtro deadband, ou None sem filtro"""
+        if self.deadband is None:
+            return None
+        emit = self.deadband.apply(self, data_frame, self._elements(data_frame))
+        self.instrumentation.count('records_suppressed', emit.size - int(emit.sum()), self)
+        return emit
+
+    @final
+    def _masked_frame(self, data_frame, emit=None):
+        """
+        DataFrame para sinks colunares: valores suprimidos pelo deadband viram NaN
+        e leituras sem nenhum valor emitido são removidas.
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(data_frame)
+        if emit is None:
+            return df
+        for position, (_, column) in enumerate(self._elements(data_frame)):
+            df[column] = df[column].where(emit[:, position])
+        return df[emit.any(axis=1)].reset_index(drop=True)
+
+    @final
+    def _build_log_records(self, data_frame, num_sample, as_text=False, emit=None):
+        """
+        Monta os registros de log_exec de forma colunar, sem iterar linha a linha.
+        Retorna um dicionário {coluna: lista} na ordem de LOG_EXEC_COLUMNS, com os
+        registros ordenados por amostra e, dentro dela, por elemento.
+        Com as_text=True as datas saem em ISO (payload JSON); senão como datetime (MySQL).
+        data_frame pode ser um DataFrame ou um dicionário {coluna: array}.
+        emit (máscara leituras x elementos do deadband) descarta os registros suprimidos.
+        """
+        metrics = self._get_system_metrics()
+        elements = self._elements(data_frame)
+        timestamps = np.asarray(data_frame['timestamp'], dtype='datetime64[us]')
+        num_rows = len(timestamps)
+        total = num_rows * len(elements)
+
+        if total:
+            valores = np.column_stack([np.asarray(data_frame[col]) for _, col in elements]).ravel()
+        else:
+            valores = np.empty(0)
+
+        # Formata apenas os timestamps distintos e espalha pelos registros
+        uniques, codes = np.unique(timestamps, return_inverse=True)
+        uniques = uniques.astype(datetime)
+        codes = np.repeat(codes, len(elements))
+        sensor_names = [f"{self.sensor_type} {element_name}" if element_name else self.sensor_type
+                        for element_name, _ in elements]
+        if emit is not None and total:
+            keep = np.asarray(emit, dtype=bool).ravel()
+            valores, codes = valores[keep], codes[keep]
+            sensor_names = np.tile(np.array(sensor_names, dtype=object), num_rows)[keep].tolist()
+            total = len(valores)
+        else:
+            sensor_names = sensor_names * num_rows
+        dt_exec = np.array([ts.strftime('%Y-%m-%d') for ts in uniques], dtype=object)
+        # Fim da execução pelo relógio do sensor: com um SimulatedClock, a saída é reproduzível
+        if as_text:
+            dt_start_exec = np.array([ts.isoformat() for ts in uniques], dtype=object)
+            dt_end_exec = self.clock().isoformat()
+        else:
+            dt_start_exec = np.array(uniques, dtype=object)
+            dt_end_exec = self.clock()
+
+        return {
+            'id_sensor': [self.sensor_id] * total,
+            'valor': valores.tolist(),
+            'dt_exec': dt_exec[codes].tolist(),
+            'dt_start_exec': dt_start_exec[codes].tolist(),
+            'dt_end_exec': [dt_end_exec] * total,
+            'qtd_data': [num_sample] * total,
+            'ram_usage': [round(metrics['mem_mb'], 2)] * total,
+            'process_usage': [metrics['cpu_usage']] * total,
+            'sensor_name': sensor_names,
+        }
+
     @abstractmethod
     def _get_sensor_values(self, row):
         """Método abstrato que deve retornar uma lista de tuplas (nome_elemento, valor)"""
@@ -104,42 +281,136 @@ class Sensor(ABC):
     @staticmethod
     @final
     def _save_in_file(file_path, json_data):
-        file_exists = os.path.exists(file_path)
+        """
+        Anexa os registros em NDJSON, reutilizando um único gravador aberto por arquivo
+        (ver close_file_writers). file_path também pode ser um NdjsonWriter do chamador,
+        que fica responsável por fechá-lo. Retorna o número de bytes serializados.
+        """
+        if not isinstance(file_path, str):
+            return file_path.write_many(json_data)
+        writer = _file_writers.get(file_path)
+        if writer is None:
+            from connection.NdjsonSink import NdjsonWriter
+            writer = _file_writers.setdefault(file_path, NdjsonWriter(file_path))
+        return writer.write_many(json_data)
 
-        with open(file_path, 'a', encoding='utf-8') as f:
-            if file_exists:
-                f.write(",")
-            for i, data in enumerate(json_data):
-                if i > 0:
-                    f.write(',\n')
-                json.dump(data, f, separators=(',',':'), ensure_ascii=False)
+    @final
+    def collect_batch(self, num_samples):
+        """
+        Gera num_samples leituras direto no ReadingBuffer do sensor e retorna um
+        ReadingBatch com views sobre ele, sem montar os registros JSON.
+        """
+        from simuladores.ReadingBuffer import ReadingBatch, ReadingBuffer
 
+        with self.instrumentation.stage('generate', self):
+            timestamps = self._batch_timestamps(num_samples)
+            readings = self.simulate_batch(num_samples, timestamps=timestamps)
+            if self.buffer is None:
+                self.buffer = ReadingBuffer(list(readings), max(self.buffer_capacity, num_samples))
+            region, lap, start = self.buffer.write(timestamps, readings)
+        return ReadingBatch(self, region, num_samples, lap, start)
 
     @final
-    def collect_data(self, num_samples, file_name='dados_sensores.json', save_to_db=False):
+    def collect_data(self, num_samples, file_name='dados_sensores.ndjson', save_to_db=False, bulk_loader=None,
+                     save_to_file=False, parquet_sink=None, as_batch=False, block_sink=None):
+        """
+        Coleta num_samples leituras e as envia aos sinks pedidos (block_sink: ex.
+        BlockWriter do TimeSeriesCodec, que recebe o lote compactado). Retorna a lista
+        de registros log_exec ou, com as_batch=True, o ReadingBatch; nesse caso os
+        registros JSON só são montados se save_to_file pedir ou em batch.to_records().
+        file_name é um caminho (gravador compartilhado, ver close_file_writers) ou um NdjsonWriter.
+        Com self.deadband, todos os sinks recebem apenas as leituras emitidas pelo filtro.
+        """
         data = {'timestamp': []}
+        batch = None
+        emit = None
+        instrumentation = self.instrumentation
 
         try:
-            for _ in range(num_samples):
-                timestamp = datetime.now()
-                readings = self.simulate_reading()
-
-                data['timestamp'].append(timestamp)
-                for key, value in readings.items():
-                    if key not in data:
-                        data[key] = []
-                    data[key].append(value)
+            batch = self.collect_batch(num_samples)
+            data = batch.columns
+            emit = batch.emit
 
         except KeyboardInterrupt:
             print("\nColeta interrompida pelo usuário")
         finally:
-            df = pd.DataFrame(data)
-            payload = self._save_to_json(df, num_samples, file_name)
+            payload = None
+            if not as_batch or save_to_file:
+                with instrumentation.stage('build_payload', self):
+                    payload = self._save_to_json(data, num_samples, file_name if save_to_file else None, emit)
+                instrumentation.count('records_emitted', len(payload), self)
             if save_to_db:
-                self._save_to_mysql(df, num_samples)
-            return payload
+                with instrumentation.stage('save_mysql', self):
+                    self._save_to_mysql(data, num_samples, bulk_loader, emit)
+            if parquet_sink is not None:
+                with instrumentation.stage('save_parquet', self):
+                    parquet_sink.write(self._masked_frame(data, emit), self)
+            if block_sink is not None:
+                with instrumentation.stage('save_blocks', self):
+                    written = block_sink.write(data if emit is None else self._masked_frame(data, emit), self)
+                instrumentation.count('bytes_serialized', written or 0, self)
+            return batch if as_batch else payload
 
     @abstractmethod
     def simulate_reading(self):
         """Método abstrato que deve retornar um dicionário com as leituras"""
-        pass
\ No newline at end of file
+        pass
+
+    def simulate_batch(self, n, timestamps=None):
+        """
+        Gera n leituras de uma vez, retornando um dicionário {coluna: np.ndarray}.
+        timestamps (datetime64, um por leitura) define o horário de cada amostra;
+        por padrão todas usam o horário atual de self.clock.
+        Implementação padrão chama simulate_reading em loop; os simuladores
+        sobrescrevem com uma versão vetorizada em NumPy.
+        """
+        data = {}
+        clock = self.clock
+        try:
+            for i in range(n):
+                if timestamps is not None:
+                    moment = timestamps[i].astype(datetime)
+                    self.clock = lambda: moment
+                for key, value in self.simulate_reading().items():
+                    data.setdefault(key, []).append(value)
+        finally:
+            self.clock = clock
+        return {key: np.asarray(values) for key, values in data.items()}
+
+    def _batch_timestamps(self, n, timestamps=None):
+        if timestamps is not None:
+            return np.asarray(timestamps, dtype='datetime64[us]')
+        return np.full(n, np.datetime64(self.clock(), 'us'))
+
+    @final
+    def backfill(self, start, end, interval, chunk_size=100_000, bulk_loader=None, parquet_sink=None,
+                 block_sink=None):
+        """
+        Gera o histórico de start até end (exclusivo), uma leitura a cada interval
+        (timedelta ou segundos), sem esperar o tempo real. Produz DataFrames de até
+        chunk_size linhas, mantendo a memória limitada. Cada bloco também é gravado
+        no bulk_loader (MySQL), no parquet_sink e/ou no block_sink, quando informados, já filtrado
+        pelo deadband do sensor; os DataFrames produzidos trazem todas as leituras.
+        """
+        import pandas as pd
+
+        if not isinstance(interval, timedelta):
+            interval = timedelta(seconds=interval)
+        start = np.datetime64(start, 'us')
+        step = np.timedelta64(interval, 'us')
+        total = max(0, -(-(np.datetime64(end, 'us') - start) // step))
+
+        for offset in range(0, total, chunk_size):
+            count = min(chunk_size, total - offset)
+            timestamps = start + step * np.arange(offset, offset + count)
+            df = pd.DataFrame({'timestamp': timestamps, **self.simulate_batch(count, timestamps=timestamps)})
+            emit = self._deadband_mask(df)
+
+            if parquet_sink is not None:
+                parquet_sink.write(self._masked_frame(df, emit), self)
+            if block_sink is not None:
+                block_sink.write(self._masked_frame(df, emit), self)
+            if bulk_loader is not None:
+                self._save_to_mysql(df, count, bulk_loader, emit)
+                bulk_loader.flush()
+            yield df
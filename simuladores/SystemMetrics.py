@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class MetricsSampler:
+    """
+    Amostrador de métricas do sistema compartilhado pelos sensores do processo:
+    - Uma thread de fundo lê CPU (psutil.cpu_percent no intervalo entre amostras)
+      e memória RSS do processo a cada interval segundos
+    - As amostras ficam num buffer circular de capacity posições
+    - latest() devolve a última amostra já pronta, sem chamar o psutil
+    - aggregate(window) calcula p50/p95 de CPU e RSS na janela informada
+    """
+    def __init__(self, interval=1.0, capacity=3600):
+        import psutil
+
+        self.interval = interval
+        self.capacity = capacity
+        self._psutil = psutil
+        self._process = psutil.Process(os.getpid())
+        self._times = np.zeros(capacity)
+        self._cpu = np.zeros(capacity)
+        self._rss_mb = np.zeros(capacity)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # A primeira chamada de cpu_percent só inicia a contagem; a RSS já é válida
+        psutil.cpu_percent(interval=None)
+        self._latest = {'cpu_usage': 0.0, 'mem_mb': self._read_rss()}
+
+    def _read_rss(self):
+        return self._process.memory_info().rss / (1024 * 1024)
+
+    def sample(self):
+        """Coleta uma amostra e a grava no buffer circular"""
+        cpu = self._psutil.cpu_percent(interval=None)
+        rss = self._read_rss()
+        with self._lock:
+            index = self._count % self.capacity
+            self._times[index] = time.monotonic()
+            self._cpu[index] = cpu
+            self._rss_mb[index] = rss
+            self._count += 1
+        self._latest = {'cpu_usage': cpu, 'mem_mb': rss}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='metrics-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def latest(self):
+        """Última amostra ({'cpu_usage', 'mem_mb'}); leitura sem custo no caminho quente"""
+        return self._latest
+
+    def aggregate(self, window=60.0):
+        """Percentis p50/p95 de CPU (%) e RSS (MB) das amostras dos últimos window segundos"""
+        with self._lock:
+            filled = min(self._count, self.capacity)
+            times = self._times[:filled].copy()
+            cpu = self._cpu[:filled].copy()
+            rss = self._rss_mb[:filled].copy()
+
+        mask = times >= time.monotonic() - window
+        if not mask.any():
+            latest = self._latest
+            return {
+                'samples': 0,
+                'cpu_p50': latest['cpu_usage'], 'cpu_p95': latest['cpu_usage'],
+                'rss_p50': latest['mem_mb'], 'rss_p95': latest['mem_mb'],
+            }
+        cpu_p50, cpu_p95 = np.percentile(cpu[mask], [50, 95])
+        rss_p50, rss_p95 = np.percentile(rss[mask], [50, 95])
+        return {
+            'samples': int(mask.sum()),
+            'cpu_p50': float(cpu_p50), 'cpu_p95': float(cpu_p95),
+            'rss_p50': float(rss_p50), 'rss_p95': float(rss_p95),
+        }
+
+
+_sampler = None
+_sampler_pid = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler(interval=1.0):
+    """
+    Amostrador único do processo, iniciado no primeiro uso. Após um fork
+    (ex.: workers do simulador de frota) um novo amostrador é criado no filho.
+    """
+    global _sampler, _sampler_pid
+    if _sampler is None or _sampler_pid != os.getpid():
+        with _sampler_lock:
+            if _sampler is None or _sampler_pid != os.getpid():
+                _sampler = MetricsSampler(interval=interval).start()
+                _sampler_pid = os.getpid()
+    return _sampler
@@ -1,6 +1,16 @@
-from .ApogeeSP110Simulator import ApogeeSP110Simulator
-from .DecagonEC5Simulator import DecagonEC5Simulator
-from .EzoPhSimulator import EzoPhSensor
-from .NpkSimulator import NPKSensorSimulator
-from .SensirionSHT31Simulator import SHT31Simulator
-from .DavisSimulator import Davis6410Simulator
\ No newline at end of file
+from .Lazy import lazy_exports
+
+# Os simuladores são importados apenas quando acessados
+lazy_exports(__name__, {
+    'ApogeeSP110Simulator': '.ApogeeSP110Simulator',
+    'DecagonEC5Simulator': '.DecagonEC5Simulator',
+    'EzoPhSensor': '.EzoPhSimulator',
+    'NPKSensorSimulator': '.NpkSimulator',
+    'SHT31Simulator': '.SensirionSHT31Simulator',
+    'Davis6410Simulator': '.DavisSimulator',
+    'WindowAggregator': '.Aggregation',
+    'DeadbandFilter': '.Deadband',
+    'Deadband': '.Deadband',
+    'register_schema': '.Registry',
+    'get_sensor_type': '.Registry',
+})
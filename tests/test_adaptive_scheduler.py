@@ -0,0 +1,89 @@
+import asyncio
+
+from benchmarks.PublishStub import PublishStub
+from connection.AdaptiveScheduler import AdaptiveScheduler, SinkController
+from connection.AsyncPublisher import AsyncPublisher
+
+
+def make_payload(i):
+    return {'NPK': [{'id_sensor': 1, 'valor': float(i), 'sensor_name': 'NPK nitrogenio'}]}
+
+
+def test_cresce_aditivamente_enquanto_saudavel():
+    sink = SinkController('http', initial_batch=5, max_batch=30, initial_interval=8.0, min_interval=0.5,
+                          increase=5, speedup=0.5, target_latency=0.5)
+
+    for _ in range(3):
+        sink.observe(True, 0.1)
+    assert sink.batch_size == 20
+    assert sink.interval == 1.0
+
+    for _ in range(10):
+        sink.observe(True, 0.1)
+    assert sink.batch_size == 30
+    assert sink.interval == 0.5
+
+
+def test_recua_multiplicativamente_com_latencia_alta():
+    sink = SinkController('http', initial_batch=40, initial_interval=1.0, max_interval=3.0,
+                          target_latency=0.5, smoothing=1.0)
+
+    sink.observe(True, 2.0)
+    assert (sink.batch_size, sink.interval) == (20, 2.0)
+    sink.observe(True, 2.0)
+    assert (sink.batch_size, sink.interval) == (10, 3.0)
+
+    sink.observe(True, 0.1)
+    assert sink.healthy()
+    assert sink.batch_size == 15
+
+
+def test_recua_com_erros_e_fila_cheia():
+    depth = [0]
+    sink = SinkController('http', queue_depth=lambda: depth[0], initial_batch=40, high_water=3,
+                          max_error_rate=0.1)
+
+    sink.observe(False)
+    assert sink.batch_size == 20
+    assert sink.error_rate == 1.0
+
+    sink = SinkController('http', queue_depth=lambda: depth[0], initial_batch=40, high_water=3)
+    depth[0] = 3
+    sink.observe(True, 0.1)
+    assert sink.lagging()
+    assert sink.batch_size == 20
+
+
+def test_pipeline_cheio_nao_conta_o_envio_concluido():
+    async def publicar(publisher, n):
+        for i in range(n):
+            await publisher.submit(make_payload(i))
+        await publisher.drain()
+
+    with PublishStub() as stub:
+        scheduler = AdaptiveScheduler()
+        sink = scheduler.add_sink('http', queue_depth=lambda: publisher.in_flight, high_water=2,
+                                  initial_batch=5, max_batch=500, increase=5, target_latency=5.0)
+        publisher = AsyncPublisher(stub.url, max_in_flight=2, listener=sink.observe)
+        try:
+            asyncio.run(publicar(publisher, 20))
+        finally:
+            publisher.close()
+
+    assert publisher.stats()['sent'] == 20
+    assert sink.batch_size == 5 + 5 * 20
+    assert scheduler.lagging() == []
+
+
+def test_wait_for_capacity_respeita_max_wait():
+    depth = [5]
+    scheduler = AdaptiveScheduler(poll_interval=0.01, max_wait=0.05)
+    scheduler.add_sink('http', queue_depth=lambda: depth[0], high_water=5)
+    scheduler.add_sink('mysql', initial_batch=3, initial_interval=9.0)
+
+    assert scheduler.lagging() == ['http']
+    assert asyncio.run(scheduler.wait_for_capacity()) >= 0.05
+    assert (scheduler.batch_size, scheduler.interval) == (3, 9.0)
+
+    depth[0] = 0
+    assert asyncio.run(scheduler.wait_for_capacity()) < 0.05
@@ -0,0 +1,109 @@
+import numpy as np
+
+from simuladores.Aggregation import TDigest, WindowAggregator
+from simuladores.NpkSimulator import NPKSensorSimulator
+
+INICIO = np.datetime64('2026-01-01T00:00:00', 'us')
+
+
+def lote(segundos):
+    """Leituras NPK nos segundos dados (desde INICIO), com valor igual ao segundo"""
+    segundos = np.asarray(segundos, dtype=float)
+    return {
+        'timestamp': INICIO + (segundos * 1_000_000).astype('timedelta64[us]'),
+        'nitrogenio': segundos,
+        'fosforo': segundos * 2,
+        'potassio': segundos + 100,
+    }
+
+
+def do_canal(janelas, canal='NPK nitrogenio'):
+    return [janela for janela in janelas if janela['sensor_name'] == canal]
+
+
+def test_janelas_fixas():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    agregador = WindowAggregator(window=60)
+
+    assert agregador.update(sensor, lote(range(0, 30))) == []
+    fechadas = agregador.update(sensor, lote(range(30, 90)))
+
+    assert len(fechadas) == 3
+    janela, = do_canal(fechadas)
+    assert janela == {
+        'id_sensor': 2, 'sensor_name': 'NPK nitrogenio',
+        'window_start': '2026-01-01T00:00:00', 'window_end': '2026-01-01T00:01:00',
+        'count': 60, 'min': 0.0, 'max': 59.0, 'mean': 29.5, 'last': 59.0,
+    }
+    assert do_canal(fechadas, 'NPK potassio')[0]['mean'] == 129.5
+
+    janela, = do_canal(agregador.flush())
+    assert (janela['window_start'], janela['count'], janela['max']) == ('2026-01-01T00:01:00', 30, 89.0)
+    assert agregador.flush() == []
+
+
+def test_janelas_deslizantes_combinam_paineis():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    agregador = WindowAggregator(window=120, slide=60)
+
+    fechadas = do_canal(agregador.update(sensor, lote(range(0, 200))))
+
+    assert [(j['window_start'][11:], j['window_end'][11:], j['count']) for j in fechadas] == [
+        ('23:59:00', '00:01:00', 60),
+        ('00:00:00', '00:02:00', 120),
+        ('00:01:00', '00:03:00', 120),
+    ]
+    assert fechadas[1]['mean'] == 59.5
+    assert (fechadas[2]['min'], fechadas[2]['max'], fechadas[2]['last']) == (60.0, 179.0, 179.0)
+
+
+def test_leituras_atrasadas_contam_em_late():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    agregador = WindowAggregator(window=60)
+    agregador.update(sensor, lote(range(50, 70)))   # fecha o painel de 0-60 s
+
+    assert agregador.update(sensor, lote([10, 20])) == []
+    assert agregador.late == 2 * 3
+
+    agregador.flush()                               # fecha o painel de 60-120 s
+    assert agregador.update(sensor, lote([65, 119])) == []
+    assert agregador.late == 4 * 3
+
+    assert agregador.update(sensor, lote([130])) == []
+    janela, = do_canal(agregador.flush())
+    assert (janela['window_start'], janela['count']) == ('2026-01-01T00:02:00', 1)
+
+
+def test_percentis_do_t_digest():
+    rng = np.random.default_rng(0)
+    valores = rng.lognormal(0, 1, 50_000)
+    digest = TDigest(compression=100)
+    for parte in np.array_split(valores, 37):
+        digest.add(parte)
+
+    assert digest.count == len(valores)
+    assert len(digest.means) <= 100
+    ordenados = np.sort(valores)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99, 0.999):
+        # Erro medido em posição (rank) no conjunto, menor nas caudas
+        rank = np.searchsorted(ordenados, digest.quantile(q)) / len(valores)
+        assert abs(rank - q) <= 0.01 * min(1.0, 4 * q * (1 - q)) + 0.0005
+
+
+def test_t_digest_mesclado_e_percentis_por_janela():
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(0, 1, 20_000), rng.normal(5, 1, 20_000)
+    digest_a, digest_b = TDigest(), TDigest()
+    digest_a.add(a)
+    digest_b.add(b)
+    digest_a.merge(digest_b)
+
+    ordenados = np.sort(np.concatenate((a, b)))
+    rank = np.searchsorted(ordenados, digest_a.quantile(0.25)) / len(ordenados)
+    assert abs(rank - 0.25) < 0.01
+
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    agregador = WindowAggregator(window=120, slide=60, percentiles=(50, 90))
+    janela = do_canal(agregador.update(sensor, lote(np.arange(0, 180, 0.5))))[1]
+    assert abs(janela['p50'] - 59.75) < 1.5
+    assert abs(janela['p90'] - 107.75) < 1.5
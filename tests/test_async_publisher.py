@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.PublishStub import PublishStub
+from connection.AsyncPublisher import AsyncPublisher
+from connection.TimeSeriesCodec import encode_block
+from simuladores.NpkSimulator import NPKSensorSimulator
+
+
+def make_payload(i):
+    return {'NPK': [{'id_sensor': 1, 'valor': float(i), 'sensor_name': 'NPK nitrogenio'}]}
+
+
+async def publish_all(publisher, payloads):
+    for payload in payloads:
+        await publisher.submit(payload)
+    await publisher.drain()
+
+
+@pytest.fixture
+def stub():
+    with PublishStub(record=True) as stub:
+        yield stub
+
+
+def test_max_in_flight_1_preserva_a_ordem(stub):
+    publisher = AsyncPublisher(stub.url, max_in_flight=1)
+    payloads = [make_payload(i) for i in range(20)]
+    try:
+        asyncio.run(publish_all(publisher, payloads))
+    finally:
+        publisher.close()
+
+    assert [json.loads(body) for _, body in stub.bodies] == payloads
+    stats = publisher.stats()
+    assert stats['sent'] == 20
+    assert stats['failed'] == 0
+    assert stats['bytes_sent'] == stub.bytes_received
+
+
+def test_reutiliza_conexoes_keep_alive(stub):
+    publisher = AsyncPublisher(stub.url, max_in_flight=4)
+    try:
+        asyncio.run(publish_all(publisher, [make_payload(i) for i in range(50)]))
+    finally:
+        publisher.close()
+
+    assert stub.received == 50
+    assert 1 <= stub.connections <= 4
+
+
+def test_volta_para_json_quando_o_formato_e_recusado():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    block = encode_block(sensor.collect_data(num_samples=3, as_batch=True).columns, sensor)
+    with PublishStub(columnar=False, record=True) as stub:
+        publisher = AsyncPublisher(stub.url, max_in_flight=1, wire_format='timeseries')
+        try:
+            assert asyncio.run(publisher.publish(block))
+        finally:
+            publisher.close()
+
+    assert publisher.wire_format == 'json'
+    content_type, body = stub.bodies[0]
+    assert content_type == 'application/json'
+    assert len(json.loads(body)[sensor.sensor_type]) == 3 * 3
+
+
+def test_rebaixa_formato_uma_vez_com_envios_paralelos():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    blocks = [encode_block(sensor.collect_data(num_samples=2, as_batch=True).columns, sensor) for _ in range(8)]
+    with PublishStub(columnar=False, record=True) as stub:
+        publisher = AsyncPublisher(stub.url, max_in_flight=4, wire_format='timeseries', compression='gzip')
+        try:
+            asyncio.run(publish_all(publisher, blocks))
+        finally:
+            publisher.close()
+
+    assert (publisher.wire_format, publisher.compression) == ('json', None)
+    assert publisher.stats()['sent'] == 8
+    assert all(content_type == 'application/json' for content_type, _ in stub.bodies)
+
+
+def test_stats_sem_envios_bem_sucedidos():
+    publisher = AsyncPublisher('http://127.0.0.1:9/publish', max_in_flight=1, timeout=1)
+    try:
+        assert not asyncio.run(publisher.publish(make_payload(0)))
+    finally:
+        publisher.close()
+
+    stats = publisher.stats()
+    assert (stats['sent'], stats['failed']) == (0, 1)
+    assert stats['p50'] is None and stats['p99'] is None
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.FakeIotHub import FakeIoTHubClient, FakeMessage
+from connection import AsyncAzureIotSender
+from connection.AzureConection import CONNECTION_STRING_ENV, AzureIotConnection, pack_records
+
+CONNECTION_STRING = 'HostName=teste.azure-devices.net;DeviceId=teste;SharedAccessKey=chave'
+
+
+def make_records(n):
+    return [{'id_sensor': 1, 'valor': float(i), 'sensor_name': 'NPK nitrogenio'} for i in range(n)]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def send_all(sender, payload):
+    await sender.connect()
+    try:
+        return await sender.send(payload)
+    finally:
+        await sender.disconnect()
+
+
+def test_empacota_registros_ate_o_limite_e_preserva_ordem():
+    client = FakeIoTHubClient()
+    sender = AsyncAzureIotSender(client=client, message_class=FakeMessage, max_message_bytes=1024)
+    records = make_records(200)
+
+    assert run(send_all(sender, records))
+
+    assert len(client.messages) > 1
+    assert all(len(message.data) <= 1024 for message in client.messages)
+    assert all(message.content_type == 'application/json' for message in client.messages)
+    assert client.records() == records
+    stats = sender.stats()
+    assert stats['messages'] == len(client.messages)
+    assert stats['records'] == 200
+    assert stats['bytes'] == sum(len(message.data) for message in client.messages)
+    assert stats['in_flight'] == 0
+
+
+def test_aceita_payload_agrupado_por_sensor():
+    client = FakeIoTHubClient()
+    sender = AsyncAzureIotSender(client=client, message_class=FakeMessage)
+    payload = {'NPK': make_records(3), 'SHT31': make_records(2)}
+
+    assert run(send_all(sender, payload))
+
+    assert client.records() == payload['NPK'] + payload['SHT31']
+    assert sender.stats()['records_per_message'] == 5
+
+
+def test_retenta_falhas_ate_entregar():
+    client = FakeIoTHubClient(failure_rate=0.5, seed=1)
+    sender = AsyncAzureIotSender(client=client, message_class=FakeMessage, max_message_bytes=512,
+                                 max_retries=20, backoff=0.0)
+    records = make_records(100)
+
+    assert run(send_all(sender, records))
+
+    stats = sender.stats()
+    assert stats['retries'] > 0
+    assert stats['failed'] == 0
+    assert client.attempts == stats['messages'] + stats['retries']
+    assert sorted(client.records(), key=lambda r: r['valor']) == records
+
+
+def test_desiste_apos_max_retries():
+    client = FakeIoTHubClient(failure_rate=1.0)
+    sender = AsyncAzureIotSender(client=client, message_class=FakeMessage, max_retries=2, backoff=0.0)
+
+    assert not run(send_all(sender, make_records(5)))
+
+    stats = sender.stats()
+    assert client.attempts == 3
+    assert stats['failed'] == 1
+    assert stats['messages'] == 0
+
+
+def test_registro_acima_do_limite_gera_erro():
+    record = {'sensor_name': 'x' * 100}
+
+    with pytest.raises(ValueError):
+        list(pack_records([record], max_bytes=64))
+    assert json.loads(next(pack_records([record]))[0]) == [record]
+
+
+def test_connection_string_obrigatoria(monkeypatch):
+    monkeypatch.delenv(CONNECTION_STRING_ENV, raising=False)
+
+    with pytest.raises(ValueError, match=CONNECTION_STRING_ENV):
+        AzureIotConnection()
+    with pytest.raises(ValueError, match=CONNECTION_STRING_ENV):
+        AsyncAzureIotSender()
+
+
+def test_connection_string_do_ambiente(monkeypatch):
+    monkeypatch.setenv(CONNECTION_STRING_ENV, CONNECTION_STRING)
+
+    assert AzureIotConnection().connection_string == CONNECTION_STRING
+    assert AsyncAzureIotSender().connection_string == CONNECTION_STRING
+    assert AzureIotConnection('outra').connection_string == 'outra'
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from pymysql.err import OperationalError
+
+from benchmarks import StandInDb
+from connection.BulkLoader import LogExecBulkLoader
+from connection.MysqlConection import MySQLConnector
+from connection.Spool import PayloadSpool
+
+INICIO = datetime(2026, 1, 1, 6, 0, 0)
+
+
+class Banco:
+    """Connect do StandInDb que falha enquanto fora_do_ar for True"""
+    def __init__(self):
+        self.fora_do_ar = False
+
+    def connect(self, **params):
+        if self.fora_do_ar:
+            raise OperationalError(2003, "banco fora do ar")
+        return StandInDb.connect(**params)
+
+
+def make_rows(inicio, n):
+    return [(1, float(i), '2026-01-01', INICIO + timedelta(seconds=i), INICIO + timedelta(seconds=i, milliseconds=5),
+             1, 10.0, 1.5, 'NPK nitrogenio') for i in range(inicio, inicio + n)]
+
+
+def gravados(connector):
+    with connector.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT valor, dt_start_exec FROM agrosync.log_exec ORDER BY id")
+            return cursor.fetchall()
+
+
+def test_max_pending_descarta_excedente_sem_spool():
+    banco = Banco()
+    connector = MySQLConnector('local', 'agrosync', 'u', 'p', pool_size=1, connect=banco.connect)
+    loader = LogExecBulkLoader(connector, max_pending=10)
+
+    banco.fora_do_ar = True
+    loader.add(make_rows(0, 8))
+    assert loader.flush() == 0
+    loader.add(make_rows(8, 8))
+
+    assert len(loader.pending) == 10
+    assert [row[1] for row in loader.pending] == [float(i) for i in range(6, 16)]
+    assert loader.metrics['dropped'] == 6
+    assert loader.metrics['failed_flushes'] == 1
+
+    banco.fora_do_ar = False
+    assert loader.flush() == 10
+    assert [r['valor'] for r in gravados(connector)] == [float(i) for i in range(6, 16)]
+
+
+def test_excedente_vai_para_o_spool_e_volta_ao_banco(tmp_path):
+    banco = Banco()
+    connector = MySQLConnector('local', 'agrosync', 'u', 'p', pool_size=1, connect=banco.connect)
+    spool = PayloadSpool(str(tmp_path / 'mysql'))
+    loader = LogExecBulkLoader(connector, max_pending=10, spool=spool)
+
+    banco.fora_do_ar = True
+    loader.add(make_rows(0, 8))
+    loader.flush()
+    loader.add(make_rows(8, 8))
+    loader.add(make_rows(16, 4))
+
+    assert len(loader.pending) == 10
+    assert loader.metrics['spilled'] == 10
+    assert loader.metrics['dropped'] == 0
+    assert spool.pending_count() == 2
+    assert loader.replay_spool() == 0
+
+    banco.fora_do_ar = False
+    assert loader.flush() == 10
+    assert loader.metrics['replayed'] == 10
+    assert spool.pending_count() == 0
+    spool.close()
+
+    linhas = gravados(connector)
+    assert sorted(r['valor'] for r in linhas) == [float(i) for i in range(20)]
+    # Datetimes voltam do spool como datetime, gravados no mesmo formato das linhas diretas
+    por_valor = {r['valor']: r['dt_start_exec'] for r in linhas}
+    assert por_valor[0.0] == (INICIO).isoformat(sep=' ')
+    assert por_valor[19.0] == (INICIO + timedelta(seconds=19)).isoformat(sep=' ')
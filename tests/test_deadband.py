@@ -0,0 +1,169 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from simuladores.Deadband import Deadband, DeadbandFilter
+from simuladores.NpkSimulator import NPKSensorSimulator
+
+INICIO = np.datetime64('2026-01-01T00:00:00', 'us')
+
+
+def colunas(nitrogenio, segundos=None, fosforo=None, potassio=None):
+    n = len(nitrogenio)
+    segundos = np.arange(n) * 10.0 if segundos is None else np.asarray(segundos, dtype=float)
+    return {
+        'timestamp': INICIO + (segundos * 1_000_000).astype('timedelta64[us]'),
+        'nitrogenio': np.asarray(nitrogenio, dtype=float),
+        'fosforo': np.zeros(n) if fosforo is None else np.asarray(fosforo, dtype=float),
+        'potassio': np.zeros(n) if potassio is None else np.asarray(potassio, dtype=float),
+    }
+
+
+def aplicar(filtro, sensor, columns):
+    return filtro.apply(sensor, columns, sensor._elements(columns))
+
+
+def referencia(values, times, band):
+    """Filtro leitura a leitura, para comparar com a busca vetorizada"""
+    mask = np.zeros(len(values), dtype=bool)
+    reference = reference_time = None
+    heartbeat = np.inf if band.heartbeat is None else band.heartbeat
+    for i, (value, time) in enumerate(zip(values, times)):
+        if (reference is None
+                or abs(value - reference) > max(band.absolute, band.relative * abs(reference))
+                or time - reference_time >= heartbeat):
+            mask[i] = True
+            reference, reference_time = value, time
+    return mask
+
+
+@pytest.fixture
+def sensor():
+    return NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+
+
+def test_banda_absoluta(sensor):
+    filtro = DeadbandFilter({'nitrogenio': Deadband(absolute=0.5)})
+
+    emit = aplicar(filtro, sensor, colunas([10, 10.4, 10.5, 10.6, 10.5, 11.2, 9.9]))
+
+    assert emit[:, 0].tolist() == [True, False, False, True, False, True, True]
+    # Canais sem configuração (e sem default) são sempre emitidos
+    assert emit[:, 1:].all()
+
+
+def test_banda_relativa_acompanha_o_ultimo_emitido(sensor):
+    filtro = DeadbandFilter({'nitrogenio': Deadband(relative=0.1)})
+
+    emit = aplicar(filtro, sensor, colunas([100, 109, 111, 121, 123, 112]))
+
+    # Banda de 10 em torno de 100; depois de 11.1 em torno de 111 e 12.3 em torno de 123
+    assert emit[:, 0].tolist() == [True, False, True, False, True, False]
+
+
+def test_heartbeat_emite_no_limite(sensor):
+    filtro = DeadbandFilter(default=Deadband(absolute=1, heartbeat=30))
+
+    emit = aplicar(filtro, sensor, colunas([5.0] * 8, segundos=[0, 10, 20, 30, 40, 55, 60, 70]))
+
+    assert emit[:, 0].tolist() == [True, False, False, True, False, False, True, False]
+    assert (emit[:, 0] == emit[:, 2]).all()
+
+
+def test_estado_continua_entre_lotes(sensor):
+    rng = np.random.default_rng(3)
+    valores = np.cumsum(rng.normal(0, 0.3, 300))
+    segundos = np.cumsum(rng.uniform(1, 20, 300))
+    band = Deadband(absolute=0.8, relative=0.05, heartbeat=400)
+
+    inteiro = aplicar(DeadbandFilter(default=band), sensor, colunas(valores, segundos))
+    filtro = DeadbandFilter(default=band)
+    partes = [aplicar(filtro, sensor, colunas(valores[a:b], segundos[a:b]))
+              for a, b in ((0, 1), (1, 120), (120, 121), (121, 300))]
+
+    assert np.array_equal(np.concatenate(partes), inteiro)
+    assert np.array_equal(inteiro[:, 0], referencia(valores, segundos, band))
+
+    # Estado por sensor: outro sensor do mesmo tipo recomeça emitindo a primeira leitura
+    outro = NPKSensorSimulator(sensor_id=3, region_id=1, seed=0)
+    assert aplicar(filtro, outro, colunas(valores[150:152], segundos[150:152]))[0].all()
+
+
+@pytest.mark.parametrize('search_step', [1, 2, 64])
+def test_busca_dobrando_a_janela(sensor, monkeypatch, search_step):
+    monkeypatch.setattr(DeadbandFilter, 'SEARCH_STEP', search_step)
+    valores = np.full(5000, 20.0)
+    valores[3000:] = 25.0
+    valores[4999] = 20.0
+    rng = np.random.default_rng(search_step)
+    ruido = np.cumsum(rng.normal(0, 0.2, 5000))
+    band = Deadband(absolute=1.0, heartbeat=20_000)
+
+    emit = aplicar(DeadbandFilter(default=band), sensor, colunas(valores, fosforo=ruido))
+
+    assert np.flatnonzero(emit[:, 0]).tolist() == [0, 2000, 3000, 4999]
+    assert np.array_equal(emit[:, 1], referencia(ruido, np.arange(5000) * 10.0, band))
+
+
+def test_configuracao_por_tipo_e_metricas(sensor):
+    filtro = DeadbandFilter({
+        'NPK.nitrogenio': Deadband(absolute=100),
+        'nitrogenio': Deadband(absolute=0),
+        'fosforo': {'absolute': 100},
+    })
+
+    emit = aplicar(filtro, sensor, colunas([1, 2, 3, 4], fosforo=[1, 2, 3, 4], potassio=[1, 2, 3, 4]))
+
+    assert emit.sum(axis=0).tolist() == [1, 1, 4]
+    assert filtro.metrics == {'seen': 12, 'emitted': 6, 'suppressed': 6}
+    aplicar(filtro, sensor, colunas([1, 2], fosforo=[1, 2], potassio=[1, 2]))
+    assert filtro.metrics == {'seen': 18, 'emitted': 8, 'suppressed': 10}
+
+    filtro.reset()
+    assert aplicar(filtro, sensor, colunas([50]))[0].all()
+
+
+def test_todos_os_sinks_recebem_o_mesmo_conjunto(tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('pyarrow')
+    from benchmarks import StandInDb
+    from connection.MysqlConection import MySQLConnector
+    from connection.NdjsonSink import NdjsonWriter, read_ndjson
+    from connection.ParquetSink import ParquetSink, read_parquet
+    from simuladores.Clock import SimulatedClock
+
+    connector = MySQLConnector('local', 'agrosync', 'u', 'p', pool_size=1, connect=StandInDb.connect)
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, mysql_connector=connector, seed=0)
+    sensor.clock = SimulatedClock(datetime(2026, 1, 1, 6, 0, 0))
+    sensor.deadband = DeadbandFilter(default=Deadband(absolute=0.2, heartbeat=600))
+
+    retornados = []
+    with NdjsonWriter(str(tmp_path / 'dados.ndjson')) as writer, ParquetSink(str(tmp_path / 'parquet')) as sink:
+        for _ in range(20):
+            retornados += sensor.collect_data(num_samples=10, file_name=writer, save_to_file=True,
+                                              save_to_db=True, parquet_sink=sink)
+            sensor.clock.advance(60)
+
+    def chaves(registros):
+        return sorted((r['dt_start_exec'][:19].replace(' ', 'T'), r['sensor_name'], r['valor']) for r in registros)
+
+    metrics = sensor.deadband.metrics
+    assert 0 < metrics['emitted'] < metrics['seen']
+    assert len(retornados) == metrics['emitted']
+
+    with connector.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT dt_start_exec, sensor_name, valor FROM agrosync.log_exec")
+            banco = cursor.fetchall()
+    frame = read_parquet(str(tmp_path / 'parquet'))
+    parquet = [
+        {'dt_start_exec': timestamp.isoformat(), 'sensor_name': f"NPK {column}", 'valor': value}
+        for column in ('nitrogenio', 'fosforo', 'potassio')
+        for timestamp, value in zip(frame['timestamp'], frame[column]) if not pd.isna(value)
+    ]
+
+    esperado = chaves(retornados)
+    assert chaves(read_ndjson(str(tmp_path / 'dados.ndjson'))) == esperado
+    assert chaves(banco) == esperado
+    assert chaves(parquet) == esperado
@@ -0,0 +1,41 @@
+import io
+import json
+
+from simuladores.Fleet import SENSOR_TYPES, run_fleet
+
+# Métricas da máquina que roda o shard, fora do que a simulação reproduz
+METRICAS = ('ram_usage', 'process_usage')
+
+
+def gerar(workers):
+    config = {
+        'regions': [1, 2],
+        'sensors_per_type': {name: 2 for name in SENSOR_TYPES},
+        'num_samples': 3,
+        'cycles': 3,
+        'shard_size': 5,
+        'workers': workers,
+        'seed': 7,
+        'start': '2026-01-01T06:00:00',
+        'schemas': [],
+    }
+    output = io.BytesIO()
+    run_fleet(config, output)
+    registros = [json.loads(line) for line in output.getvalue().splitlines()]
+    return [{k: v for k, v in r.items() if k not in METRICAS} for r in registros]
+
+
+def test_saida_independe_do_numero_de_workers_e_da_execucao():
+    um_worker = gerar(1)
+
+    assert um_worker
+    assert gerar(3) == um_worker
+    assert gerar(1) == um_worker
+
+
+def test_relogio_simulado_avanca_entre_ciclos():
+    registros = gerar(1)
+
+    inicios = sorted({r['dt_start_exec'] for r in registros})
+    assert inicios[0] == '2026-01-01T06:00:00'
+    assert len(inicios) > 1
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from benchmarks import StandInDb
+from connection.MysqlConection import MySQLConnector
+
+
+def make_connector(**kwargs):
+    return MySQLConnector('local', 'agrosync', 'u', 'p', connect=StandInDb.connect, **kwargs)
+
+
+def test_reutiliza_conexao_do_pool():
+    connector = make_connector(pool_size=2)
+    with connector.get_connection() as first:
+        pass
+    with connector.get_connection() as second:
+        pass
+
+    assert first is second
+    metrics = connector.pool_metrics()
+    assert metrics['checkouts'] == 2
+    assert metrics['created'] == 1
+    assert metrics['waits'] == 0
+    assert metrics['idle'] == 1
+
+
+def test_execute_query_grava_e_le_log_exec():
+    connector = make_connector()
+    connector.execute_query(
+        "INSERT INTO agrosync.log_exec (id_sensor, valor, sensor_name) VALUES (%s, %s, %s)", (1, 6.5, 'NPK')
+    )
+    rows = connector.execute_query("SELECT id_sensor, valor FROM agrosync.log_exec", fetch=True)
+
+    assert rows == [{'id_sensor': 1, 'valor': 6.5}]
+    assert connector.pool_metrics()['created'] == 1
+
+
+def test_espera_por_conexao_livre():
+    connector = make_connector(pool_size=1)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with connector.get_connection():
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    threading.Timer(0.05, release.set).start()
+    with connector.get_connection():
+        pass
+    thread.join()
+
+    metrics = connector.pool_metrics()
+    assert metrics['waits'] == 1
+    assert metrics['created'] == 1
+
+
+def test_timeout_sem_conexao_livre():
+    connector = make_connector(pool_size=1, checkout_timeout=0.01)
+    with connector.get_connection():
+        with pytest.raises(TimeoutError):
+            with connector.get_connection():
+                pass
+
+
+def test_descarta_conexao_quebrada_no_pool():
+    connector = make_connector()
+    with connector.get_connection() as conn:
+        pass
+    conn.close()  # servidor derrubou a conexão ociosa
+
+    with connector.get_connection() as fresh:
+        pass
+
+    assert fresh is not conn
+    metrics = connector.pool_metrics()
+    assert metrics['discarded'] == 1
+    assert metrics['created'] == 2
+
+
+def test_descarta_conexao_apos_erro():
+    connector = make_connector()
+    with pytest.raises(RuntimeError):
+        with connector.get_connection() as conn:
+            raise RuntimeError("falha no meio da transação")
+
+    assert conn.closed
+    with connector.get_connection() as fresh:
+        pass
+
+    assert fresh is not conn
+    metrics = connector.pool_metrics()
+    assert metrics['discarded'] == 1
+    assert metrics['idle'] == 1
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from connection.NdjsonSink import NdjsonWriter, read_ndjson
+from simuladores import Sensor
+from simuladores.NpkSimulator import NPKSensorSimulator
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'zstd'])
+def test_le_de_volta_o_que_collect_data_gravou(tmp_path, compression):
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    with NdjsonWriter(str(tmp_path / 'dados.ndjson'), compression=compression) as writer:
+        esperado = sensor.collect_data(num_samples=4, file_name=writer, save_to_file=True)
+        esperado += sensor.collect_data(num_samples=3, file_name=writer, save_to_file=True)
+
+    assert writer.current_path.endswith('.ndjson' + {None: '', 'gzip': '.gz', 'zstd': '.zst'}[compression])
+    assert list(read_ndjson(writer.current_path)) == esperado
+
+
+def test_rotacao_le_todos_os_segmentos(tmp_path):
+    registros = [{'id_sensor': 1, 'valor': float(i)} for i in range(50)]
+    with NdjsonWriter(str(tmp_path / 'dados.ndjson'), compression='gzip', max_bytes=200) as writer:
+        for i in range(0, 50, 5):
+            writer.write_many(registros[i:i + 5])
+
+    assert len(os.listdir(tmp_path)) > 1
+    assert list(read_ndjson(str(tmp_path / 'dados-*.ndjson.gz'))) == registros
+
+
+def test_close_file_writers_descarrega_gravadores_compartilhados(tmp_path):
+    path = str(tmp_path / 'compartilhado.ndjson')
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+
+    esperado = sensor.collect_data(num_samples=2, file_name=path, save_to_file=True)
+    assert path in Sensor._file_writers
+
+    Sensor.close_file_writers()
+
+    assert path not in Sensor._file_writers
+    assert list(read_ndjson(path)) == esperado
@@ -0,0 +1,137 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+from connection.ParquetSink import ParquetSink, read_parquet  # noqa: E402
+from simuladores.Clock import SimulatedClock  # noqa: E402
+from simuladores.NpkSimulator import NPKSensorSimulator  # noqa: E402
+from simuladores.SensirionSHT31Simulator import SHT31Simulator  # noqa: E402
+
+INICIO = datetime(2026, 1, 1, 22, 0, 0)
+
+
+def make_sensor(cls, sensor_id, region_id):
+    sensor = cls(sensor_id=sensor_id, region_id=region_id, seed=sensor_id)
+    sensor.clock = SimulatedClock(INICIO)
+    return sensor
+
+
+def lote(sensor, n=3, horas=1):
+    """Lê n amostras no horário atual do sensor e avança o relógio"""
+    frame = pd.DataFrame(sensor.collect_data(num_samples=n, as_batch=True).columns)
+    sensor.clock.advance(timedelta(hours=horas))
+    return frame
+
+
+def arquivos(base_dir):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), base_dir)
+        for root, _, names in os.walk(base_dir) for name in names if name.endswith('.parquet')
+    )
+
+
+def test_particiona_em_estilo_hive(tmp_path):
+    npk = make_sensor(NPKSensorSimulator, 1, 1)
+    sht = make_sensor(SHT31Simulator, 2, 2)
+    with ParquetSink(str(tmp_path)) as sink:
+        for _ in range(4):  # 22h, 23h, 0h e 1h: duas datas
+            sink.write(lote(npk), npk)
+            sink.write(lote(sht), sht)
+
+    particoes = sorted({os.path.dirname(path) for path in arquivos(tmp_path)})
+    assert particoes == [
+        os.path.join('region_id=1', 'sensor_type=NPK', 'date=2026-01-01'),
+        os.path.join('region_id=1', 'sensor_type=NPK', 'date=2026-01-02'),
+        os.path.join('region_id=2', 'sensor_type=SHT31', 'date=2026-01-01'),
+        os.path.join('region_id=2', 'sensor_type=SHT31', 'date=2026-01-02'),
+    ]
+    assert sink.rows_written == 2 * 4 * 3
+
+
+def test_data_nova_fecha_particoes_anteriores(tmp_path):
+    npk = make_sensor(NPKSensorSimulator, 1, 1)
+    sink = ParquetSink(str(tmp_path))
+    sink.write(lote(npk, horas=3), npk)
+    sink.write(lote(npk), npk)
+
+    # A partição de 2026-01-01 já foi gravada e fechada: legível antes do close()
+    assert len(read_parquet(str(tmp_path), end='2026-01-02')) == 3
+    assert not sink._writers
+    sink.close()
+    assert len(read_parquet(str(tmp_path))) == 6
+
+
+def test_limita_gravadores_abertos_fechando_o_menos_usado(tmp_path):
+    sensors = [make_sensor(NPKSensorSimulator, sensor_id, region_id) for sensor_id, region_id in
+               ((1, 1), (2, 2), (3, 3))]
+    with ParquetSink(str(tmp_path), row_group_size=1, max_open_writers=2) as sink:
+        for sensor in sensors[:2]:
+            sink.write(lote(sensor, horas=0), sensor)
+        sink.write(lote(sensors[0], horas=0), sensors[0])
+        sink.write(lote(sensors[2], horas=0), sensors[2])
+
+        # A região 2 foi a menos usada recentemente e teve o arquivo fechado
+        assert [key[0] for key in sink._writers] == [1, 3]
+        sink.write(lote(sensors[1], horas=0), sensors[1])
+        assert [key[0] for key in sink._writers] == [3, 2]
+
+    assert len(arquivos(os.path.join(tmp_path, 'region_id=2'))) == 2
+    assert len(read_parquet(str(tmp_path), region_id=2)) == 6
+
+
+def test_limites_de_linhas_por_particao_e_no_total(tmp_path):
+    npk = make_sensor(NPKSensorSimulator, 1, 1)
+    sht = make_sensor(SHT31Simulator, 2, 1)
+
+    sink = ParquetSink(str(tmp_path / 'particao'), row_group_size=5, max_buffered_rows=100)
+    sink.write(lote(npk, horas=0), npk)
+    sink.write(lote(sht, horas=0), sht)
+    assert sink.rows_written == 0
+    sink.write(lote(npk, horas=0), npk)
+    assert sink.rows_written == 6   # só a partição NPK chegou a row_group_size
+    assert sink._total_buffered == 3
+    sink.close()
+
+    sink = ParquetSink(str(tmp_path / 'total'), row_group_size=100, max_buffered_rows=8)
+    sink.write(lote(npk, horas=0), npk)
+    sink.write(lote(sht, horas=0), sht)
+    assert sink.rows_written == 0
+    sink.write(lote(sht, n=2, horas=0), sht)
+    assert sink.rows_written == 8   # total acumulado chegou a max_buffered_rows
+    assert sink._total_buffered == 0
+    sink.close()
+
+
+def test_le_de_volta_com_filtros(tmp_path):
+    sensors = [make_sensor(NPKSensorSimulator, 1, 1), make_sensor(NPKSensorSimulator, 2, 1),
+               make_sensor(SHT31Simulator, 3, 2)]
+    gravados = []
+    with ParquetSink(str(tmp_path)) as sink:
+        for _ in range(6):
+            for sensor in sensors:
+                frame = lote(sensor)
+                sink.write(frame, sensor)
+                gravados.append(frame.assign(sensor_id=sensor.sensor_id, sensor_name=sensor.sensor_name,
+                                             region_id=sensor.region_id, sensor_type=sensor.sensor_type))
+    esperado = pd.concat(gravados, ignore_index=True)
+
+    def comparar(lido, filtro, colunas):
+        lido = lido.sort_values(['sensor_id', 'timestamp']).reset_index(drop=True)
+        alvo = esperado[filtro].sort_values(['sensor_id', 'timestamp']).reset_index(drop=True)
+        assert len(lido) == len(alvo) > 0
+        for coluna in colunas:
+            assert lido[coluna].astype(alvo[coluna].dtype).tolist() == alvo[coluna].tolist()
+
+    inicio, fim = datetime(2026, 1, 1, 23, 0), datetime(2026, 1, 2, 2, 0)
+    comparar(read_parquet(str(tmp_path), start=inicio, end=fim, sensor_type='NPK'),
+             (esperado['timestamp'] >= inicio) & (esperado['timestamp'] < fim) & (esperado['sensor_type'] == 'NPK'),
+             ['sensor_id', 'timestamp', 'nitrogenio', 'fosforo', 'potassio'])
+    comparar(read_parquet(str(tmp_path), sensor_ids=[2]), esperado['sensor_id'] == 2,
+             ['timestamp', 'nitrogenio', 'potassio'])
+    comparar(read_parquet(str(tmp_path), region_id=2, sensor_names=['SHT31Simulator']),
+             esperado['region_id'] == 2, ['sensor_id', 'timestamp', 'humidity'])
+    assert read_parquet(str(tmp_path), region_id=3).empty
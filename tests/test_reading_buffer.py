@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from simuladores.NpkSimulator import NPKSensorSimulator
+from simuladores.ReadingBuffer import ReadingBatch, ReadingBuffer
+
+INICIO = np.datetime64('2026-01-01T00:00:00', 'us')
+
+
+def escrever(buffer, inicio, n):
+    """Grava leituras com valor = índice global, para conferir a ordem depois"""
+    valores = np.arange(inicio, inicio + n, dtype=float)
+    timestamps = INICIO + (valores * 1_000_000).astype('timedelta64[us]')
+    return buffer.write(timestamps, {'valor': valores})
+
+
+def valores(region):
+    return region['valor'].tolist()
+
+
+def test_lote_que_nao_cabe_volta_ao_inicio():
+    buffer = ReadingBuffer(['valor'], capacity=10)
+    _, lap_a, start_a = escrever(buffer, 0, 4)
+    _, lap_b, start_b = escrever(buffer, 4, 4)
+    region_c, lap_c, start_c = escrever(buffer, 8, 4)
+
+    assert (lap_a, start_a, lap_b, start_b) == (0, 0, 0, 4)
+    assert (lap_c, start_c) == (1, 0)
+    assert valores(region_c) == [8, 9, 10, 11]
+    assert np.shares_memory(region_c, buffer.data)
+    assert buffer.written == 12
+
+    # C sobrescreveu A; B continua intacto até a volta atual chegar nele
+    assert not buffer.is_valid(lap_a, start_a)
+    assert buffer.is_valid(lap_b, start_b)
+    assert buffer.is_valid(lap_c, start_c)
+    escrever(buffer, 12, 1)
+    assert not buffer.is_valid(lap_b, start_b)
+
+
+def test_latest_atravessa_a_volta_em_ordem():
+    buffer = ReadingBuffer(['valor'], capacity=10)
+    for inicio in (0, 4, 8):
+        escrever(buffer, inicio, 4)
+
+    assert len(buffer) == 8
+    assert valores(buffer.latest(3)) == [9, 10, 11]
+    assert np.shares_memory(buffer.latest(3), buffer.data)
+    assert valores(buffer.latest(6)) == [6, 7, 8, 9, 10, 11]
+    assert valores(buffer.latest()) == list(range(4, 12))
+    assert valores(buffer.latest(100)) == list(range(4, 12))
+
+
+def test_cresce_para_lotes_maiores_que_a_capacidade():
+    buffer = ReadingBuffer(['valor'], capacity=4)
+    _, lap, start = escrever(buffer, 0, 3)
+    region, lap_grande, _ = escrever(buffer, 3, 10)
+
+    assert buffer.capacity == 16
+    assert lap_grande == lap + 1
+    assert not buffer.is_valid(lap, start)
+    assert valores(region) == list(range(3, 13))
+    assert valores(buffer.latest()) == list(range(3, 13))
+
+
+def test_reading_batch_sobrescrito_gera_erro():
+    sensor = NPKSensorSimulator(sensor_id=1, region_id=1, seed=0)
+    sensor.buffer_capacity = 8
+    batch = sensor.collect_batch(5)
+    guardado = batch.copy()
+    esperado = {name: column.copy() for name, column in batch.columns.items()}
+
+    sensor.collect_batch(5)   # volta ao início e grava por cima do primeiro lote
+
+    assert not batch.valid
+    with pytest.raises(RuntimeError):
+        batch.columns
+    with pytest.raises(RuntimeError):
+        batch.copy()
+    assert guardado.valid
+    for name, column in esperado.items():
+        assert np.array_equal(guardado.columns[name], column)
+
+
+def test_collect_data_as_batch_nao_monta_registros(monkeypatch):
+    sensor = NPKSensorSimulator(sensor_id=1, region_id=1, seed=0)
+    chamadas = []
+    save_to_json = sensor._save_to_json
+
+    def contar(*args, **kwargs):
+        chamadas.append(args)
+        return save_to_json(*args, **kwargs)
+
+    monkeypatch.setattr(sensor, '_save_to_json', contar)
+
+    batch = sensor.collect_data(num_samples=4, as_batch=True)
+    assert isinstance(batch, ReadingBatch)
+    assert chamadas == []
+
+    registros = batch.to_records()
+    assert len(chamadas) == 1
+    assert len(registros) == 4 * 3
+    assert len(sensor.collect_data(num_samples=2)) == 2 * 3
+    assert len(chamadas) == 2
@@ -0,0 +1,143 @@
+import asyncio
+import os
+
+from connection.Spool import PayloadSpool
+from connection.TimeSeriesCodec import encode_block
+from simuladores.NpkSimulator import NPKSensorSimulator
+
+
+def payload(i):
+    return {'NPK': [{'id_sensor': 1, 'valor': float(i)}]}
+
+
+def segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.log'))
+
+
+def replay_all(spool, limit=None, falhar_em=None):
+    recebidos = []
+
+    async def send(data):
+        if falhar_em is not None and len(recebidos) == falhar_em:
+            return False
+        recebidos.append(data)
+        return True
+
+    asyncio.run(spool.replay(send, limit=limit))
+    return recebidos
+
+
+def test_append_e_replay_em_ordem(tmp_path):
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    block = encode_block(sensor.collect_data(num_samples=2, as_batch=True).columns, sensor)
+    spool = PayloadSpool(str(tmp_path), segment_bytes=256)
+    for i in range(20):
+        spool.append(payload(i))
+    spool.append(block)
+
+    assert spool.pending_count() == 21
+    assert len(segments(tmp_path)) > 1
+
+    recebidos = replay_all(spool, falhar_em=5)
+    assert recebidos == [payload(i) for i in range(5)]
+    assert spool.pending_count() == 16
+
+    # Blocos do TimeSeriesCodec voltam como bytes; os demais, como JSON
+    assert replay_all(spool) == [payload(i) for i in range(5, 20)] + [block]
+    assert spool.pending_count() == 0
+    assert spool.metrics['replayed'] == 21
+    # Segmentos consumidos por completo são removidos
+    assert len(segments(tmp_path)) == 1
+    spool.close()
+
+
+def test_reinicio_continua_do_cursor(tmp_path):
+    spool = PayloadSpool(str(tmp_path), fsync_every=1)
+    for i in range(10):
+        spool.append(payload(i))
+    assert replay_all(spool, limit=4) == [payload(i) for i in range(4)]
+    spool.close()
+
+    spool = PayloadSpool(str(tmp_path), fsync_every=1)
+    assert spool.pending_count() == 6
+    spool.append(payload(10))
+    assert replay_all(spool) == [payload(i) for i in range(4, 11)]
+    spool.close()
+
+    spool = PayloadSpool(str(tmp_path))
+    assert spool.pending_count() == 0
+    spool.close()
+
+
+def test_recupera_de_cauda_truncada_ou_corrompida(tmp_path):
+    spool = PayloadSpool(str(tmp_path))
+    for i in range(5):
+        spool.append(payload(i))
+    spool.close()
+
+    path = os.path.join(tmp_path, segments(tmp_path)[0])
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 3)  # último registro pela metade
+
+    spool = PayloadSpool(str(tmp_path))
+    assert spool.pending_count() == 4
+    spool.append(payload(5))
+    assert replay_all(spool) == [payload(i) for i in (0, 1, 2, 3, 5)]
+    spool.close()
+
+    spool = PayloadSpool(str(tmp_path))
+    for i in range(3):
+        spool.append(payload(i))
+    spool.close()
+    path = os.path.join(tmp_path, segments(tmp_path)[-1])
+    with open(path, 'r+b') as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b'XX')  # crc do último registro não confere
+
+    spool = PayloadSpool(str(tmp_path))
+    assert replay_all(spool) == [payload(0), payload(1)]
+    spool.close()
+
+
+def test_retencao_por_tamanho_e_idade(tmp_path):
+    spool = PayloadSpool(str(tmp_path / 'tamanho'), segment_bytes=200, max_bytes=600)
+    for i in range(40):
+        spool.append(payload(i))
+
+    assert spool.metrics['dropped_segments'] > 0
+    assert spool.size_bytes() <= 600 + 200
+    recebidos = replay_all(spool)
+    assert spool.pending_count() == 0
+    # Sobram os mais recentes, ainda em ordem
+    assert recebidos == [payload(i) for i in range(40 - len(recebidos), 40)]
+    spool.close()
+
+    directory = str(tmp_path / 'idade')
+    spool = PayloadSpool(directory, segment_bytes=100)
+    for i in range(6):
+        spool.append(payload(i))
+    spool.close()
+    for name in segments(directory):
+        os.utime(os.path.join(directory, name), (0, 0))
+
+    antigos = len(segments(directory))
+
+    spool = PayloadSpool(directory, max_age=3600)
+    assert spool.metrics['dropped_segments'] == antigos
+    assert spool.pending_count() == 0
+    assert replay_all(spool) == []
+    spool.close()
+
+
+def test_wait_for_data_acorda_com_append(tmp_path):
+    spool = PayloadSpool(str(tmp_path))
+
+    async def esperar():
+        assert not await spool.wait_for_data(timeout=0.01)
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, spool.append, payload(0))
+        return await spool.wait_for_data(timeout=5)
+
+    assert asyncio.run(esperar())
+    spool.close()
@@ -0,0 +1,115 @@
+import io
+import math
+
+import numpy as np
+import pytest
+
+from benchmarks.CodecBenchmark import series
+from connection.TimeSeriesCodec import BlockDecoder, decode_block, encode_block, iter_blocks, to_json_payload
+from connection.WireFormat import encode_body
+from simuladores.Fleet import SENSOR_TYPES
+from simuladores.NpkSimulator import NPKSensorSimulator
+
+CAMPOS = ('id_sensor', 'valor', 'dt_exec', 'dt_start_exec', 'qtd_data', 'sensor_name')
+
+
+def test_fallback_json_gera_registros_log_exec():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    columns = series(sensor, 10)
+
+    esperado = sensor._save_to_json(columns, 10)
+    recebido = to_json_payload(encode_block(columns, sensor))[sensor.sensor_type]
+
+    assert [{k: r[k] for k in CAMPOS} for r in recebido] == [{k: r[k] for k in CAMPOS} for r in esperado]
+
+
+def test_fallback_json_omite_leituras_suprimidas():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    columns = series(sensor, 4)
+    columns['fosforo'][1] = math.nan
+
+    registros = to_json_payload(encode_block(columns, sensor))[sensor.sensor_type]
+
+    assert len(registros) == 3 * 4 - 1
+    assert all(not math.isnan(r['valor']) for r in registros)
+
+
+def test_encode_body_json_envia_registros_log_exec():
+    sensor = NPKSensorSimulator(sensor_id=2, region_id=1, seed=0)
+    block = encode_block(series(sensor, 3), sensor)
+
+    body, headers = encode_body(block, 'json')
+
+    assert headers['Content-Type'] == 'application/json'
+    assert b'"sensor_name": "NPK nitrogenio"' in body
+
+
+def assert_identico(block, columns):
+    """Colunas decodificadas iguais bit a bit às originais (NaN, -0.0 e inf inclusos)"""
+    assert list(block.columns) == list(columns)
+    assert np.array_equal(block.columns['timestamp'], np.asarray(columns['timestamp'], dtype='datetime64[us]'))
+    for name, values in columns.items():
+        if name != 'timestamp':
+            original = np.asarray(values, dtype=np.float64).view(np.uint64)
+            assert np.array_equal(block.columns[name].view(np.uint64), original), name
+
+
+@pytest.mark.parametrize('scenario', ['regular', 'jitter'])
+@pytest.mark.parametrize('type_name', sorted(SENSOR_TYPES))
+def test_ida_e_volta_exata_em_todos_os_simuladores(type_name, scenario):
+    sensor = SENSOR_TYPES[type_name](sensor_id=7, region_id=3, seed=1)
+    columns = series(sensor, 500, scenario, seed=2)
+
+    block = decode_block(encode_block(columns, sensor))
+
+    assert (block.sensor_type, block.sensor_id, block.region_id) == (sensor.sensor_type, 7, 3)
+    assert_identico(block, columns)
+
+
+def test_ida_e_volta_com_valores_especiais_e_horarios_irregulares():
+    segundos = np.array([0, 5, 10, 10, 7, 3600, 3601, 86_400 * 40, 86_400 * 40 + 1e-6, 1e-6 * 3])
+    columns = {
+        'timestamp': np.datetime64('2026-01-01T00:00', 'us') + (segundos * 1e6).astype('timedelta64[us]'),
+        'especiais': [math.nan, math.inf, -math.inf, -0.0, 0.0, -0.0, 5e-324, -1.7976931348623157e308, 1.0, math.nan],
+        'sem_escala': [0.1 + 0.2, math.pi, 1 / 3, 2 ** 60 + 0.5, -1e-300, 1e300, math.e, 0.1, 0.2, 0.3],
+        'decimal': [6.76, -0.0, 7.1, 7.1, 7.1, 0.0, -3.25, 1e6, 12.5, 6.76],
+        'constante': [-0.0] * 10,
+    }
+
+    assert_identico(decode_block(encode_block(columns)), columns)
+
+
+@pytest.mark.parametrize('n', [0, 1, 2])
+def test_ida_e_volta_de_lotes_minimos(n):
+    columns = {
+        'timestamp': np.datetime64('2026-01-01T00:00', 'us') + np.arange(n).astype('timedelta64[s]'),
+        'valor': np.linspace(1.5, 2.5, n),
+    }
+
+    assert_identico(decode_block(encode_block(columns)), columns)
+
+
+def test_block_decoder_recebe_pedacos_quebrados():
+    sensors = [SENSOR_TYPES[name](sensor_id=i, region_id=1, seed=i) for i, name in enumerate(sorted(SENSOR_TYPES))]
+    lotes = [series(sensor, 50 + 17 * i, 'jitter', seed=i) for i, sensor in enumerate(sensors)]
+    stream = b''.join(encode_block(columns, sensor) for sensor, columns in zip(sensors, lotes))
+
+    rng = np.random.default_rng(0)
+    for tamanhos in ([1], [7, 3], rng.integers(1, 400, 200).tolist()):
+        decoder = BlockDecoder()
+        blocks, offset, i = [], 0, 0
+        while offset < len(stream):
+            size = tamanhos[i % len(tamanhos)]
+            blocks += decoder.feed(stream[offset:offset + size])
+            offset += size
+            i += 1
+        assert decoder.pending_bytes == 0
+        assert [block.sensor_id for block in blocks] == [sensor.sensor_id for sensor in sensors]
+        for block, columns in zip(blocks, lotes):
+            assert_identico(block, columns)
+
+    # Um bloco incompleto no fim fica pendente e é ignorado por iter_blocks
+    decoder = BlockDecoder()
+    assert len(decoder.feed(stream[:-5])) == len(sensors) - 1
+    assert decoder.pending_bytes > 0
+    assert len(list(iter_blocks(io.BytesIO(stream[:-5]), chunk_size=11))) == len(sensors) - 1